@@ -0,0 +1,9 @@
+"""
+Benchmark suite of the humannotator.
+
+Run all benchmarks and save the results for the current commit:
+    python -m benchmarks run
+Compare the results of two commits:
+    python -m benchmarks compare <base> [<head>]
+See `benchmarks.runner` for how benchmarks are written.
+"""
@@ -0,0 +1,54 @@
+"""
+Run or compare the benchmarks.
+
+Usage:
+    python -m benchmarks run [-k PATTERN] [--quick] [--no-save]
+    python -m benchmarks compare BASE [HEAD]
+
+`compare` reads the results of two commits (HEAD defaults to the current
+commit) from `benchmarks/results` and flags changes of more than 10%.
+"""
+
+
+# standard library
+import argparse
+import sys
+
+# local
+from benchmarks import runner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="run the benchmarks")
+    run.add_argument('-k', dest='pattern', help="only run matching benchmarks")
+    run.add_argument('--quick', action='store_true', help="single short run")
+    run.add_argument('--no-save', action='store_true', help="do not save")
+
+    compare = commands.add_parser('compare', help="compare two commits")
+    compare.add_argument('base')
+    compare.add_argument('head', nargs='?')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        results = runner.run(args.pattern, quick=args.quick)
+        if not args.no_save:
+            print(f"Saved to {runner.save(results)}")
+        return 0
+
+    base = runner.load(args.base)
+    head = runner.load(args.head or runner.current_commit())
+    rows = runner.compare(base, head)
+    for key, before, after, ratio, flag in rows:
+        print(
+            f"{flag:<2}{key:<70}"
+            f"{runner.format_time(before):>12}{runner.format_time(after):>12}"
+            f"{ratio:>8.2f}"
+        )
+    return 1 if any(row[-1] == '+' for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
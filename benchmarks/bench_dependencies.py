@@ -0,0 +1,38 @@
+"""
+Benchmarks for evaluating task dependencies:
+per record (as the interface does) and for all annotations at once.
+"""
+
+
+# local
+from humannotator.core.annotations import Annotations
+from humannotator.core.conditions import compile_condition
+from benchmarks import fixtures
+
+
+class TimeDependencyRecord:
+    def setup(self):
+        self.dependencies = fixtures.tasks()[2].dependencies
+        self.record = {'topic': 'other', 'relevant': False, 'note': None}
+
+    def time_evaluate(self):
+        for dependency in self.dependencies:
+            dependency(self.record)
+
+    def time_compile(self):
+        compile_condition.cache_clear()
+        for dependency in self.dependencies:
+            compile_condition(dependency.condition)
+
+
+class TimeApplyDependencies:
+    params = [1000, 100000]
+    param_names = ['rows']
+
+    def setup(self, rows):
+        self.annotations = Annotations(fixtures.tasks())
+        self.data = fixtures.annotations(rows)
+
+    def time_apply_dependencies(self, rows):
+        self.annotations.data = self.data
+        self.annotations.apply_dependencies()
@@ -0,0 +1,44 @@
+"""
+Benchmarks for rendering a complete item of `examples/news.csv`.
+'cold' clears the caches before every render, 'warm' reuses them.
+"""
+
+
+# standard library
+import itertools
+
+# local
+from humannotator import Annotator
+from humannotator.interface import Interface, Prefetcher
+from humannotator.display.display import DisplayJupyter, DisplayText
+from benchmarks import fixtures
+
+
+DISPLAYS = {'jupyter': DisplayJupyter, 'text': DisplayText}
+
+
+class TimeDisplay:
+    params = [['jupyter', 'text'], ['cold', 'warm']]
+    param_names = ['display', 'cache']
+
+    def setup(self, display, cache):
+        annotator = Annotator(fixtures.news(), fixtures.tasks())
+        interface = Interface(annotator)
+        interface.ids = annotator._data.ids
+        interface.i = 0
+        interface.fresh = interface.first = True
+        interface.last = False
+        self.display = DISPLAYS[display](
+            annotator, interface, phrases=['election', 'president'], sink='null'
+        )
+        interface.display = self.display
+        interface.prefetcher = Prefetcher(self.display.render_record, prefetch=0)
+        self.interface = interface
+        self.task = annotator.tasks['topic']
+        self.ids = itertools.cycle(interface.ids)
+
+    def time_render(self, display, cache):
+        if cache == 'cold':
+            self.display.cache.clear()
+            self.interface.prefetcher.invalidate()
+        self.display(next(self.ids), self.task)
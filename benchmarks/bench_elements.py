@@ -0,0 +1,83 @@
+"""
+Benchmarks for rendering display elements.
+
+Measures the per-render cost of every template and of the html layout
+with 50 item fields. The layout can also be timed on its own:
+    python -m benchmarks.bench_elements
+"""
+
+
+# standard library
+import timeit
+
+# local
+from humannotator.config import PATHS
+from humannotator.display.elements import element_factory
+
+
+N_FIELDS = 50
+REPEAT = 5
+NUMBER = 200
+
+
+def make_layout(n_fields=N_FIELDS):
+    Layout = element_factory(template_filename='basic_layout.html')
+    Tasks  = element_factory(template_filename='tasks.html')
+    Item   = element_factory(template_filename='_item.html')
+
+    tasks = Tasks(
+        task_name='Topic',
+        task_type='(category)',
+        task_count='Task 1 / 3',
+        instruction='[1] politics  \n[2] economy',
+        error='',
+    )
+    layout = Layout(
+        annotator='HUMANNOTATOR',
+        user='user: bench',
+        index_count='1 / 1000',
+        item_id=1,
+        tasks=tasks.render(),
+        annotation='',
+    )
+    for i in range(n_fields):
+        layout(Item(label=f"field_{i}", value='lorem ipsum ' * 20, maxheight='350px'))
+    return layout
+
+
+class TimeElementRender:
+    params = sorted(i.name for i in PATHS.templates.iterdir() if i.is_file())
+    param_names = ['template']
+
+    def setup(self, template):
+        Element = element_factory(template_filename=template)
+        self.element = Element(**{name: 'lorem ipsum' for name in Element._fields})
+        if hasattr(self.element, '_unpack_content'):
+            suffix = (PATHS.templates / template).suffix
+            Item = element_factory(template_filename=f"_item{suffix}")
+            for i in range(10):
+                fields = {name: '350px' for name in Item._fields}
+                fields.update(label=f"field_{i}", value='lorem ipsum ' * 20)
+                self.element(Item(**fields))
+
+    def time_render(self, template):
+        self.element.render()
+
+
+class TimeLayout:
+    def setup(self):
+        self.layout = make_layout()
+
+    def time_render(self):
+        self.layout.render()
+
+
+def main():
+    layout = make_layout()
+    timings = timeit.repeat(layout.render, repeat=REPEAT, number=NUMBER)
+    best = min(timings) / NUMBER
+    print(f"basic_layout.html, {N_FIELDS} fields: {best * 1e6:.1f} us per render")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Benchmarks for exporting the news articles to a static website.
+The rendering time per item determines how long a large export takes.
+"""
+
+
+# standard library
+import shutil
+import tempfile
+import warnings
+
+# local
+from humannotator import Annotator
+from benchmarks import fixtures
+
+
+class TimeExportHTML:
+    params = [1, 2]
+    param_names = ['workers']
+
+    def setup(self, workers):
+        warnings.simplefilter('ignore', FutureWarning)
+        self.tmp = tempfile.mkdtemp()
+        news = fixtures.news()
+        # repeat the articles with new ids
+        data = news.sample(500, replace=True, random_state=0)
+        data.index = range(len(data))
+        self.annotator = Annotator(
+            data, fixtures.tasks(), phrases=['president', 'economy']
+        )
+
+    def teardown(self, workers):
+        shutil.rmtree(self.tmp)
+
+    def time_export(self, workers):
+        self.annotator.export_html(self.tmp, workers=workers)
@@ -0,0 +1,38 @@
+"""
+Benchmarks for highlighting phrases in an item.
+`time_per_phrase` is the former approach (one `re.sub` per phrase) to compare
+against.
+"""
+
+
+# standard library
+import re
+
+# local
+from humannotator.display.components import Highlighter
+from humannotator.display.display import DisplayJupyter
+from benchmarks import fixtures
+
+
+class TimeHighlighter:
+    params = [[10, 100, 300, 1000], ['literal', 'regex']]
+    param_names = ['phrases', 'kind']
+
+    def setup(self, phrases, kind):
+        self.text = ' '.join(fixtures.news().text.iloc[:5])
+        words = sorted({i for i in self.text.split() if i.isalpha()})[:phrases]
+        if kind == 'regex':
+            words = [rf"\b{word[:3]}\w*" for word in words]
+        self.words = words if kind == 'regex' else map(re.escape, words)
+        self.words = list(self.words)
+        self.highlight = Highlighter(
+            DisplayJupyter.Highlight, phrases=words, skip_tags=True
+        )
+
+    def time_highlight(self, phrases, kind):
+        self.highlight(self.text)
+
+    def time_per_phrase(self, phrases, kind):
+        item = self.text
+        for phrase in self.words:
+            item = re.sub(phrase, lambda match: f"<mark>{match[0]}</mark>", item)
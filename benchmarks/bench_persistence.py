@@ -0,0 +1,46 @@
+"""
+Benchmarks for saving and loading an annotator with 100k annotations,
+as a single pickle and in the split directory format.
+"""
+
+
+# standard library
+import itertools
+import shutil
+import tempfile
+from pathlib import Path
+
+# local
+from humannotator import Annotator
+from benchmarks import fixtures
+
+
+ROWS = 100000
+
+
+class TimeSaveLoad:
+    params = ['pickle', 'split']
+    param_names = ['format']
+
+    def setup(self, format):
+        self.tmp = tempfile.mkdtemp()
+        self.path = Path(self.tmp) / 'annotator'
+        self.split = format == 'split'
+        self.annotator = Annotator(tasks=fixtures.tasks())
+        self.annotator.annotations.data = fixtures.annotations(ROWS)
+        self.annotator.save(self.path, split=self.split)
+        self.ids = itertools.count(ROWS)
+
+    def teardown(self, format):
+        shutil.rmtree(self.tmp)
+
+    def time_save(self, format):
+        self.annotator.annotations._saved = None
+        self.annotator.save(self.path, split=self.split)
+
+    def time_save_one_more(self, format):
+        self.annotator.annotations[(next(self.ids), 'topic')] = 'other'
+        self.annotator.save(self.path, split=self.split)
+
+    def time_load(self, format):
+        Annotator.load(self.path)
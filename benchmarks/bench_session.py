@@ -0,0 +1,54 @@
+"""
+Benchmark for a complete annotation session without a user.
+
+Runs a headless session (scripted input, null display sink) over N items
+with one category task and reports the throughput of the
+store/validate/render loop. The suite runs 1k items; for a full run:
+    python -m benchmarks.bench_session [N]
+"""
+
+
+# standard library
+import sys
+import time
+
+# third party
+import pandas as pd
+
+# local
+from humannotator import Annotator, task_factory
+from humannotator.inputs import ScriptedInput
+
+
+N_ITEMS = 100000
+
+
+def run_session(n_items=N_ITEMS, text_display=True):
+    data = pd.DataFrame({'text': [f"item {i} " * 10 for i in range(n_items)]})
+    task = task_factory(['yes', 'no'], 'label')
+    annotator = Annotator(data, task, text_display=text_display, sink='null')
+    keys = ScriptedInput('1' for _ in range(n_items))
+    start = time.perf_counter()
+    annotator(input_provider=keys)
+    return time.perf_counter() - start, len(annotator.annotated)
+
+
+class TimeSession:
+    params = [['text', 'jupyter']]
+    param_names = ['display']
+
+    def time_session(self, display):
+        run_session(1000, text_display=display == 'text')
+
+
+def main():
+    n_items = int(sys.argv[1]) if len(sys.argv) > 1 else N_ITEMS
+    elapsed, n = run_session(n_items)
+    print(
+        f"{n} items in {elapsed:.1f} s: "
+        f"{n / elapsed:.0f} items/s, {elapsed / n * 1e6:.0f} us per item"
+    )
+
+
+if __name__ == '__main__':
+    main()
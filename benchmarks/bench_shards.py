@@ -0,0 +1,45 @@
+"""
+Benchmarks for dividing the ids between annotators and merging the results.
+"""
+
+
+# third party
+import pandas as pd
+
+# local
+from humannotator.core.shards import shard_ids, merge_annotations
+
+
+class TimeShard:
+    params = (['int', 'str'], [100000, 1000000])
+    param_names = ['ids', 'rows']
+
+    def setup(self, ids, rows):
+        self.ids = pd.RangeIndex(rows)
+        if ids == 'str':
+            self.ids = self.ids.astype(str)
+
+    def time_shard(self, ids, rows):
+        shard_ids(self.ids, 4, 0, overlap=0.05)
+
+
+class TimeMerge:
+    params = [100000, 1000000]
+    param_names = ['rows']
+
+    def setup(self, rows):
+        ids = pd.RangeIndex(rows)
+        self.frames = [
+            pd.DataFrame(
+                {
+                    'topic': 'economy',
+                    'timestamp': pd.Timestamp('2020-01-01') + pd.Timedelta(i, 's'),
+                    'user': f"user {i}",
+                },
+                index=shard_ids(ids, 4, i, overlap=0.05),
+            )
+            for i in range(4)
+        ]
+
+    def time_merge(self, rows):
+        merge_annotations(self.frames)
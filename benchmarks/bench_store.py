@@ -0,0 +1,31 @@
+"""
+Benchmarks for storing annotations.
+The cost of a single write should not depend on the number of stored rows.
+"""
+
+
+# standard library
+import itertools
+
+# local
+from humannotator.core.annotations import Annotations
+from benchmarks import fixtures
+
+
+class TimeAnnotationsSetitem:
+    params = [1000, 100000, 1000000]
+    param_names = ['rows']
+
+    def setup(self, rows):
+        self.annotations = Annotations(fixtures.tasks())
+        self.annotations.data = fixtures.annotations(rows)
+        self.ids = itertools.count(rows)
+
+    def time_setitem_new(self, rows):
+        self.annotations[(next(self.ids), 'topic')] = 'economy'
+
+    def time_setitem_existing(self, rows):
+        self.annotations[(rows // 2, 'topic')] = 'economy'
+
+    def time_record(self, rows):
+        self.annotations.record(rows // 2)
@@ -0,0 +1,35 @@
+"""
+Benchmarks for the throughput report.
+The report should take less than a second on millions of logged tasks.
+"""
+
+
+# third party
+import numpy as np
+import pandas as pd
+
+# local
+from humannotator.core.timings import Timings
+
+
+class TimeThroughput:
+    params = [10000, 1000000, 3000000]
+    param_names = ['rows']
+
+    def setup(self, rows):
+        rng = np.random.default_rng(0)
+        start = np.cumsum(rng.integers(1, 10**10, rows))
+        self.timings = Timings()
+        self.timings.extend(pd.DataFrame({
+            'id': np.arange(rows) // 2,
+            'task': np.where(np.arange(rows) % 2, 'topic', 'note'),
+            'user': rng.choice([f"user {i}" for i in range(5)], rows),
+            'start': start,
+            'end': start + rng.integers(1, 10**10, rows),
+        }))
+
+    def time_throughput(self, rows):
+        self.timings.throughput()
+
+    def time_append(self, rows):
+        self.timings.append(rows, 'topic', 'user 0', 0)
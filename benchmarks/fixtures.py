@@ -0,0 +1,53 @@
+"""
+Data and tasks shared by the benchmarks.
+"""
+
+
+# standard library
+from pathlib import Path
+
+# third party
+import pandas as pd
+
+# local
+from humannotator import task_factory
+
+
+NEWS = Path(__file__).parents[1] / 'examples' / 'news.csv'
+
+
+def news():
+    "The news articles from the examples."
+    return pd.read_csv(NEWS, index_col=0).set_index('news_id')
+
+
+def tasks():
+    "A category task and two tasks that depend on it."
+    return [
+        task_factory(['politics', 'economy', 'other'], 'topic'),
+        task_factory(
+            'bool', 'relevant', nullable=True,
+            dependencies=("topic == 'other'", '0'),
+        ),
+        task_factory(
+            'str', 'note', nullable=True,
+            dependencies=[
+                ("topic == 'other' and relevant == False", None),
+                ("topic in ['politics', 'economy']", 'checked'),
+            ],
+        ),
+    ]
+
+
+def annotations(rows):
+    "Annotation data for the tasks with `rows` rows."
+    topics = ['politics', 'economy', 'other']
+    return pd.DataFrame({
+        'topic': pd.Categorical(
+            [topics[i % 3] for i in range(rows)], categories=topics
+        ),
+        'relevant': pd.Series([None] * rows, dtype=object),
+        'note': pd.Series([None] * rows, dtype=object),
+        'timestamp': pd.Timestamp('2020-01-01'),
+        'user': 'bench',
+    })
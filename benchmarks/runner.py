@@ -0,0 +1,169 @@
+"""
+Runner for the benchmark suite.
+
+Benchmarks are written in the style of asv: every `bench_*` module in this
+package may contain classes whose names start with `Time`. Each method whose
+name starts with `time_` is a benchmark. A class can set `params` (a list of
+values, or a list of lists for several parameters) and `param_names`; the
+optional `setup` method is called with the parameters before timing.
+
+Results are written as json to `benchmarks/results/<commit>.json`, so they
+can be compared across commits. The results depend on the machine; the
+directory is not tracked by git.
+"""
+
+
+# standard library
+import importlib
+import itertools
+import json
+import pkgutil
+import platform
+import statistics
+import subprocess
+import time
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+
+RESULTS = Path(__file__).parent / 'results'
+REPEAT = 5
+MIN_TIME = 0.2
+THRESHOLD = 1.1
+
+
+def discover(pattern=None):
+    "Yield the name, class and method name of every benchmark."
+    package = Path(__file__).parent
+    for module in pkgutil.iter_modules([str(package)]):
+        if not module.name.startswith('bench_'):
+            continue
+        module = importlib.import_module(f"benchmarks.{module.name}")
+        for cls_name, cls in vars(module).items():
+            if not (cls_name.startswith('Time') and isinstance(cls, type)):
+                continue
+            for method in dir(cls):
+                if not method.startswith('time_'):
+                    continue
+                name = f"{module.__name__.split('.')[-1]}.{cls_name}.{method}"
+                if pattern and pattern not in name:
+                    continue
+                yield name, cls, method
+
+
+def parameters(cls):
+    "All combinations of the parameters of a benchmark class."
+    params = getattr(cls, 'params', None)
+    if params is None:
+        return [()]
+    if not params or not isinstance(params[0], (list, tuple)):
+        params = [params]
+    return list(itertools.product(*params))
+
+
+def measure(func, repeat=REPEAT, min_time=MIN_TIME):
+    "Time `func`; returns seconds per call (min and median) and the number."
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1e6:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    timings = [elapsed] + timer.repeat(repeat - 1, number)
+    timings = [i / number for i in timings]
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def run(pattern=None, quick=False, verbose=True):
+    "Run the benchmarks (matching `pattern`); returns the results."
+    results = {}
+    repeat, min_time = (2, 0.01) if quick else (REPEAT, MIN_TIME)
+    for name, cls, method in discover(pattern):
+        for params in parameters(cls):
+            key = f"{name}({', '.join(repr(i) for i in params)})"
+            instance = cls()
+            if hasattr(instance, 'setup'):
+                instance.setup(*params)
+            func = getattr(instance, method)
+            results[key] = measure(
+                lambda: func(*params), repeat=repeat, min_time=min_time
+            )
+            if hasattr(instance, 'teardown'):
+                instance.teardown(*params)
+            if verbose:
+                print(f"{key:<70}{format_time(results[key]['min']):>12}")
+    return results
+
+
+def save(results, commit=None):
+    "Write the results to the results directory; returns the path."
+    commit = commit or current_commit()
+    RESULTS.mkdir(exist_ok=True)
+    path = RESULTS / f"{commit}.json"
+    path.write_text(json.dumps({
+        'commit': commit,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'results': results,
+    }, indent=2))
+    return path
+
+
+def load(commit):
+    "Load the results of `commit` (a prefix of the hash is enough)."
+    matches = sorted(RESULTS.glob(f"{commit}*.json"))
+    if not matches:
+        raise FileNotFoundError(f"No results for commit '{commit}'.")
+    return json.loads(matches[0].read_text())['results']
+
+
+def compare(base, head, threshold=THRESHOLD):
+    """Compare two sets of results.
+
+    Returns
+    -------
+    list of tuples
+        Benchmark, base time, head time, ratio and a flag:
+        '+' if slower than `threshold`, '-' if faster, '' otherwise.
+    """
+
+    rows = []
+    for key in sorted(set(base) & set(head)):
+        before, after = base[key]['min'], head[key]['min']
+        ratio = after / before if before else float('inf')
+        flag = '+' if ratio > threshold else '-' if ratio < 1 / threshold else ''
+        rows.append((key, before, after, ratio, flag))
+    return rows
+
+
+def current_commit():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return time.strftime('%Y%m%d-%H%M%S')
+    dirty = subprocess.run(
+        ['git', 'status', '--porcelain', '--untracked-files=no'],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, cwd=Path(__file__).parent,
+    ).stdout.strip()
+    return f"{commit}-dirty" if dirty else commit
+
+
+def format_time(seconds):
+    for unit, factor in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= factor:
+            return f"{seconds / factor:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
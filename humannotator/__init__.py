@@ -1,4 +1,5 @@
 from humannotator.core.tasks import task_factory
 from humannotator.core.data import load_data
+from humannotator.core.shards import merge_annotations
 from humannotator.humannotator import Annotator
 from humannotator.version import __version__, __author__
@@ -6,17 +6,24 @@ maintained and ordered in the Tasks class.
 """
 
 
-# local
+# standard library
 import warnings
+from collections import namedtuple
+from collections.abc import Mapping
 
 # third party
 import pandas as pd
 
 # local
 from humannotator.utils import Base
+from humannotator.core.store import Store, SQLiteStore
+from humannotator.core.timings import Timings, time_ns
 from humannotator.core.tasks import REGISTRY, task_factory, Task
 
 
+DependencyReport = namedtuple('DependencyReport', ['resolved', 'pending'])
+
+
 class Annotations(Base):
     """
     Annotations
@@ -27,15 +34,45 @@ class Annotations(Base):
     Attributes
     ----------
     tasks : Tasks object
-    data : DataFrame
-        df for storing the annotations.
+    store : Store or SQLiteStore object
+        Storage for the annotations, by default in memory.
         - Each task gets its own column.
         - Timestamp and user are stored with each annotation.
+    data : DataFrame
+        df built from the store on access (a copy).
+    journal : Journal object, default None
+        If set, completed annotations are appended to the journal.
+    timings : Timings object
+        Start and end time of every task answered through `start`.
     """
 
-    def __init__(self, tasks=None, dependencies=None):
+    def __init__(self, tasks=None, dependencies=None, store=None):
         self.tasks = tasks
-        self.data = self._build_data_structure()
+        self.store = Store(self.dtypes) if store is None else store
+        self.journal = None
+        self.timings = Timings()
+        self._started = {}
+
+    def __setstate__(self, state):
+        # annotators pickled before the store was introduced
+        if '_data' in state:
+            state['_store'] = Store.from_frame(state.pop('_data'))
+        if 'store' in state:
+            state['_store'] = state.pop('store')
+        state.setdefault('_frame', None)
+        state.setdefault('_schema', None)
+        state.setdefault('journal', None)
+        state.setdefault('_saved', None)
+        state.setdefault('timings', Timings())
+        state['_started'] = {}
+        self.__dict__.update(state)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the cached frame is rebuilt from the store on access
+        for key in ['_started', '_frame', '_schema']:
+            del state[key]
+        return state
 
     @property
     def tasks(self):
@@ -47,15 +84,45 @@ class Annotations(Base):
             self._tasks = tasks
         else:
             self._tasks = Tasks(tasks)
+        self._schema = None
+        self._frame = None
+
+    @property
+    def store(self):
+        return self._store
+
+    @store.setter
+    def store(self, store):
+        if not isinstance(store, (Store, SQLiteStore)):
+            store = SQLiteStore(store)
+        self._store = store
+        self._schema = None
+        self._frame = None
+        self._saved = None
 
     @property
     def data(self):
+        """
+        Dataframe with the annotations. Built from the store when changed.
+        Returns a copy: set annotations with `annotations[id, task] = value`.
+        """
         self._check_data_structure()
-        return self._data
+        key = (self.store.revision, self._schema)
+        if self._frame is None or self._frame[0] != key:
+            self._frame = key, self.store.frame(self._dtypes)
+        return self._frame[1].copy()
 
     @data.setter
     def data(self, data):
-        self._data = data
+        self.store = Store.from_frame(data)
+        self._frame = None
+
+    @property
+    def dtypes(self):
+        "Dtypes of the annotation columns."
+        dtypes = {task.name:task.dtype for task in self.tasks}
+        dtypes.update({'timestamp': 'datetime64[ns]', 'user': 'object'})
+        return dtypes
 
     @property
     def ntasks(self):
@@ -65,15 +132,33 @@ class Annotations(Base):
     def instructions(self):
         return [task.instruction for task in self.tasks]
 
+    def start(self, id, task, user=None):
+        "Start timing `task` for `id`; logged when the task is answered."
+        self._started[id, task] = time_ns(), user
+
     def __setitem__(self, id, value):
         now = pd.Timestamp('now')
+        self._check_data_structure()
         if isinstance(id, tuple):
             idx, task = id
-            self.data.loc[idx, [task, 'timestamp']] = (value, now)
+            self.store[idx, task] = value
+            self.store[idx, 'timestamp'] = now
+            started = self._started.pop(id, None)
+            if started is not None:
+                start, user = started
+                self.timings.append(idx, task, user, start)
         else:
-            values.append(pd.Timestamp('now'))
-            annotation = pd.Series(values, index=self.data.columns, name=id)
-            self.data = self.data.append(annotation)
+            if not isinstance(value, Mapping):
+                value = dict(zip(self.tasks.tasks, value))
+            for task, item in value.items():
+                self.store[id, task] = item
+            self.store[id, 'timestamp'] = now
+
+    def __contains__(self, id):
+        return id in self.store
+
+    def __len__(self):
+        return len(self.store)
 
     def __eq__(self, other):
         if isinstance(other, Annotations):
@@ -83,23 +168,109 @@ class Annotations(Base):
             )
         return NotImplemented
 
-    def _build_data_structure(self):
-        dtypes = {task.name:task.dtype for task in self.tasks}
-        dtypes.update({'timestamp': 'datetime64[ns]'})
-        items = [
-            pd.DataFrame(columns=dtypes.keys()),
-            pd.DataFrame(columns=['timestamp']),
-            pd.DataFrame(columns=['user']),
-        ]
-        return pd.concat(items, sort=False).astype(dtypes)
+    def unannotated(self, ids):
+        "Return the `ids` that have no annotation (in order) as an index."
+        if not isinstance(ids, pd.Index):
+            ids = pd.Index(list(ids))
+        return ids[~ids.isin(list(self.store))]
 
-    def _check_data_structure(self):
+    def record(self, id):
+        "Return the annotation for `id` as a dict. Raises KeyError if missing."
+        self._check_data_structure()
+        return self.store.record(id)
+
+    def drop(self, id):
+        "Remove the annotation and timings for `id` (if any)."
+        self.store.drop(id)
+        self.timings.drop(id)
+
+    def commit(self, id):
+        "Mark the annotation for `id` as complete: write it to the journal."
+        if self.journal is not None:
+            self.journal.append(id, self.store.record(id))
+        self.store.commit(id)
+
+    def sync(self):
+        "Force the store and journal to disk."
+        self.store.flush()
+        if self.journal is not None:
+            self.journal.sync()
+
+    def replay(self, journal):
+        "Apply the entries of `journal` to the store."
+        self._check_data_structure()
+        for id, values in journal.replay():
+            for column, value in values.items():
+                if column not in self.store.columns:
+                    self.store.set_columns([column])
+                self.store[id, column] = value
+
+    def apply_dependencies(self, ids=None):
+        """Resolve task dependencies for all stored annotations at once.
+
+        Tasks are processed in order, so that values resolved for one task
+        are available to the conditions of the tasks that follow. For each
+        task only the missing values are filled in; per row the first
+        dependency whose condition is met determines the value.
+
+        Arguments
+        ---------
+        ids : list of ids, default None
+            Restrict to these ids. By default: all stored annotations.
+
+        Returns
+        -------
+        DependencyReport
+            resolved : DataFrame
+                Number of rows resolved per task and dependency.
+            pending : Index
+                Ids that still have missing values (or no annotation at all).
+        """
+
+        df = self.data.copy()
+        missing = pd.Index([])
+        if ids is not None:
+            ids = pd.Index(ids)
+            missing = ids[~ids.isin(df.index)]
+            df = df[df.index.isin(ids)]
+
+        now = pd.Timestamp('now')
+        resolved = []
+        pending = pd.DataFrame(index=df.index)
+        changed = pd.Series(False, index=df.index)
         for task in self.tasks:
-            if task not in Tasks.from_df(self._data):
-                df = self._build_data_structure()
-                df = df.append(self._data, sort=False)
-                self._data = df
-                break
+            todo = df[task.name].isna()
+            for dependency in task.dependencies:
+                hits = todo & dependency.evaluate(df)
+                value = task(dependency.value)
+                if hits.any():
+                    df.loc[hits, task.name] = value
+                    self.store.update(df.index[hits], task.name, value)
+                    self.store.update(df.index[hits], 'timestamp', now)
+                    changed |= hits
+                    todo &= ~hits
+                resolved.append(
+                    (task.name, dependency.condition, value, hits.sum())
+                )
+            pending[task.name] = todo
+        for id in df.index[changed]:
+            self.commit(id)
+        self.sync()
+
+        resolved = pd.DataFrame(
+            resolved, columns=['task', 'condition', 'value', 'resolved']
+        )
+        pending = df.index[pending.any(axis=1)].append(missing)
+        return DependencyReport(resolved, pending)
+
+    def _check_data_structure(self):
+        "Reconcile the store with the tasks if the task schema has changed."
+        if self._schema == self.tasks.version:
+            return None
+        self._dtypes = self.dtypes
+        if not all(name in self.store.columns for name in self.tasks.tasks):
+            self.store.set_columns(self._dtypes)
+        self._schema = self.tasks.version
 
     @classmethod
     def from_df(cls, df, **kwargs):
@@ -137,8 +308,13 @@ class Tasks(Base):
         Dictionary containing all Task objects.
         - key: index
         - value: task
+    version : int
+        Schema version.
+        Incremented whenever tasks are added, replaced or reordered.
     """
 
+    version = 0
+
     def __init__(self, tasks=None):
         self.tasks = tasks
 
@@ -164,6 +340,7 @@ class Tasks(Base):
                 assert all(isinstance(v, Task) for v in tasks.values())
                 self._tasks = tasks
             self._set_pos_in_tasks()
+        self.version += 1
 
     @property
     def order(self):
@@ -175,6 +352,7 @@ class Tasks(Base):
         if all(isinstance(i, int) for i in value):
             value = [self.order[i] for i in value]
         self.tasks = {name:self.tasks[name] for name in value}
+        self.version += 1
 
     def _set_pos_in_tasks(self):
         for position, task in self.order.items():
@@ -204,6 +382,7 @@ class Tasks(Base):
                 value = task_factory(value, id)
         self.tasks[id] = value
         self._set_pos_in_tasks()
+        self.version += 1
 
     def __len__(self):
         return len(self._tasks)
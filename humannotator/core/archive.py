@@ -0,0 +1,391 @@
+"""
+This module contains the split save format of the annotator. Instead of one
+pickle, the annotator is saved to a directory holding:
+- manifest.json: the tasks, settings and an inventory of the other files.
+- annotations: one or more columnar parts (Feather if pyarrow is installed,
+  otherwise a directory of NumPy `.npy` files, one per column).
+- data (only if `save_data` is True): a columnar copy of the data. Data that
+  is read from a file or database is stored as a reference instead.
+- timings: one or more columnar parts with the start/end time per task.
+
+Saving again to the same directory only writes the annotations that changed
+(and the timings that were added) since the last save as a new part. Parts
+are applied in order when loading; once there are `MAX_PARTS` parts they are
+compacted into one.
+"""
+
+
+# standard library
+import json
+import os
+import shutil
+import warnings
+from pathlib import Path
+
+# third party
+import numpy as np
+import pandas as pd
+try:
+    from pyarrow import feather
+except ModuleNotFoundError:
+    feather = None
+
+# local
+from humannotator.core.annotations import Annotations
+from humannotator.core.data import (
+    Data_DataFrame, Data_File, Data_Mapped, Data_SQLite, load_data
+)
+from humannotator.core.journal import encode, decode
+from humannotator.core.store import Store, SQLiteStore, cast
+from humannotator.core.tasks import task_factory
+
+
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+MAX_PARTS = 32
+
+
+def write(annotator, path):
+    """Save `annotator` to the directory `path`.
+
+    Arguments
+    ---------
+    annotator : Annotator
+    path : str or Path
+        Directory to save to. Created if it does not exist.
+    """
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(path) if (path / MANIFEST).exists() else {}
+    annotations = annotator.annotations
+
+    manifest.update(
+        version  = FORMAT_VERSION,
+        name     = annotator.name,
+        user     = annotator.user,
+        tasks    = [encode(task.to_dict()) for task in annotations.tasks],
+        kwargs   = serializable(annotator.kwargs),
+        journal  = None,
+        store    = None,
+        sequence = manifest.get('sequence', 0),
+    )
+    if annotations.journal is not None:
+        manifest['journal'] = str(annotations.journal.path)
+
+    if isinstance(annotations.store, SQLiteStore):
+        annotations.store.flush()
+        manifest['store'] = str(annotations.store.path)
+        manifest['annotations'] = []
+    else:
+        write_annotations(annotations, path, manifest)
+    write_timings(annotations, path, manifest)
+
+    manifest['save_data'] = annotator.save_data
+    if not annotator.save_data or annotator._data is None:
+        manifest['data'] = None
+    else:
+        write_data(annotator._data, path, manifest)
+
+    tmp = path / (MANIFEST + '.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    os.replace(tmp, path / MANIFEST)
+    remove_unreferenced(path, manifest)
+
+
+def read(path, data=True):
+    """Read an annotator saved with `write`.
+
+    Arguments
+    ---------
+    path : str or Path
+        Directory the annotator was saved to.
+    data : boolean, default True
+        If False, skip loading the data.
+
+    Returns
+    -------
+    dict
+        Keyword arguments to create the Annotator with.
+    """
+
+    path = Path(path)
+    manifest = read_manifest(path)
+    annotations = Annotations(
+        [task_factory(**decode(spec)) for spec in manifest['tasks']]
+    )
+    if manifest['store'] is not None:
+        annotations.store = manifest['store']
+    else:
+        annotations.store = read_annotations(path, manifest['annotations'])
+        annotations._saved = (str(path.resolve()), annotations.tasks.version)
+    for part in manifest.get('timings', []):
+        annotations.timings.extend(read_frame(path, part))
+    annotations.timings.saved = annotations.timings.size
+    annotations.timings._saved = str(path.resolve())
+
+    kwargs = dict(
+        tasks     = annotations,
+        name      = manifest['name'],
+        user      = manifest['user'],
+        save_data = manifest['save_data'],
+        journal   = manifest['journal'],
+        **decode(manifest['kwargs']),
+    )
+    if data and manifest['data'] is not None:
+        kwargs['data'] = read_data(path, manifest['data'])
+    return kwargs
+
+
+def read_manifest(path):
+    with (Path(path) / MANIFEST).open(encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version', 0) > FORMAT_VERSION:
+        raise ValueError(
+            f"'{path}' was saved with a newer version of humannotator."
+        )
+    return manifest
+
+
+def write_annotations(annotations, path, manifest):
+    "Write the changed annotations as a new part (or all as the only part)."
+    store = annotations.store
+    parts = manifest.get('annotations', [])
+    key = (str(path.resolve()), annotations.tasks.version)
+    incremental = (
+        getattr(annotations, '_saved', None) == key
+        and parts
+        and len(parts) < MAX_PARTS
+    )
+
+    if incremental:
+        if not store.changes:
+            return None
+        ids = [id for id in store.changes if id in store]
+        dropped = [encode(id) for id in store.changes if id not in store]
+        df = store.frame(annotations.dtypes, ids=ids)
+    else:
+        parts = []
+        dropped = []
+        df = annotations.data
+
+    manifest['sequence'] += 1
+    part = write_frame(df, path / f"annotations-{manifest['sequence']:05d}")
+    part['dropped'] = dropped
+    manifest['annotations'] = parts + [part]
+    store.changes.clear()
+    annotations._saved = key
+
+
+def read_annotations(path, parts):
+    "Apply the parts in order to a new store."
+    store = Store()
+    for i, part in enumerate(parts):
+        df = read_frame(path, part)
+        if i == 0:
+            store = Store.from_frame(df)
+            continue
+        for id in part['dropped']:
+            store.drop(decode(id))
+        for column in df.columns:
+            if column not in store.columns:
+                store.set_columns([column])
+            for id, value in df[column].items():
+                store[id, column] = value
+    store.changes.clear()
+    return store
+
+
+def write_timings(annotations, path, manifest):
+    "Write the timings added since the last save as a new part."
+    timings = annotations.timings
+    parts = manifest.get('timings', [])
+    key = str(path.resolve())
+    incremental = (
+        timings._saved == key
+        and timings.saved
+        and len(parts) < MAX_PARTS
+    )
+    if not incremental:
+        parts = []
+        timings.saved = 0
+    if timings.saved < timings.size:
+        manifest['sequence'] += 1
+        part = write_frame(
+            timings.frame_from(timings.saved),
+            path / f"timings-{manifest['sequence']:05d}",
+        )
+        parts = parts + [part]
+    manifest['timings'] = parts
+    timings.saved = timings.size
+    timings._saved = key
+
+
+def write_data(data, path, manifest):
+    "Store the data, or a reference to the file/database it is read from."
+    if isinstance(data, Data_File):
+        manifest['data'] = {
+            'kind': 'file',
+            'path': str(data.path.resolve()),
+            'item_cols': data.item_cols,
+            'id_col': data.id_col,
+        }
+    elif isinstance(data, Data_Mapped):
+        manifest['data'] = {
+            'kind': 'mapped',
+            'path': str(data.path.resolve()),
+            'item_cols': encode(data.item_cols),
+        }
+    elif isinstance(data, Data_SQLite):
+        manifest['data'] = {
+            'kind': 'sqlite',
+            'path': data.database,
+            'table': data.table,
+            'item_cols': data.item_cols,
+            'id_col': data.id_col,
+        }
+    else:
+        # only write the data if it has changed since the last save
+        key = str(path.resolve())
+        previous = manifest.get('data') or {}
+        if getattr(data, '_saved', None) == key and 'file' in previous:
+            return None
+        df = pd.DataFrame(data.data)
+        manifest['sequence'] += 1
+        spec = write_frame(df, path / f"data-{manifest['sequence']:05d}")
+        spec.update(
+            kind='frame',
+            item_cols=encode(list(getattr(data, 'item_cols', df.columns))),
+        )
+        manifest['data'] = spec
+        data._saved = key
+
+
+def read_data(path, spec):
+    if spec['kind'] == 'file':
+        return load_data(
+            spec['path'], item_cols=spec['item_cols'], id_col=spec['id_col']
+        )
+    if spec['kind'] == 'mapped':
+        return Data_Mapped(spec['path'], item_cols=decode(spec['item_cols']))
+    if spec['kind'] == 'sqlite':
+        return load_data(
+            Path(spec['path']),
+            table=spec['table'],
+            item_cols=spec['item_cols'],
+            id_col=spec['id_col'],
+        )
+    df = read_frame(path, spec, mmap=True)
+    return Data_DataFrame(df, item_cols=decode(spec['item_cols']))
+
+
+def write_frame(df, path):
+    """Write `df` in a columnar format.
+    Feather if pyarrow is installed (and can handle the data),
+    otherwise one `.npy` file per column in a directory.
+
+    Arguments
+    ---------
+    df : DataFrame
+    path : Path
+        Location to write to, without suffix.
+
+    Returns
+    -------
+    dict
+        Specification of the written frame, used by `read_frame`.
+    """
+
+    spec = {
+        'index': encode(df.index.name),
+        'columns': encode(list(df.columns)),
+        'dtypes': [str(i) for i in df.dtypes],
+        'rows': len(df),
+    }
+    columns = {str(i): df.iloc[:, i] for i in range(df.shape[1])}
+
+    if feather is not None:
+        file = path.with_suffix('.feather')
+        try:
+            frame = pd.DataFrame({'index': df.index, **columns})
+            feather.write_feather(frame.reset_index(drop=True), file)
+            spec.update(format='feather', file=file.name)
+            return spec
+        except (TypeError, ValueError, ArithmeticError, NotImplementedError):
+            if file.exists():
+                file.unlink()
+
+    path.mkdir()
+    np.save(path / 'index.npy', df.index.to_numpy(dtype=object), allow_pickle=True)
+    for name, series in columns.items():
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufcmM':
+            values = series.to_numpy()
+        else:
+            values = series.to_numpy(dtype=object)
+        np.save(path / f"{name}.npy", values, allow_pickle=True)
+    spec.update(format='npy', file=path.name)
+    return spec
+
+
+def read_frame(path, spec, mmap=False):
+    "Read a frame written by `write_frame`; optionally memory-mapped."
+    file = Path(path) / spec['file']
+    names = decode(spec['columns'])
+    if spec['format'] == 'feather':
+        frame = feather.read_table(file, memory_map=mmap).to_pandas()
+        index = frame.pop('index')
+        data = {name: frame[str(i)] for i, name in enumerate(names)}
+    else:
+        index = load_array(file / 'index.npy')
+        data = {
+            name: cast(pd.Series(load_array(file / f"{i}.npy", mmap)), dtype)
+            for i, (name, dtype) in enumerate(zip(names, spec['dtypes']))
+        }
+    # passing `columns` converts datetime columns to objects (pandas 1.x)
+    df = pd.DataFrame(data)
+    df.index = pd.Index(list(index), name=decode(spec['index']))
+    return df
+
+
+def load_array(file, mmap=False):
+    "Load a `.npy` file; arrays without python objects can be memory-mapped."
+    if mmap:
+        try:
+            return np.load(file, mmap_mode='r')
+        except ValueError:
+            pass
+    return np.load(file, allow_pickle=True)
+
+
+def remove_unreferenced(path, manifest):
+    "Remove the parts written by earlier saves that are no longer used."
+    referenced = {
+        part['file']
+        for part in manifest['annotations'] + manifest['timings']
+    }
+    if manifest.get('data') and 'file' in manifest['data']:
+        referenced.add(manifest['data']['file'])
+    for item in path.iterdir():
+        if not item.name.startswith(('annotations-', 'data-', 'timings-')):
+            continue
+        if item.name in referenced:
+            continue
+        if item.is_dir():
+            shutil.rmtree(item)
+        else:
+            item.unlink()
+
+
+def serializable(kwargs):
+    "Keep the kwargs that can be stored as json; warn about the others."
+    output = {}
+    for key, value in kwargs.items():
+        try:
+            json.dumps(encode(value))
+        except TypeError:
+            warnings.warn(
+                f"Setting '{key}' cannot be saved and will not be restored."
+            )
+            continue
+        output[key] = encode(value)
+    return output
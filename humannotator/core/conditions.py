@@ -0,0 +1,279 @@
+"""
+This module compiles the conditions of task dependencies. A condition is
+written as a pandas query statement. Instead of evaluating the statement with
+`DataFrame.query` on every item, it is parsed once into a function that takes
+the current annotation record (a dict) and returns True or False. A vectorized
+variant takes a dataframe and returns a boolean series with the same result
+for every row.
+
+The following subset of the query syntax is supported:
+- column names; names that are not identifiers are quoted with backticks
+- literals: strings, numbers, True, False, None, lists and tuples
+- comparisons: ==, !=, <, <=, >, >=, in, not in (comparisons can be chained)
+- boolean logic: and, or, not, &, |, ~
+
+As in pandas, comparing a missing value evaluates to False, except for `!=`
+and `not in` which evaluate to True. Comparing a column to a list with `==`
+or `!=` tests for membership.
+"""
+
+
+# standard library
+import ast
+import io
+import operator
+import re
+import tokenize
+from datetime import datetime
+from functools import lru_cache, reduce
+
+# third party
+import pandas as pd
+
+
+OPERATORS = {
+    ast.Eq:    operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt:    operator.lt,
+    ast.LtE:   operator.le,
+    ast.Gt:    operator.gt,
+    ast.GtE:   operator.ge,
+    ast.In:    lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+NEGATIVE = (ast.NotEq, ast.NotIn)
+BOOLEAN_TOKENS = {'&': 'and', '|': 'or', '~': 'not'}
+
+
+@lru_cache(maxsize=None)
+def compile_condition(condition, vectorized=False):
+    """Compile a query statement into a function on an annotation record.
+
+    Arguments
+    ---------
+    condition : str
+        Pandas query statement.
+    vectorized : boolean, default False
+        If True, compile into a function on a dataframe of annotations.
+
+    Returns
+    -------
+    function
+        Takes a dict of column names and values, returns a boolean.
+        If vectorized: takes a dataframe, returns a boolean series.
+
+    Raises
+    ------
+    ValueError
+        If the statement cannot be parsed or uses unsupported syntax.
+    """
+
+    expression, names = preprocess(condition)
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError:
+        raise ValueError(f"Condition '{condition}' is not a valid statement.")
+    evaluate = Compiler(condition, names, vectorized).visit(tree.body)
+    if vectorized:
+        return lambda frame: truth(evaluate(frame), frame.index)
+    return lambda record: bool(evaluate(record))
+
+
+def preprocess(condition):
+    """
+    Replace backtick quoted names with identifiers and give the bitwise
+    operators the precedence of their boolean cousins (as pandas does).
+    """
+
+    names = {}
+    def quote(match):
+        name = f"__humannotator_{len(names)}__"
+        names[name] = match[1]
+        return name
+    expression = re.sub(r"`([^`]*)`", quote, condition)
+
+    try:
+        tokens = [
+            (tokenize.NAME, BOOLEAN_TOKENS[token.string])
+            if token.type == tokenize.OP and token.string in BOOLEAN_TOKENS
+            else (token.type, token.string)
+            for token in tokenize.generate_tokens(
+                io.StringIO(expression).readline
+            )
+        ]
+    except (tokenize.TokenError, IndentationError):
+        raise ValueError(f"Condition '{condition}' is not a valid statement.")
+    return tokenize.untokenize(tokens), names
+
+
+class Compiler(ast.NodeVisitor):
+    """
+    Compiles the nodes of a condition into functions.
+    The functions take a record (dict) or, if vectorized, a dataframe.
+    """
+
+    def __init__(self, condition, names, vectorized=False):
+        self.condition = condition
+        self.names = names
+        self.vectorized = vectorized
+
+    def generic_visit(self, node):
+        raise ValueError(
+            f"Unsupported syntax ({type(node).__name__}) "
+            f"in condition '{self.condition}'. "
+            "Use comparisons of columns with literals combined with "
+            "and/or/not."
+        )
+
+    def visit_Name(self, node):
+        name = self.names.get(node.id, node.id)
+        if name in ('True', 'False', 'None'):
+            value = {'True': True, 'False': False, 'None': None}[name]
+            return lambda record: value
+        if self.vectorized:
+            return lambda frame: column(frame, name)
+        return lambda record: record.get(name)
+
+    def visit_Constant(self, node):
+        value = node.value
+        return lambda record: value
+
+    # python < 3.8
+    def visit_Num(self, node):
+        return lambda record: node.n
+
+    def visit_Str(self, node):
+        return lambda record: node.s
+
+    def visit_NameConstant(self, node):
+        return lambda record: node.value
+
+    def visit_List(self, node):
+        values = [self.literal(i) for i in node.elts]
+        return lambda record: values
+
+    visit_Tuple = visit_List
+
+    def visit_UnaryOp(self, node):
+        if isinstance(node.op, ast.Not):
+            operand = self.visit(node.operand)
+            if self.vectorized:
+                return lambda frame: ~truth(operand(frame), frame.index)
+            return lambda record: not operand(record)
+        if isinstance(node.op, (ast.USub, ast.UAdd)):
+            value = self.literal(node)
+            return lambda record: value
+        return self.generic_visit(node)
+
+    def visit_BoolOp(self, node):
+        values = [self.visit(i) for i in node.values]
+        if self.vectorized:
+            op = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+            return lambda frame: reduce(
+                op, (truth(i(frame), frame.index) for i in values)
+            )
+        if isinstance(node.op, ast.And):
+            return lambda record: all(i(record) for i in values)
+        return lambda record: any(i(record) for i in values)
+
+    def visit_Compare(self, node):
+        operands = [self.visit(node.left)]
+        operands += [self.visit(i) for i in node.comparators]
+        ops = [type(op) for op in node.ops]
+
+        if self.vectorized:
+            def evaluate(frame):
+                values = [i(frame) for i in operands]
+                return reduce(operator.and_, (
+                    compare_vectorized(op, a, b, frame.index)
+                    for op, a, b in zip(ops, values, values[1:])
+                ))
+            return evaluate
+
+        def evaluate(record):
+            values = [i(record) for i in operands]
+            return all(
+                compare(op, a, b)
+                for op, a, b in zip(ops, values, values[1:])
+            )
+        return evaluate
+
+    def literal(self, node):
+        "Evaluate a node that has to be a literal."
+        try:
+            return ast.literal_eval(node)
+        except ValueError:
+            return self.generic_visit(node)
+
+
+def compare(op, a, b):
+    "Compare two values following the pandas semantics for missing values."
+    if isinstance(b, (list, tuple)):
+        op = {ast.Eq: ast.In, ast.NotEq: ast.NotIn}.get(op, op)
+    if isnull(a) or isnull(b):
+        return op in NEGATIVE
+    if isinstance(a, datetime) and isinstance(b, str):
+        b = pd.Timestamp(b)
+    elif isinstance(b, datetime) and isinstance(a, str):
+        a = pd.Timestamp(a)
+    try:
+        return bool(OPERATORS[op](a, b))
+    except TypeError:
+        return op in NEGATIVE
+
+
+def compare_vectorized(op, a, b, index):
+    "Compare series and/or scalars row by row, see `compare`."
+    if not isinstance(a, pd.Series):
+        if not isinstance(b, pd.Series):
+            return pd.Series(compare(op, a, b), index=index)
+        flipped = {
+            ast.Lt: ast.Gt, ast.LtE: ast.GtE, ast.Gt: ast.Lt, ast.GtE: ast.LtE,
+        }
+        if op in (ast.In, ast.NotIn):
+            return pd.Series([compare(op, a, i) for i in b], index=index)
+        return compare_vectorized(flipped.get(op, op), b, a, index)
+
+    membership = (ast.Eq, ast.NotEq, ast.In, ast.NotIn)
+    if isinstance(b, (list, tuple)) and op in membership:
+        isin = a.isin([i for i in b if not isnull(i)]) & a.notna()
+        return ~isin if op in (ast.NotEq, ast.NotIn) else isin
+    result = pd.Series(op in NEGATIVE, index=index)
+    valid = a.notna()
+    if isinstance(b, pd.Series):
+        valid &= b.notna()
+        b = b[valid]
+    elif isnull(b):
+        return result
+    try:
+        compared = OPERATORS[op](a[valid], b)
+    except TypeError:
+        compared = [
+            compare(op, x, y) for x, y in
+            zip(a[valid], b if isinstance(b, pd.Series) else [b] * valid.sum())
+        ]
+    result[valid] = pd.Series(compared, index=a.index[valid]).astype(bool)
+    return result
+
+
+def column(frame, name):
+    "Return the column `name`; a column of nulls if it does not exist."
+    if name in frame.columns:
+        return frame[name]
+    return pd.Series(None, index=frame.index, dtype=object)
+
+
+def truth(value, index):
+    "Truth value of each row as a boolean series; nulls are False."
+    if isinstance(value, pd.Series):
+        return value.astype(object).fillna(False).astype(bool)
+    return pd.Series(bool(value), index=index)
+
+
+def isnull(value):
+    if isinstance(value, (list, tuple)):
+        return False
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
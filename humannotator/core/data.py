@@ -1,18 +1,44 @@
 """
-This module contains the Data class. Currently only dataframes or data that
-can be converted into a dataframe are accepted. In the future support for other
-data types may be added.
+This module contains the Data class. Dataframes and data that can be converted
+into a dataframe are held in memory. Csv and parquet files are read lazily:
+only an index of the ids is built, rows are fetched per chunk when displayed.
+SQLite tables are queried one row at a time.
+
+Data can also be shared between processes (e.g. several Jupyter kernels) on
+the same machine: it is then written once to a directory of column files that
+every process memory-maps read-only, instead of each holding its own copy.
 """
 
 
 # standard library
+import io
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
 from collections.abc import Sequence, Mapping
+from pathlib import Path, PurePath
 
 # third party
+import numpy as np
 import pandas as pd
+try:
+    import pyarrow.parquet as pq
+except ModuleNotFoundError:
+    pq = None
 
 # local
-from humannotator.utils import Base
+from humannotator.utils import Base, LRUCache, docstring_parameter
+from humannotator.core.journal import encode, decode
+
+
+CHUNKSIZE = 10000
+CACHE_CHUNKS = 8
+CACHE_ROWS = 256
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+MAPPED = 'columns.json'
 
 
 REGISTRY = {}
@@ -87,12 +113,524 @@ class Data_DataFrame(Data):
         return self[id].items()
 
 
-def load_data(data, **kwargs):
+@register
+class Data_File(Data):
+    """
+    Data_File
+    =========
+    Data read lazily from a csv or parquet file.
+    - On first access of `ids` the file is scanned once to build an index:
+      id -> (chunk, offset).
+    - `record(id)` only reads the chunk containing the id.
+    - The most recently used chunks are kept in a bounded cache.
+    - `data` reads the complete file into a dataframe; avoid on large files.
+    """
+
+    kind = PurePath
+
+    def __init__(
+        self,
+        data,
+        item_cols=None,
+        id_col=None,
+        chunksize=CHUNKSIZE,
+        cache_chunks=CACHE_CHUNKS,
+        read_options=None,
+        **kwargs
+    ):
+        self.path = Path(data)
+        try:
+            Reader = READERS[self.path.suffix.lower()]
+        except KeyError:
+            raise ValueError(
+                f"File type '{self.path.suffix}' is not supported. "
+                f"Use one of: {list(READERS)}."
+            )
+        self.reader = Reader(self.path, chunksize, read_options or {})
+        self.id_col = id_col
+        if item_cols is None:
+            item_cols = [i for i in self.reader.columns if i != id_col]
+        elif not isinstance(item_cols, list):
+            item_cols = [item_cols]
+        self.item_cols = item_cols
+        self.chunks = LRUCache(cache_chunks)
+        self._index = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(path={str(self.path)!r})"
+
+    @property
+    def ids(self):
+        "Ids of all records. The file is indexed on first access."
+        if self._index is None:
+            self._build_index()
+        return self._index
+
+    @property
+    def data(self):
+        "The complete file as a dataframe."
+        self.ids
+        return pd.concat(
+            [self._chunk(i) for i in range(len(self._sizes))]
+        )[self.item_cols]
+
+    def __getitem__(self, id):
+        position = self.ids.get_loc(id)
+        chunk = self._chunk(self._chunk_nos[position])
+        return chunk.iloc[self._offsets[position]][self.item_cols]
+
+    def record(self, id):
+        return self[id].items()
+
+    def _build_index(self):
+        ids, sizes = [], []
+        for chunk_ids in self.reader.index(self.id_col):
+            ids.append(chunk_ids)
+            sizes.append(len(chunk_ids))
+        start = np.cumsum([0] + sizes[:-1])
+        self._sizes = sizes
+        self._chunk_nos = np.repeat(np.arange(len(sizes)), sizes)
+        self._offsets = np.arange(sum(sizes)) - np.repeat(start, sizes)
+        self._index = pd.Index(np.concatenate(ids) if ids else [])
+
+    def _chunk(self, i):
+        return self.chunks(i, self.reader.chunk, i, self.id_col)
+
+
+@register
+class Data_SQLite(Data):
+    """
+    Data_SQLite
+    ===========
+    Data queried from a table in a SQLite database.
+    - `ids` are selected from the (indexed) id column on first access.
+    - `record(id)` runs a prepared statement selecting the `item_cols`.
+    - Reads from a database file. A connection is reopened from its file,
+      so that it can be used from another thread (to prefetch items).
+      The connection is reused, guarded by a lock.
+    - The most recently used rows are kept in a bounded cache.
+    - `data` reads the complete table into a dataframe; avoid on large tables.
+    """
+
+    kind = sqlite3.Connection
+
+    def __init__(
+        self,
+        data,
+        item_cols=None,
+        id_col=None,
+        table=None,
+        cache_rows=CACHE_ROWS,
+        **kwargs
+    ):
+        if table is None:
+            raise ValueError("Set `table` to read data from a SQLite database.")
+        if isinstance(data, sqlite3.Connection):
+            data = data.execute("PRAGMA database_list").fetchone()[2]
+            if not data:
+                raise ValueError(
+                    "An in-memory database cannot be read from another "
+                    "thread. Save the database to a file."
+                )
+        self.connection = connect(data)
+        self.table = table
+        self.id_col = id_col or 'rowid'
+        columns = [
+            row[1] for row in
+            self.connection.execute(f"PRAGMA table_info({quote(table)})")
+        ]
+        if not columns:
+            raise ValueError(f"Table '{table}' does not exist.")
+        if item_cols is None:
+            item_cols = [i for i in columns if i != id_col]
+        elif not isinstance(item_cols, list):
+            item_cols = [item_cols]
+        self.item_cols = item_cols
+        self.rows = LRUCache(cache_rows)
+        self._lock = threading.Lock()
+        self._ids = None
+        self._sql_record = (
+            f"SELECT {', '.join(quote(i) for i in item_cols)} "
+            f"FROM {quote(table)} WHERE {quote(self.id_col)} = ?"
+        )
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(table={self.table!r})"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['connection'] = self.database
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        state['connection'] = connect(state['connection'])
+        state['_lock'] = threading.Lock()
+        self.__dict__.update(state)
+
+    def __len__(self):
+        if self._ids is not None:
+            return len(self._ids)
+        return self._query(f"SELECT COUNT(*) FROM {quote(self.table)}")[0][0]
+
+    @property
+    def database(self):
+        "Location of the database file."
+        return self._query("PRAGMA database_list")[0][2]
+
+    @property
+    def ids(self):
+        "Ids of all records, in order of the id column."
+        if self._ids is None:
+            id_col = quote(self.id_col)
+            rows = self._query(
+                f"SELECT {id_col} FROM {quote(self.table)} ORDER BY {id_col}"
+            )
+            self._ids = pd.Index([row[0] for row in rows])
+        return self._ids
+
+    @property
+    def data(self):
+        "The complete table as a dataframe."
+        columns = ', '.join(quote(i) for i in [self.id_col] + self.item_cols)
+        with self._lock:
+            return pd.read_sql_query(
+                f"SELECT {columns} FROM {quote(self.table)} "
+                f"ORDER BY {quote(self.id_col)}",
+                self.connection,
+                index_col=self.id_col,
+            )
+
+    def __getitem__(self, id):
+        return self.rows(id, self._fetch, id)
+
+    def record(self, id):
+        return self[id].items()
+
+    def _fetch(self, id):
+        rows = self._query(self._sql_record, (id,))
+        if not rows:
+            raise KeyError(id)
+        return pd.Series(rows[0], index=self.item_cols, name=id)
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+
+class Data_Mapped(Data):
+    """
+    Data_Mapped
+    ===========
+    Read-only data memory-mapped from a directory of column files.
+    Processes mapping the same directory share one copy in the page cache.
+    - Numeric, boolean and datetime columns are stored as `.npy` arrays.
+    - Text columns are stored as one block of utf-8 encoded bytes with an
+      array of offsets, so that they can be memory-mapped as well.
+    - Other columns are pickled and loaded into memory.
+    - Only the ids are loaded into memory (for the lookup of rows).
+    - `data` builds the complete dataframe; avoid on large data.
+    See `write_mapped` for writing the directory.
+    """
+
+    def __init__(self, data, item_cols=None, **kwargs):
+        self.path = Path(data)
+        spec = json.loads((self.path / MAPPED).read_text(encoding='utf-8'))
+        self.columns = {
+            decode(column['name']): Column(self.path, str(i), column)
+            for i, column in enumerate(spec['columns'])
+        }
+        index = Column(self.path, 'index', spec['index'])
+        self.ids = pd.Index(index.to_numpy(), name=decode(spec['name']))
+        if item_cols is None:
+            item_cols = list(self.columns)
+        elif not isinstance(item_cols, list):
+            item_cols = [item_cols]
+        self.item_cols = item_cols
+
+    def __getstate__(self):
+        return {'path': self.path, 'item_cols': self.item_cols}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['item_cols'])
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(path={str(self.path)!r})"
+
+    @property
+    def data(self):
+        "The complete data as a dataframe."
+        return pd.DataFrame(
+            {name: self.columns[name].to_numpy() for name in self.item_cols},
+            index=self.ids,
+        )
+
+    def __getitem__(self, id):
+        position = self.ids.get_loc(id)
+        return pd.Series(
+            [self.columns[name][position] for name in self.item_cols],
+            index=self.item_cols,
+            name=id,
+            dtype=object,
+        )
+
+    def record(self, id):
+        return self[id].items()
+
+
+class Column(object):
+    "Column of `Data_Mapped`; see `write_column` for the kinds of columns."
+
+    def __init__(self, folder, name, spec):
+        self.kind = spec['kind']
+        self.dtype = spec['dtype']
+        if self.kind == 'array':
+            self.values = np.load(folder / f"{name}.npy", mmap_mode='r')
+        elif self.kind == 'text':
+            self.offsets = np.load(folder / f"{name}.offsets.npy", mmap_mode='r')
+            self.nulls = np.load(folder / f"{name}.nulls.npy", mmap_mode='r')
+            if self.offsets[-1]:
+                self.text = np.memmap(folder / f"{name}.bin", np.uint8, 'r')
+            else:
+                self.text = np.empty(0, dtype=np.uint8)
+        else:
+            self.values = np.load(folder / f"{name}.npy", allow_pickle=True)
+
+    def __len__(self):
+        if self.kind == 'text':
+            return len(self.nulls)
+        return len(self.values)
+
+    def __getitem__(self, position):
+        if self.kind == 'text':
+            if self.nulls[position]:
+                return None
+            start, end = self.offsets[position:position + 2]
+            return self.text[start:end].tobytes().decode('utf-8')
+        value = self.values[position]
+        if isinstance(value, np.datetime64):
+            return pd.Timestamp(value)
+        if isinstance(value, np.timedelta64):
+            return pd.Timedelta(value)
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    def to_numpy(self):
+        if self.kind == 'text':
+            return np.array([self[i] for i in range(len(self))], dtype=object)
+        if self.kind == 'object':
+            return pd.Series(self.values).astype(self.dtype).to_numpy()
+        return self.values
+
+
+def write_mapped(df, path):
+    """Write `df` to the directory `path` so it can be used by `Data_Mapped`.
+    The directory is written under a temporary name and then renamed.
+    If another process has written it in the meantime, its version is kept.
+    """
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.mkdir()
+    spec = {
+        'name': encode(df.index.name),
+        'index': write_column(df.index.to_series(), tmp, 'index'),
+        'columns': [
+            {'name': encode(name), **write_column(series, tmp, str(i))}
+            for i, (name, series) in enumerate(df.items())
+        ],
+    }
+    (tmp / MAPPED).write_text(json.dumps(spec), encoding='utf-8')
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp)
+
+
+def write_column(series, folder, name):
+    """Write a column in the layout that fits its values:
+    - array: numeric, boolean or datetime values as a `.npy` array.
+    - text: strings (or nulls) as utf-8 bytes, offsets and a null mask.
+    - object: any other values as a pickled `.npy` array.
+    Returns the specification of the column.
+    """
+
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufmM':
+        np.save(folder / f"{name}.npy", series.to_numpy())
+        return {'kind': 'array', 'dtype': str(dtype)}
+    if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+        nulls = series.isna().to_numpy()
+        encoded = [
+            b'' if null else value.encode('utf-8')
+            for value, null in zip(series, nulls)
+        ]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(i) for i in encoded], out=offsets[1:])
+        (folder / f"{name}.bin").write_bytes(b''.join(encoded))
+        np.save(folder / f"{name}.offsets.npy", offsets)
+        np.save(folder / f"{name}.nulls.npy", nulls)
+        return {'kind': 'text', 'dtype': 'object'}
+    np.save(
+        folder / f"{name}.npy", series.to_numpy(dtype=object), allow_pickle=True
+    )
+    return {'kind': 'object', 'dtype': str(dtype)}
+
+
+def connect(path):
+    "Open a connection to an existing database; shareable between threads."
+    if not Path(path).is_file():
+        raise FileNotFoundError(f"Database '{path}' does not exist.")
+    return sqlite3.connect(str(path), check_same_thread=False)
+
+
+def quote(name):
+    "Quote an identifier for use in SQL."
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+class CSVReader(object):
+    """
+    Reads a csv file in chunks of rows.
+    While indexing, the byte offset of every chunk is recorded, so that a
+    chunk can be read without parsing the preceding part of the file.
+    Quoted fields may contain line breaks.
+    """
+
+    def __init__(self, path, chunksize, options):
+        self.path = path
+        self.chunksize = chunksize
+        self.options = options
+        self.quotechar = options.get('quotechar', '"').encode()
+        self.offsets = []
+        with self.path.open('rb') as f:
+            self.header, _ = self._read_records(f, 1)
+        self.columns = self._parse(b'', nrows=0).columns.to_list()
+
+    def index(self, id_col):
+        "Yield the ids per chunk."
+        self.offsets = []
+        n_rows = 0
+        with self.path.open('rb') as f:
+            self._read_records(f, 1)
+            while True:
+                offset = f.tell()
+                block, count = self._read_records(f, self.chunksize)
+                if not count:
+                    break
+                self.offsets.append((offset, len(block)))
+                if id_col is None:
+                    n = len(self._parse(block, usecols=[0]))
+                    yield np.arange(n_rows, n_rows + n)
+                    n_rows += n
+                else:
+                    yield self._parse(block, usecols=[id_col])[id_col].values
+
+    def chunk(self, i, id_col):
+        offset, length = self.offsets[i]
+        with self.path.open('rb') as f:
+            f.seek(offset)
+            block = f.read(length)
+        df = self._parse(block)
+        if id_col is not None:
+            df = df.set_index(id_col)
+        return df
+
+    def _parse(self, block, **kwargs):
+        buffer = io.BytesIO(self.header + block)
+        return pd.read_csv(buffer, **{**self.options, **kwargs})
+
+    def _read_records(self, f, n):
+        "Read up to `n` records; returns the raw bytes and number of records."
+        lines, count, quoted = [], 0, False
+        while count < n:
+            line = f.readline()
+            if not line:
+                break
+            lines.append(line)
+            if line.count(self.quotechar) % 2:
+                quoted = not quoted
+            if not quoted:
+                count += 1
+        return b''.join(lines), count
+
+
+class ParquetReader(object):
+    """
+    Reads a parquet file per row group. Requires pyarrow.
+    The index stored by pandas (if any) is used for the ids,
+    like the index of a dataframe.
+    """
+
+    def __init__(self, path, chunksize, options):
+        if pq is None:
+            raise ImportError("Reading parquet files requires pyarrow.")
+        self.file = pq.ParquetFile(path, **options)
+        metadata = self.file.schema_arrow.pandas_metadata or {}
+        self.index_columns = metadata.get('index_columns', [])
+        self.columns = [
+            i for i in self.file.schema_arrow.names
+            if i not in self.index_columns
+        ]
+        self.sizes = [
+            self.file.metadata.row_group(i).num_rows
+            for i in range(self.file.num_row_groups)
+        ]
+        self.starts = np.cumsum([0] + self.sizes[:-1])
+
+    def index(self, id_col):
+        "Yield the ids per row group."
+        for i in range(self.file.num_row_groups):
+            if id_col is None:
+                yield self._ids(i)
+            else:
+                group = self.file.read_row_group(i, columns=[id_col])
+                yield group.column(0).to_numpy()
+
+    def chunk(self, i, id_col):
+        df = self.file.read_row_group(i, use_pandas_metadata=True).to_pandas()
+        if id_col is not None:
+            df = df.set_index(id_col)
+        else:
+            df.index = self._ids(i)
+        return df
+
+    def _ids(self, i):
+        "Ids of row group `i`: the stored index, or else the row numbers."
+        start, n = self.starts[i], self.sizes[i]
+        stored = [j for j in self.index_columns if isinstance(j, str)]
+        if stored:
+            group = self.file.read_row_group(
+                i, columns=[], use_pandas_metadata=True
+            )
+            return group.to_pandas().index
+        if self.index_columns:
+            # a RangeIndex is stored as metadata only
+            spec = self.index_columns[0]
+            return spec['start'] + spec['step'] * np.arange(start, start + n)
+        return np.arange(start, start + n)
+
+
+READERS = {
+    '.csv': CSVReader,
+    '.parquet': ParquetReader,
+}
+
+
+@docstring_parameter(
+    chunksize=CHUNKSIZE, cache_chunks=CACHE_CHUNKS, cache_rows=CACHE_ROWS,
+)
+def load_data(data, mmap=None, **kwargs):
     """Prepare data for the Annotator.
 
     Arguments
     ---------
-    data : list-/dict-like, Series or DataFrame
+    data : list-/dict-like, Series, DataFrame, SQLite connection or path
+        Paths may point to a csv, parquet or SQLite file,
+        or to a directory written with `mmap`.
+        SQLite connections are reopened from their database file.
     item_cols : str or list of str, default None
         Name(s) of dataframe column(s) to display when annotating.
         By default: display all columns.
@@ -100,13 +638,48 @@ def load_data(data, **kwargs):
         Name of dataframe column to use as index.
         By default: use the dataframe's index.
 
+    Other parameters
+    ----------------
+    mmap : str or Path, default None
+        Directory in which to store the data for memory-mapping.
+        Written from `data` if it does not exist yet; reused otherwise.
+        Processes on the same machine that map the same directory
+        share one copy of the data. Other processes can also pass the
+        directory as `data`.
+
+    Only used when reading from a csv or parquet file.
+    chunksize : int, default {chunksize}
+        Number of rows per chunk (csv only; parquet uses its row groups).
+    cache_chunks : int, default {cache_chunks}
+        Number of chunks to keep in memory.
+    read_options : dict, default None
+        Options passed to `pandas.read_csv` or `pyarrow.parquet.ParquetFile`.
+
+    Only used when reading from a SQLite database.
+    table : str
+        Name of the table to read from.
+        If `id_col` is not set, the rowid of the table is used.
+    cache_rows : int, default {cache_rows}
+        Number of rows to keep in memory.
+
     Returns
     -------
     data:
         Data object that is used for annotating.
-        The data itself will be converted to a dataframe.
+        The data itself will be converted to a dataframe,
+        unless it is read from a file.
     """
 
+    if isinstance(data, str):
+        data = Path(data)
+    if mmap is not None:
+        if not (Path(mmap) / MAPPED).exists():
+            write_mapped(pd.DataFrame(load_data(data, **kwargs).data), mmap)
+        return Data_Mapped(mmap, **kwargs)
+    if isinstance(data, PurePath) and (Path(data) / MAPPED).exists():
+        return Data_Mapped(data, **kwargs)
+    if isinstance(data, PurePath) and data.suffix.lower() in SQLITE_SUFFIXES:
+        return Data_SQLite(data, **kwargs)
     if isinstance(data, list):
         data = pd.DataFrame(data).add_prefix('item_')
     elif isinstance(data, dict):
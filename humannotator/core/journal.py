@@ -0,0 +1,124 @@
+"""
+This module contains the write-ahead journal for annotations. Every completed
+annotation is appended to the journal as a line of JSON. Writing an entry
+costs a small constant amount of time, regardless of the size of the data or
+the number of annotations. The journal is synced to disk in batches.
+
+After a crash, the annotations can be recovered by replaying the journal on
+top of the last saved annotator. Later entries overwrite earlier ones, so
+replaying the complete journal on top of any snapshot is safe.
+"""
+
+
+# standard library
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+# third party
+import numpy as np
+import pandas as pd
+
+# local
+from humannotator.utils import Base
+
+
+SYNC_EVERY = 32
+
+
+class Journal(Base):
+    """
+    Journal
+    =======
+    Append-only journal of annotations in JSON lines format.
+    - Each entry holds an id and the values stored for it.
+    - Entries are flushed immediately and fsynced every `sync_every` entries.
+    - Incomplete entries at the end of the file (after a crash) are skipped.
+
+    Attributes
+    ----------
+    path : Path
+        Location of the journal file.
+    sync_every : int
+        Number of entries after which the journal is synced to disk.
+    """
+
+    def __init__(self, path, sync_every=SYNC_EVERY):
+        self.path = Path(path)
+        self.sync_every = sync_every
+        self._file = None
+        self._pending = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_file=None, _pending=0)
+        return state
+
+    def __repr__(self):
+        return f"Journal(path={str(self.path)!r})"
+
+    def append(self, id, values):
+        "Append an entry for `id`."
+        entry = {'id': encode(id), 'values': encode(values)}
+        if self._file is None:
+            self._file = self.path.open('a', encoding='utf-8')
+        self._file.write(json.dumps(entry) + '\n')
+        self._file.flush()
+        self._pending += 1
+        if self._pending >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        "Force the appended entries to disk."
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def replay(self):
+        "Yield the (id, values) of every complete entry in order."
+        if not self.path.exists():
+            return None
+        with self.path.open(encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                yield decode(entry['id']), decode(entry['values'])
+
+
+def encode(value):
+    "Convert a value to something json can serialize."
+    if isinstance(value, dict):
+        return {str(k): encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode(i) for i in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, (datetime, date)):
+        if pd.isna(value):
+            return None
+        return {'$date': pd.Timestamp(value).isoformat()}
+    if isinstance(value, float) and value != value:
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+def decode(value):
+    "Inverse of `encode`."
+    if isinstance(value, dict):
+        if set(value) == {'$date'}:
+            return pd.Timestamp(value['$date'])
+        return {k: decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode(i) for i in value]
+    return value
@@ -0,0 +1,119 @@
+"""
+This module divides the work between annotators and combines their results.
+The ids are partitioned by hash, so every annotator gets the same shard every
+time, regardless of the order of the data or which ids were added later.
+A fraction of the ids can be put in every shard to measure the agreement
+between annotators.
+
+The annotations of the shards are combined with `merge_annotations`.
+Both are computed on whole arrays at once and scale to millions of ids.
+"""
+
+
+# third party
+import numpy as np
+import pandas as pd
+
+# local
+from humannotator.core.annotations import Annotations
+
+
+def shard_ids(ids, n_shards, shard_index, overlap=0.0):
+    """Select the ids of a shard.
+
+    Arguments
+    ---------
+    ids : list-like
+        Ids to partition.
+    n_shards : int
+        Number of shards.
+    shard_index : int
+        Shard to select (0 to n_shards - 1).
+    overlap : float, default 0.0
+        Fraction of the ids (0.0 to 1.0) that is put in every shard.
+
+    Returns
+    -------
+    Index
+        The ids of the shard, in the original order.
+    """
+
+    if not 0 <= shard_index < n_shards:
+        raise ValueError(
+            f"`shard_index` must be between 0 and {n_shards - 1}."
+        )
+    if not 0 <= overlap <= 1:
+        raise ValueError("`overlap` must be between 0.0 and 1.0.")
+    ids = ids if isinstance(ids, pd.Index) else pd.Index(list(ids))
+    hashes = hash_ids(ids)
+    # low bits assign the shard, high bits decide the overlap
+    shards = (hashes & np.uint64(0xFFFFFFFF)) % np.uint64(n_shards)
+    shared = (hashes >> np.uint64(32)) < np.uint64(overlap * 2**32)
+    return ids[(shards == shard_index) | shared]
+
+
+def hash_ids(ids):
+    """
+    Stable 64-bit hash per id (the same in every process and session).
+    Ids are hashed as text, so an id hashes the same whatever the dtype of
+    the index it is in (e.g. 5 in an int64 index and in an object index).
+    """
+    values = ids.astype(str).to_numpy(dtype=object)
+    # categorizing is slower when (as with ids) the values are unique
+    return pd.util.hash_array(values, categorize=False)
+
+
+def merge_annotations(annotations, keep='last'):
+    """Merge the annotations of several annotators into one table.
+
+    Arguments
+    ---------
+    annotations : list of Annotator, Annotations or DataFrame
+        Annotation sets to merge.
+    keep : {'first', 'last', False}, default 'last'
+        Which annotation to keep for ids that were annotated more than once:
+        - 'first': the earliest (by timestamp).
+        - 'last': the latest (by timestamp).
+        - False: keep all, e.g. to measure the agreement.
+
+    Returns
+    -------
+    DataFrame
+        Annotations ordered by the first appearance of their id.
+    """
+
+    frames = [frame(i) for i in annotations]
+    if not frames:
+        return pd.DataFrame()
+    if keep not in ('first', 'last', False):
+        raise ValueError("`keep` must be 'first', 'last' or False.")
+    df = pd.concat(frames)
+    if keep is False:
+        return df
+
+    codes, uniques = pd.factorize(df.index)
+    if len(uniques) == len(df):
+        return df
+    if 'timestamp' in df.columns:
+        timestamps = df['timestamp'].to_numpy(dtype='datetime64[ns]')
+        timestamps = timestamps.view(np.int64)
+    else:
+        timestamps = np.zeros(len(df), dtype=np.int64)
+    # sort by id (first appearance) and time; NaT sorts first
+    order = np.lexsort((timestamps, codes))
+    sorted_codes = codes[order]
+    boundary = np.ones(len(df), dtype=bool)
+    if keep == 'first':
+        boundary[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    else:
+        boundary[:-1] = sorted_codes[1:] != sorted_codes[:-1]
+    return df.iloc[order[boundary]]
+
+
+def frame(annotations):
+    "Dataframe of the annotations of an Annotator, Annotations or DataFrame."
+    if isinstance(annotations, pd.DataFrame):
+        return annotations
+    if isinstance(annotations, Annotations):
+        return annotations.data
+    return annotations.annotated
@@ -0,0 +1,563 @@
+"""
+This module contains the storage engine behind the Annotations class. Answers
+are buffered in preallocated, growable arrays (one per column) together with a
+hash index that maps each id to its row. The annotations dataframe is only
+built when it is requested, so storing an answer costs amortised O(1)
+regardless of how many annotations have already been collected.
+
+The SQLiteStore keeps the annotations in a SQLite database instead, so that
+annotators running in separate processes can work on the same annotations.
+Ids are leased before they are annotated to prevent duplicate work.
+"""
+
+
+# standard library
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Sequence
+from contextlib import contextmanager
+from pathlib import Path
+
+# third party
+import numpy as np
+import pandas as pd
+
+# local
+from humannotator.utils import Base
+from humannotator.core.journal import encode, decode
+
+
+LEASE = 600
+BATCH_SIZE = 8
+SCHEMA = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+CREATE TABLE IF NOT EXISTS annotations (
+    id    TEXT NOT NULL,
+    task  TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (id, task)
+);
+CREATE TABLE IF NOT EXISTS leases (
+    id      TEXT PRIMARY KEY,
+    owner   TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+SQL_UPSERT = """
+INSERT INTO annotations (id, task, value) VALUES (?, ?, ?)
+ON CONFLICT (id, task) DO UPDATE SET value = excluded.value
+"""
+SQL_TAKEN = """
+SELECT EXISTS (SELECT 1 FROM annotations WHERE id = ?)
+    OR EXISTS (SELECT 1 FROM leases WHERE id = ? AND owner != ?)
+"""
+
+
+class Store(Base):
+    """
+    Store
+    =====
+    Columnar append-only storage for annotations.
+    - Every column is stored in its own object array. Datetime columns
+      read from a dataframe keep a datetime64 array (returned as Timestamp).
+    - Rows are looked up through a hash index (id -> row).
+    - Arrays grow geometrically when they are full.
+    - Dropping an id only removes it from the index.
+      The space is reclaimed once the dead rows outnumber the live ones.
+
+    Attributes
+    ----------
+    columns : list of str
+        Names of the stored columns.
+    index : dict
+        Maps each stored id to its row, in order of insertion.
+    revision : int
+        Incremented on every change to the stored values.
+    changes : set
+        Ids that were written or dropped since the changes were last cleared.
+        Used to save the annotations incrementally.
+    """
+
+    def __init__(self, columns=None, capacity=1024):
+        self.columns  = []
+        self.index    = {}
+        self.size     = 0
+        self.revision = 0
+        self.changes  = set()
+        self._capacity = capacity
+        self._ids      = np.empty(capacity, dtype=object)
+        self._arrays   = {}
+        self.set_columns(columns or [])
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, id):
+        return id in self.index
+
+    def __iter__(self):
+        yield from self.index
+
+    def __getitem__(self, key):
+        id, column = key
+        return item(self._arrays[column], self.index[id])
+
+    def __setitem__(self, key, value):
+        id, column = key
+        row = self._row(id)
+        self._write(column, row, value)
+        self.changes.add(id)
+        self.revision += 1
+
+    def __setstate__(self, state):
+        state.setdefault('changes', set())
+        self.__dict__.update(state)
+
+    def __repr__(self):
+        return f"Store(columns={self.columns!r}, rows={len(self)})"
+
+    def set_columns(self, columns):
+        "Add missing columns. Existing columns are kept and moved to the end."
+        for column in columns:
+            if column not in self._arrays:
+                self._arrays[column] = np.empty(self._capacity, dtype=object)
+        columns = list(columns)
+        self.columns = columns + [i for i in self.columns if i not in columns]
+        self.revision += 1
+
+    def record(self, id):
+        "Return the values stored for `id` as a dict."
+        row = self.index[id]
+        return {
+            column: item(self._arrays[column], row) for column in self.columns
+        }
+
+    def update(self, ids, column, value):
+        "Set `column` to `value` for all `ids` at once."
+        rows = np.fromiter((self._row(id) for id in ids), dtype=np.intp)
+        self._write(column, rows, value)
+        self.changes.update(ids)
+        self.revision += 1
+
+    def drop(self, id):
+        "Remove `id` from the store. Ignored if the id is not stored."
+        if self.index.pop(id, None) is None:
+            return None
+        self.changes.add(id)
+        self.revision += 1
+        if self.size - len(self.index) > max(len(self.index), 1024):
+            self._compact()
+
+    def commit(self, id):
+        "Mark the values of `id` as complete. Values are stored immediately."
+        pass
+
+    def flush(self):
+        "Nothing to write; the values are stored immediately."
+        pass
+
+    def frame(self, dtypes=None, ids=None):
+        """
+        Build a dataframe from the live rows (by default: all of them),
+        cast to `dtypes` where possible.
+        """
+        dtypes = dtypes or {}
+        if ids is None:
+            rows = np.fromiter(self.index.values(), dtype=np.intp, count=len(self))
+        else:
+            rows = np.array([self.index[id] for id in ids], dtype=np.intp)
+        index = pd.Index(self._ids[rows].tolist())
+        data = {}
+        for column in self.columns:
+            values = self._arrays[column][rows]
+            data[column] = cast(
+                pd.Series(values, index=index, dtype=values.dtype),
+                dtypes.get(column),
+            )
+        return pd.DataFrame(data, index=index, columns=self.columns)
+
+    @classmethod
+    def from_frame(cls, df):
+        "Create a store holding the contents of a dataframe."
+        store = cls(capacity=max(len(df), 1024))
+        store.set_columns(df.columns)
+        store.index = {id: row for row, id in enumerate(df.index)}
+        store.size = len(df)
+        store._ids[:len(df)] = df.index.to_numpy(dtype=object)
+        for column in df.columns:
+            values = df[column]
+            # converting datetimes to objects is slow; keep them typed
+            if pd.api.types.is_datetime64_dtype(values):
+                store._arrays[column] = empty(store._capacity, values.dtype)
+                store._arrays[column][:len(df)] = values.to_numpy()
+            else:
+                store._arrays[column][:len(df)] = values.to_numpy(dtype=object)
+        return store
+
+    def _write(self, column, rows, value):
+        array = self._arrays[column]
+        if array.dtype.kind == 'M':
+            if pd.api.types.is_scalar(value) and pd.isna(value):
+                value = np.datetime64('NaT')
+            try:
+                array[rows] = value
+                return None
+            except (TypeError, ValueError):
+                # not a datetime; store the column as objects from now on
+                array = pd.Series(array).astype(object).to_numpy()
+                self._arrays[column] = array
+        array[rows] = value
+
+    def _row(self, id):
+        try:
+            return self.index[id]
+        except KeyError:
+            pass
+        if self.size == self._capacity:
+            self._resize(self._capacity * 2)
+        row = self.size
+        self.size += 1
+        self._ids[row] = id
+        self.index[id] = row
+        return row
+
+    def _resize(self, capacity, rows=None):
+        "Move the rows (by default: all rows) to arrays of size `capacity`."
+        if rows is None:
+            rows = np.arange(self.size)
+        def move(array):
+            new = empty(capacity, array.dtype)
+            new[:len(rows)] = array[rows]
+            return new
+        self._ids = move(self._ids)
+        self._arrays = {k: move(v) for k, v in self._arrays.items()}
+        self._capacity = capacity
+
+    def _compact(self):
+        "Drop the dead rows."
+        rows = np.fromiter(self.index.values(), dtype=np.intp, count=len(self))
+        self._resize(self._capacity, rows)
+        self.index = {id: row for row, id in enumerate(self.index)}
+        self.size = len(self.index)
+
+
+class SQLiteStore(Base):
+    """
+    SQLiteStore
+    ===========
+    Storage for annotations in a SQLite database.
+    Several annotators (in separate processes) can share one database.
+    - The database runs in WAL mode; reading does not block writing.
+    - Values are stored as JSON per (id, column).
+    - Writes are buffered and written in a single transaction
+      once `batch_size` annotations are completed, or on `flush`.
+    - Before an id is annotated it is leased (see `claim`), so annotators
+      sharing the database do not annotate the same ids.
+      A lease ends when the annotation is written or after `lease` seconds.
+
+    Attributes
+    ----------
+    path : Path
+        Location of the database.
+    columns : list of str
+        Names of the stored columns.
+    owner : str
+        Unique name under which this store leases ids.
+    """
+
+    def __init__(self, path, columns=None, lease=LEASE, batch_size=BATCH_SIZE):
+        self.path = Path(path)
+        self.columns = []
+        self.lease = lease
+        self.batch_size = batch_size
+        self._open()
+        self.set_columns(columns or [])
+
+    def __getstate__(self):
+        self.flush()
+        return {
+            'path': self.path,
+            'columns': self.columns,
+            'lease': self.lease,
+            'batch_size': self.batch_size,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._open()
+
+    def __len__(self):
+        return len(self._ids())
+
+    def __contains__(self, id):
+        if any(i == id for i, _ in self._pending):
+            return True
+        return bool(self._query(
+            "SELECT 1 FROM annotations WHERE id = ? LIMIT 1", (dump(id),)
+        ))
+
+    def __iter__(self):
+        yield from self._ids()
+
+    def __getitem__(self, key):
+        id, column = key
+        return self.record(id)[column]
+
+    def __setitem__(self, key, value):
+        self._pending[key] = value
+        self._revision += 1
+
+    def __repr__(self):
+        return f"SQLiteStore(path={str(self.path)!r})"
+
+    @property
+    def revision(self):
+        "Changes whenever this or any other connection changes the values."
+        return self._revision, self._query("PRAGMA data_version")[0][0]
+
+    def set_columns(self, columns):
+        "Add missing columns. Existing columns are kept and moved to the end."
+        columns = list(columns)
+        self.columns = columns + [i for i in self.columns if i not in columns]
+        self._revision += 1
+
+    def record(self, id):
+        "Return the values stored for `id` as a dict."
+        rows = self._query(
+            "SELECT task, value FROM annotations WHERE id = ?", (dump(id),)
+        )
+        values = {column: load(value) for column, value in rows}
+        values.update(
+            {column: v for (i, column), v in self._pending.items() if i == id}
+        )
+        if not values:
+            raise KeyError(id)
+        return {column: values.get(column) for column in self.columns}
+
+    def update(self, ids, column, value):
+        "Set `column` to `value` for all `ids` at once."
+        for id in ids:
+            self._pending[id, column] = value
+        self._revision += 1
+
+    def drop(self, id):
+        "Remove `id` from the store. Ignored if the id is not stored."
+        self._pending = {k: v for k, v in self._pending.items() if k[0] != id}
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM annotations WHERE id = ?", (dump(id),))
+        self._revision += 1
+
+    def commit(self, id):
+        "Mark the values of `id` as complete; write once the batch is full."
+        self._committed += 1
+        if self._committed >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        "Write the buffered values in one transaction and end their leases."
+        if not self._pending:
+            return None
+        rows = [
+            (dump(id), column, dump(value))
+            for (id, column), value in self._pending.items()
+        ]
+        leases = {(key, self.owner) for key, _, _ in rows}
+        with self._transaction() as connection:
+            connection.executemany(SQL_UPSERT, rows)
+            connection.executemany(
+                "DELETE FROM leases WHERE id = ? AND owner = ?", leases
+            )
+        self._pending = {}
+        self._committed = 0
+
+    def claim(self, ids, n=1):
+        """Lease up to `n` ids that are not annotated or leased by others.
+
+        Arguments
+        ---------
+        ids : iterable of ids
+            Candidates, tried in order.
+            An iterator is only consumed up to the last claimed id.
+        n : int, default 1
+            Number of ids to claim.
+
+        Returns
+        -------
+        list
+            The claimed ids.
+        """
+
+        claimed = []
+        if n < 1:
+            return claimed
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM leases WHERE expires < ?", (now,))
+            for id in ids:
+                if any(i == id for i, _ in self._pending):
+                    continue
+                key = dump(id)
+                taken, = connection.execute(
+                    SQL_TAKEN, (key, key, self.owner)
+                ).fetchone()
+                if taken:
+                    continue
+                connection.execute(
+                    "INSERT OR REPLACE INTO leases VALUES (?, ?, ?)",
+                    (key, self.owner, now + self.lease),
+                )
+                claimed.append(id)
+                if len(claimed) == n:
+                    break
+        return claimed
+
+    def release(self):
+        "End all leases held by this store."
+        with self._transaction() as connection:
+            connection.execute(
+                "DELETE FROM leases WHERE owner = ?", (self.owner,)
+            )
+
+    def close(self):
+        self.flush()
+        self.release()
+        self._connection.close()
+
+    def frame(self, dtypes=None):
+        "Build a dataframe from the stored rows, cast to `dtypes` where possible."
+        dtypes = dtypes or {}
+        records = {}
+        rows = self._query("SELECT id, task, value FROM annotations ORDER BY rowid")
+        for id, column, value in rows:
+            records.setdefault(load(id), {})[column] = load(value)
+        for (id, column), value in self._pending.items():
+            records.setdefault(id, {})[column] = value
+        index = pd.Index(list(records))
+        data = {
+            column: cast(
+                pd.Series(
+                    [i.get(column) for i in records.values()],
+                    index=index,
+                    dtype=object,
+                ),
+                dtypes.get(column),
+            )
+            for column in self.columns
+        }
+        return pd.DataFrame(data, index=index, columns=self.columns)
+
+    def _ids(self):
+        ids = {
+            load(id): None for id, in
+            self._query("SELECT DISTINCT id FROM annotations ORDER BY rowid")
+        }
+        ids.update({id: None for id, _ in self._pending})
+        return list(ids)
+
+    def _open(self):
+        self.owner = uuid.uuid4().hex
+        self._pending = {}
+        self._committed = 0
+        self._revision = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(self.path),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._connection.executescript(SCHEMA)
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+
+class Claims(Sequence):
+    """
+    Ids to annotate with a shared store.
+    Ids are claimed one at a time while iterating; ids that are annotated
+    or leased by another annotator in the meantime are skipped.
+    - Indexing returns the ids claimed so far, in order.
+    - The length is the number of claimed ids plus the candidates that were
+      not tried yet: the most ids this annotator can still end up with.
+    """
+
+    def __init__(self, store, ids):
+        self.store = store
+        self.ids = ids
+        self.claimed = []
+        self.tried = 0
+
+    def __len__(self):
+        return len(self.claimed) + len(self.ids) - self.tried
+
+    def __getitem__(self, i):
+        return self.claimed[i]
+
+    def __iter__(self):
+        candidates = self._candidates()
+        while True:
+            claimed = self.store.claim(candidates)
+            if not claimed:
+                return None
+            self.claimed.append(claimed[0])
+            yield claimed[0]
+
+    def _candidates(self):
+        for id in self.ids:
+            self.tried += 1
+            yield id
+
+
+def dump(value):
+    return json.dumps(encode(value))
+
+
+def load(text):
+    return decode(json.loads(text))
+
+
+def empty(capacity, dtype=object):
+    "Array of `capacity` missing values (None or NaT)."
+    if np.dtype(dtype).kind == 'M':
+        return np.full(capacity, np.datetime64('NaT'), dtype=dtype)
+    return np.empty(capacity, dtype=dtype)
+
+
+def item(array, row):
+    "Value at `row`; datetimes are returned as Timestamp."
+    value = array[row]
+    return pd.Timestamp(value) if array.dtype.kind == 'M' else value
+
+
+def cast(series, dtype):
+    """
+    Cast an object series to `dtype`.
+    Boolean series containing nulls and values that cannot be cast are left
+    as objects (the nulls would otherwise silently become False).
+    """
+
+    if dtype is None:
+        return series
+    if isinstance(dtype, str) and dtype == 'bool' and series.isna().any():
+        return series
+    try:
+        return series.astype(dtype)
+    except (TypeError, ValueError):
+        return series
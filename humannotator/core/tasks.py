@@ -16,6 +16,7 @@ from pandas import CategoricalDtype
 
 # local
 from humannotator.config import BOOLEAN_STATES, KEYS
+from humannotator.core.conditions import compile_condition
 from humannotator.utils import Base, option
 
 
@@ -61,6 +62,7 @@ class Task(Base):
         Any dependencies associated with the task:
         - A dependency consists of a condition and a value.
         - The condition should be a valid pandas query statement.
+          See `humannotator.core.conditions` for the supported syntax.
         - The interface will check the condition before prompting the user.
         - If the condition is met, the value will be automatically assigned.
     has_dependencies : boolean
@@ -175,6 +177,18 @@ class Task(Base):
     def _repr_pretty_(self, p, cycle):
         p.text(str(self))
 
+    def to_dict(self):
+        "Specification of the task; `task_factory(**spec)` recreates it."
+        return {
+            'kind': self.kind,
+            'name': self.name,
+            'instruction': self._instruction,
+            'nullable': self.nullable,
+            'dependencies': [
+                (i.condition, i.value) for i in self.dependencies
+            ],
+        }
+
 
 @register
 class Task_str(Task):
@@ -204,6 +218,11 @@ class Task_regex(Task):
     def invalid(self):
         return f"Input does not match pattern '{self.regex}'."
 
+    def to_dict(self):
+        spec = super().to_dict()
+        spec.update(regex=self.regex.pattern, flags=self.regex.flags)
+        return spec
+
     def __call__(self, value):
         value = super().__call__(value)
         if value is not None:
@@ -285,6 +304,11 @@ class Task_category(Task):
     def invalid(self):
         return f"Input not in categories {list(self.categories.keys())}."
 
+    def to_dict(self):
+        spec = super().to_dict()
+        spec.update(categories=self.categories)
+        return spec
+
     def __call__(self, value):
         value = super().__call__(value)
         if value is not None:
@@ -303,6 +327,11 @@ class Task_date(Task):
         super().__init__(*args, **kwargs)
         self.format = format
 
+    def to_dict(self):
+        spec = super().to_dict()
+        spec.update(format=self.format)
+        return spec
+
     def __call__(self, value):
         value = super().__call__(value)
         if value is not None:
@@ -395,9 +424,26 @@ def task_factory(kind, *args, **kwargs):
 
 
 class Dependency(Base):
+    """
+    Dependency
+    ==========
+    Condition and value that is assigned if the condition is met.
+    The condition is compiled (and validated) once on instantiation.
+    Call the dependency with an annotation record (dict) to evaluate it.
+    """
+
     def __init__(self, condition, value):
         self.condition = condition
         self.value     = value
+        compile_condition(condition)
+
+    def __call__(self, record):
+        "True if the condition is met by the annotation record."
+        return compile_condition(self.condition)(record)
+
+    def evaluate(self, frame):
+        "Boolean series; True for the rows of `frame` meeting the condition."
+        return compile_condition(self.condition, vectorized=True)(frame)
 
     def __eq__(self, other):
         if isinstance(other, Dependency):
@@ -0,0 +1,274 @@
+"""
+This module keeps track of how long the annotation takes. Every answered task
+is logged with the time at which the task was shown (start) and the time at
+which it was answered (end). The log is columnar: the times are stored as
+int64 nanoseconds since the epoch (UTC), the ids, tasks and users as codes.
+Appending a row costs amortised O(1).
+
+The throughput report is computed on the log arrays at once, so it stays fast
+on annotation tables with millions of rows.
+"""
+
+
+# standard library
+import time
+from collections import namedtuple
+
+# third party
+import numpy as np
+import pandas as pd
+
+# local
+from humannotator.utils import Base
+
+
+NANOSECONDS_PER_HOUR = 3600 * 10**9
+ThroughputReport = namedtuple('ThroughputReport', ['users', 'tasks', 'rate'])
+
+
+class Timings(Base):
+    """
+    Timings
+    =======
+    Columnar log of the time spent per task per item.
+    - Start and end are int64 epoch nanoseconds (UTC).
+    - Tasks and users are stored as codes into `tasks` and `users`.
+    - Arrays grow geometrically when they are full.
+
+    Attributes
+    ----------
+    tasks : list of str
+        Task names in order of first occurrence.
+    users : list
+        Users in order of first occurrence.
+    size : int
+        Number of logged rows.
+    saved : int
+        Number of rows that were saved (used to save incrementally).
+    """
+
+    def __init__(self, capacity=1024):
+        self.tasks = []
+        self.users = []
+        self.size = 0
+        self.saved = 0
+        self._saved = None
+        self._codes = {'tasks': {}, 'users': {}}
+        # first row appended per id; bounds the rows `drop` has to scan
+        self._first = {}
+        self._capacity = capacity
+        self._ids = np.empty(capacity, dtype=object)
+        self._task = np.empty(capacity, dtype=np.int32)
+        self._user = np.empty(capacity, dtype=np.int32)
+        self._start = np.empty(capacity, dtype=np.int64)
+        self._end = np.empty(capacity, dtype=np.int64)
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"Timings(tasks={self.tasks!r}, rows={self.size})"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in ['_ids', '_task', '_user', '_start', '_end']:
+            state[key] = state[key][:self.size].copy()
+        state['_capacity'] = self.size
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault('_first', {})
+        self.__dict__.update(state)
+
+    def append(self, id, task, user, start, end=None):
+        "Log answering `task` for `id`; `end` defaults to now."
+        if end is None:
+            end = time_ns()
+        if self.size == self._capacity:
+            self._grow()
+        row = self.size
+        self._first.setdefault(id, row)
+        self._ids[row] = id
+        self._task[row] = self._code('tasks', task)
+        self._user[row] = self._code('users', user)
+        self._start[row] = start
+        self._end[row] = end
+        self.size += 1
+
+    def extend(self, df):
+        "Append the rows of a frame with columns id, task, user, start, end."
+        n = len(df)
+        while self.size + n > self._capacity:
+            self._grow()
+        rows = slice(self.size, self.size + n)
+        self._ids[rows] = df['id'].to_numpy(dtype=object)
+        for column, array in [('task', self._task), ('user', self._user)]:
+            codes, uniques = pd.factorize(df[column].astype(object))
+            mapping = np.array(
+                [self._code(column + 's', i) for i in uniques], dtype=np.int32
+            )
+            array[rows] = mapping[codes] if len(mapping) else codes
+            # missing values are factorized to -1
+            if (codes < 0).any():
+                array[rows][codes < 0] = self._code(column + 's', None)
+        self._start[rows] = epoch(df['start'])
+        self._end[rows] = epoch(df['end'])
+        self.size += n
+
+    def drop(self, id):
+        """
+        Remove the rows of `id` that were logged since the last save
+        (e.g. the tasks of an item that was left before it was completed).
+        Saved rows are kept; they are part of the saved log.
+        """
+        start = max(self.saved, self._first.pop(id, 0))
+        keep = self._ids[start:self.size] != id
+        if keep.all():
+            return None
+        n = start + int(keep.sum())
+        for key in ['_ids', '_task', '_user', '_start', '_end']:
+            array = getattr(self, key)
+            array[start:n] = array[start:self.size][keep]
+        self._ids[n:self.size] = None
+        self.size = n
+        # rows after `start` moved up
+        for moved in set(self._ids[start:n]):
+            self._first[moved] = min(self._first.get(moved, start), start)
+
+    @property
+    def frame(self):
+        "Dataframe of the log with start and end as datetimes (UTC)."
+        return self.frame_from(0)
+
+    def frame_from(self, row):
+        "Dataframe of the log from `row` onwards."
+        rows = slice(row, self.size)
+        return pd.DataFrame({
+            'id': self._ids[rows],
+            'task': labels(self._task[rows], self.tasks),
+            'user': labels(self._user[rows], self.users),
+            'start': self._start[rows].view('datetime64[ns]'),
+            'end': self._end[rows].view('datetime64[ns]'),
+        })
+
+    def throughput(self, freq='1H', window=8):
+        """Report on the speed of the annotation.
+
+        Arguments
+        ---------
+        freq : str, default '1H'
+            Width of the bins of the rate series (a pandas offset alias).
+        window : int, default 8
+            Number of bins in the rolling window of the rate series.
+
+        Returns
+        -------
+        ThroughputReport
+            users : DataFrame
+                Per user: the number of items and tasks,
+                the hours spent on the tasks and the items per hour.
+            tasks : DataFrame
+                Per task: the number of answers and the median, mean and
+                90th percentile of the dwell time (seconds).
+            rate : Series
+                Items completed per hour, averaged over a rolling window
+                of `window` bins of width `freq`.
+        """
+
+        n = self.size
+        start, end = self._start[:n], self._end[:n]
+        task, user = self._task[:n], self._user[:n]
+        dwell = end - start
+
+        # items per user: unique (id, user) pairs, finished at the last end
+        ids, _ = pd.factorize(self._ids[:n])
+        pairs = ids.astype(np.int64) * max(len(self.users), 1) + user
+        order = np.lexsort((end, pairs))
+        last = np.ones(n, dtype=bool)
+        last[:-1] = pairs[order][1:] != pairs[order][:-1]
+        finished = order[last]
+
+        n_users = len(self.users)
+        items = np.bincount(user[finished], minlength=n_users)
+        answers = np.bincount(user, minlength=n_users)
+        hours = np.bincount(
+            user, weights=dwell, minlength=n_users
+        ) / NANOSECONDS_PER_HOUR
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_hour = np.where(hours > 0, items / hours, np.nan)
+        users = pd.DataFrame(
+            {
+                'items': items,
+                'tasks': answers,
+                'hours': hours,
+                'items_per_hour': per_hour,
+            },
+            index=pd.Index(self.users, name='user'),
+        )
+
+        # dwell time per task; the percentiles are computed per task
+        tasks = pd.DataFrame(
+            [
+                dwell_stats(dwell[task == code] / 10**9)
+                for code in range(len(self.tasks))
+            ],
+            columns=['count', 'median', 'mean', 'p90'],
+            index=pd.Index(self.tasks, name='task'),
+        )
+
+        # completed items binned by end time (much faster than resample)
+        width = pd.Timedelta(freq).value
+        ends = end[finished]
+        origin = ends.min() // width * width if n else 0
+        binned = np.bincount((ends - origin) // width)
+        index = pd.date_range(
+            pd.Timestamp(origin), periods=len(binned), freq=freq
+        )
+        binned = pd.Series(binned, index=index)
+        hours = width / NANOSECONDS_PER_HOUR
+        rate = binned.rolling(window, min_periods=1).mean() / hours
+        rate.name = 'items_per_hour'
+        return ThroughputReport(users, tasks, rate)
+
+    def _code(self, kind, value):
+        codes = self._codes[kind]
+        if value not in codes:
+            codes[value] = len(codes)
+            getattr(self, kind).append(value)
+        return codes[value]
+
+    def _grow(self):
+        self._capacity = max(2 * self._capacity, 1024)
+        for key in ['_ids', '_task', '_user', '_start', '_end']:
+            array = getattr(self, key)
+            grown = np.empty(self._capacity, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, key, grown)
+
+
+def time_ns():
+    "Current time as epoch nanoseconds (`time.time_ns` needs Python 3.7)."
+    return int(time.time() * 10**9)
+
+
+def dwell_stats(seconds):
+    "Count, median, mean and 90th percentile of the dwell times."
+    if not len(seconds):
+        return 0, np.nan, np.nan, np.nan
+    median, p90 = np.percentile(seconds, [50, 90])
+    return len(seconds), median, seconds.mean(), p90
+
+
+def labels(codes, values):
+    "Look up the `values` for `codes`."
+    lookup = np.empty(len(values), dtype=object)
+    lookup[:] = values
+    return lookup[codes]
+
+
+def epoch(values):
+    "Convert datetimes (or epoch nanoseconds) to int64 epoch nanoseconds."
+    values = pd.Series(values)
+    if pd.api.types.is_integer_dtype(values):
+        return values.to_numpy(dtype=np.int64)
+    return pd.to_datetime(values).to_numpy(dtype='datetime64[ns]').view(np.int64)
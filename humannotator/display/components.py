@@ -11,6 +11,7 @@ This module contains the following display components:
 import os
 import re
 import unicodedata
+from bisect import bisect_right
 from collections.abc import Mapping
 from itertools import cycle
 from textwrap import wrap
@@ -125,27 +126,93 @@ class TruncaterText(Truncater):
 
 
 class Highlighter(Base):
+    """
+    Highlighter
+    ===========
+    Highlights phrases in the item.
+    - Literal phrases are compiled once into a trie-shaped pattern
+      (an automaton) and highlighted in a single pass.
+    - Regexes are compiled one by one, so their groups, backreferences and
+      inline flags keep their meaning. They only highlight text that is not
+      highlighted yet, in the order of the phrases.
+    - If `skip_tags` is True, html tags and entities are left untouched.
+    """
+
     styles = COMPONENTS.highlight,
+    markup = r"<[^<>]*>|&#?\w+;"
 
-    def __init__(self, template, phrases=None, escape=False, flags=0, **kwargs):
-        self.template = template
-        self.escape   = escape
-        self.flags    = flags
-        self.phrases  = phrases
+    def __init__(
+        self,
+        template,
+        phrases=None,
+        escape=False,
+        flags=0,
+        skip_tags=False,
+        **kwargs
+    ):
+        self.template  = template
+        self.escape    = escape
+        self.flags     = flags
+        self.skip_tags = skip_tags
+        self.phrases   = phrases
 
     def __call__(self, item):
-        def marker(match):
-            context = {'text': match[0]}
-            if 'style' in self.template._fields:
-                context['style'] = style
-            return self.template(**context).render()
-
-        if self.phrases is None:
+        if not self.phrases:
             return item
-        for phrase, style in self.phrases.items():
-            phrase = re.escape(phrase) if self.escape else phrase
-            item = re.sub(phrase, marker, item, flags=self.flags)
-        return item
+        if not self.regexes:
+            return self.pattern.sub(self.marker, item)
+        output, end = [], 0
+        for start, stop, style in self.spans(item):
+            prefix, suffix = self.marks[style]
+            output += [item[end:start], prefix, item[start:stop], suffix]
+            end = stop
+        output.append(item[end:])
+        return ''.join(output)
+
+    def marker(self, match):
+        if match.lastindex == self.literal_group:
+            prefix, suffix = self.marks[self.literal_style(match[0])]
+            return prefix + match[0] + suffix
+        return match[0]
+
+    def spans(self, item):
+        "Start, stop and style of the highlights, in order."
+        starts, stops, styles = [], [], []
+
+        def add(start, stop, style):
+            i = bisect_right(starts, start)
+            if i and stops[i - 1] > start:
+                return None
+            if i < len(starts) and starts[i] < stop:
+                return None
+            starts.insert(i, start)
+            stops.insert(i, stop)
+            styles.insert(i, style)
+
+        if self.pattern is not None:
+            for match in self.pattern.finditer(item):
+                style = None
+                if match.lastindex == self.literal_group:
+                    style = self.literal_style(match[0])
+                add(*match.span(), style)
+        for regex, style in self.regexes:
+            for match in regex.finditer(item):
+                if match.end() > match.start():
+                    add(*match.span(), style)
+        # spans without a style are markup (with `skip_tags`)
+        return [i for i in zip(starts, stops, styles) if i[2] is not None]
+
+    def literal_style(self, text):
+        "Style of the literal phrase that matched `text`."
+        try:
+            return self.literals[self._key(text)]
+        except KeyError:
+            # some characters match case-insensitively without lowering
+            # to the same character (e.g. 'ſ' and 's')
+            for literal, style in self.literals.items():
+                if re.fullmatch(re.escape(literal), text, flags=self.flags):
+                    return style
+            raise
 
     @property
     def phrases(self):
@@ -158,9 +225,77 @@ class Highlighter(Base):
         else:
             if isinstance(phrases, str):
                 phrases = [phrases]
-            if phrases is not Mapping:
+            if not isinstance(phrases, Mapping):
                 phrases = dict(zip(phrases, cycle(*self.styles)))
             self._phrases = phrases
+        self._compile()
+
+    def _key(self, text):
+        return text.lower() if self.flags & re.IGNORECASE else text
+
+    def _compile(self):
+        "Compile the literals into a single pattern and the regexes apart."
+        self.pattern, self.marks = None, {}
+        self.literals, self.regexes = {}, []
+        self.literal_group = None
+        if not self.phrases:
+            return None
+
+        for phrase, style in self.phrases.items():
+            if self.escape or not REGEX_CHARS.intersection(phrase):
+                self.literals[self._key(phrase)] = style
+            else:
+                self.regexes.append(
+                    (re.compile(phrase, flags=self.flags), style)
+                )
+
+        branches = []
+        if self.skip_tags:
+            branches.append(f"({self.markup})")
+        if self.literals:
+            branches.append(f"({trie_pattern(self.literals)})")
+            self.literal_group = len(branches)
+        if branches:
+            self.pattern = re.compile('|'.join(branches), flags=self.flags)
+
+        for style in self.phrases.values():
+            context = {'text': SENTINEL}
+            if 'style' in self.template._fields:
+                context['style'] = style
+            rendered = self.template(**context).render()
+            self.marks[style] = tuple(rendered.split(SENTINEL, 1))
+
+
+SENTINEL = '\x00'
+REGEX_CHARS = set('.^$*+?{}[]\\|()')
+
+
+def trie_pattern(phrases):
+    """
+    Build a regex from literal phrases by merging their common prefixes.
+    At every branch the longer phrase is preferred.
+    """
+
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        end = '' in node
+        branches = [
+            re.escape(char) + build(child)
+            for char, child in node.items() if char
+        ]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not end:
+            return branches[0]
+        pattern = f"(?:{'|'.join(branches)})"
+        return pattern + '?' if end else pattern
+    return build(trie)
 
 
 def normalize(value, form='NFKC'):
@@ -18,22 +18,21 @@ Display:
 
 
 # standard library
+import collections
+import hashlib
 import html
-import os
+import threading
 from collections.abc import Mapping
 
 # third party
 import pandas as pd
-from markdown import markdown
-try:
-    from IPython.display import HTML, display, clear_output
-except ModuleNotFoundError:
-    pass
+from markdown import Markdown
 
 # local
 from humannotator.config import COMPONENTS
 from humannotator.display import JUPYTER
 from humannotator.display.elements import element_factory
+from humannotator.display.sinks import sink_factory, supports_ansi
 from humannotator.display.components import (
     AnnotationDisplayJupyter,
     AnnotationDisplayText,
@@ -42,12 +41,38 @@ from humannotator.display.components import (
     TruncaterText,
     normalize,
 )
-from humannotator.utils import Base
+from humannotator.utils import Base, LRUCache
+
+
+# shown for items without annotation; shared, as building it is not cheap
+NO_ANNOTATION = pd.Series(dtype=object)
 
 
 class ProtoDisplay(Base):
+    """
+    ProtoDisplay
+    ============
+    A display is set up once per annotation session.
+    All per-session state is prepared on instantiation.
+    Calling the display renders a single item and sends it to the sink.
+
+    Attributes
+    ----------
+    sink : Sink
+        Target of the rendered output (see `humannotator.display.sinks`).
+    profiler : Profiler
+        Times the render steps if profiling is on (see `Annotator.profile`).
+    stats : Counter
+        Class-wide count of display setups ('setup') and renders ('render').
+    cache : LRUCache
+        Formatted item fragments.
+        Keyed by a hash of the label, value and formatting options.
+        Use `cache.hit_rate` or `cache.info()` to size it.
+    """
+
     Counter = element_factory(template_filename='_counter.txt')
     User    = element_factory(template_filename='_user.txt')
+    stats   = collections.Counter()
 
     def __init__(
         self,
@@ -55,16 +80,31 @@ class ProtoDisplay(Base):
         interface,
         *args,
         escape_html=False,
+        cache_size=COMPONENTS.cache_size,
+        sink=None,
         **kwargs
     ):
         self.annotator = annotator
         self.interface = interface
+        self.sink = sink_factory(sink or self.default_sink)
+        self.profiler = annotator.profiler
         self.data = annotator._data
-        self.highlight = Highlighter(self.Highlight, *args, **kwargs)
-        self.navigation = interface.get_instruction()
+        self.highlight = Highlighter(
+            self.Highlight, *args, skip_tags=self.markup, **kwargs
+        )
         self.escape_html = escape_html
+        self.cache = LRUCache(cache_size)
+        self._fingerprint = None
+        self.stats['setup'] += 1
 
     def __call__(self, id, task=None, error=None):
+        with self.profiler.stage('display.context'):
+            self._context(id, task, error)
+
+    def _context(self, id, task, error):
+        "Prepare the layout and task context and look up the annotation."
+        self.stats['render'] += 1
+        self.navigation = self.interface.get_instruction()
         self.layout_context = {
             'annotator':   self.annotator.name,
             'user':        self.user,
@@ -93,12 +133,49 @@ class ProtoDisplay(Base):
             }
 
         if not self.interface.fresh:
+            # look up the single row; building `annotated` costs O(n)
             try:
-                self.annotation = self.annotator.annotated.loc[id]
+                record = self.annotator.annotations.record(id)
             except KeyError:
-                self.annotation = pd.Series()
+                self.annotation = NO_ANNOTATION
+            else:
+                self.annotation = pd.Series(record, name=id, dtype=object)
         else:
-            self.annotation = pd.Series()
+            self.annotation = NO_ANNOTATION
+
+    def render_record(self, id):
+        "Render the item fields of record `id`."
+        self.profiler.item(id)
+        return [
+            self.render_item(label, item)
+            for label, item in self.data.record(id)
+        ]
+
+    def render_item(self, label, value):
+        "Render a single item field. Cached by content and options."
+        if self._fingerprint is None:
+            self._fingerprint = repr(self.options)
+        content = f"{self._fingerprint}\x00{label}\x00{value}"
+        key = hashlib.blake2b(content.encode(), digest_size=16).digest()
+        return self.cache(key, self._render_item, label, value)
+
+    def _render_item(self, label, value):
+        return self.format_item(label, value).render()
+
+    @property
+    def options(self):
+        "Options that affect how items are formatted."
+        highlight = self.highlight
+        return (
+            type(self).__name__,
+            self.escape_html,
+            highlight.phrases,
+            highlight.escape,
+            highlight.flags,
+            highlight.skip_tags,
+            self.truncate.active,
+            self.truncate.limit,
+        )
 
     @property
     def index_counter(self):
@@ -113,12 +190,13 @@ class ProtoDisplay(Base):
             return self.User(user=self.annotator.user).render()
         return ''
 
-    @staticmethod
-    def clear():
-        if JUPYTER:
-            clear_output()
-        else:
-            os.system('cls||echo -e \\\\033c')
+    def clear(self):
+        with self.profiler.stage('display.clear'):
+            self.sink.clear()
+
+    def close(self):
+        "End the session."
+        self.sink.close()
 
     def format_value(self, value):
         value = normalize(value)
@@ -132,6 +210,9 @@ class DisplayJupyter(ProtoDisplay):
     Tasks     = element_factory(template_filename='tasks.html')
     Item      = element_factory(template_filename='_item.html')
     Highlight = element_factory(template_filename='_highlight.html')
+    Pane      = element_factory(template_filename='_pane.html')
+    markup    = True
+    default_sink = 'jupyter'
 
     def __init__(
         self,
@@ -146,67 +227,130 @@ class DisplayJupyter(ProtoDisplay):
         self.markdown_extensions = markdown_extensions
         self.maxheight_items = str(maxheight_items)
         self.truncate = TruncaterJupyter(**kwargs)
+        self.instructions = {}
+        self._converters = threading.local()
 
     def __call__(self, id, *args, **kwargs):
         super().__call__(id, *args, **kwargs)
-        self.task_context.update(
-            instruction=markdown(self.task_context['instruction']),
-        )
-        self.layout_context.update(
-            tasks=self.Tasks(**self.task_context).render(),
-            annotation=AnnotationDisplayJupyter(self.annotation).render()
-        )
-        layout = self.Layout(**self.layout_context)
-        for label, item in self.data.record(id):
-            layout(self.format_item(label, item))
-        display(HTML(layout.render()))
+        profiler = self.profiler
+        with profiler.stage('display.markdown'):
+            instruction = self.task_context['instruction']
+            if instruction not in self.instructions:
+                self.instructions[instruction] = Markdown().convert(instruction)
+            self.task_context.update(
+                instruction=self.instructions[instruction],
+            )
+        with profiler.stage('display.template'):
+            panes = dict(
+                tasks=self.Tasks(**self.task_context).render(),
+                annotation=AnnotationDisplayJupyter(self.annotation).render()
+            )
+            if self.sink.incremental:
+                # the panes are sent separately, only when they change
+                self.layout_context.update(tasks='', annotation='')
+                panes = {
+                    name: self.Pane(pane=pane).render() if pane else ''
+                    for name, pane in panes.items()
+                }
+            else:
+                self.layout_context.update(panes)
+            layout = self.Layout(**self.layout_context)
+        with profiler.stage('display.items'):
+            for item in self.interface.prefetcher(id):
+                layout(item)
+        with profiler.stage('display.template'):
+            output = layout.render()
+        with profiler.stage('display.sink'):
+            if self.sink.incremental:
+                self.sink.update(output, **panes)
+            else:
+                self.sink.show(output)
 
     def format_item(self, label, value):
+        profiler = self.profiler
         label = normalize(label)
         value = self.format_value(value)
         if self.markdown:
-            value = markdown(value, extensions=self.markdown_extensions)
-        value = self.highlight(self.truncate(value))
+            with profiler.stage('item.markdown'):
+                value = self.converter.reset().convert(value)
+        value = self.truncate(value)
+        with profiler.stage('item.highlight'):
+            value = self.highlight(value)
         kwargs = dict(label=label, value=value, maxheight=self.maxheight_items)
         return self.Item(**kwargs)
 
+    @property
+    def options(self):
+        return super().options + (
+            self.markdown,
+            self.markdown_extensions,
+            self.maxheight_items,
+        )
+
+    @property
+    def converter(self):
+        "Markdown converter; one per thread as converters are not thread-safe."
+        try:
+            return self._converters.markdown
+        except AttributeError:
+            converter = Markdown(extensions=self.markdown_extensions)
+            self._converters.markdown = converter
+            return converter
+
 
 class DisplayText(ProtoDisplay):
     Layout    = element_factory(template_filename='basic_layout.txt')
     Tasks     = element_factory(template_filename='tasks.txt')
     Item      = element_factory(template_filename='_item.txt')
     Highlight = element_factory(template_filename='_highlight.txt')
+    markup    = False
 
     n_char    = len(Layout._snippets['_line_'])
     n_lbl_id  = len(Layout._snippets['_lbl_id_'])
 
-    def __call__(self, id, *args, **kwargs):
-        super().__call__(id, *args, **kwargs)
-        indent_index = self.n_char - self.n_lbl_id - len(str(id))
-        indent_user  = self.n_char - len(self.annotator.name)
+    @property
+    def default_sink(self):
+        "Redraw in place in a terminal, otherwise print."
+        return 'ansi' if supports_ansi() else 'text'
 
-        self.layout_context.update(
-            tasks=self.Tasks(**self.task_context).render(),
-            annotation=AnnotationDisplayText(self.annotation).render()
-        )
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.truncate = TruncaterText(
             length=self.n_char,
             tab=self.Layout._snippets['_tab_'],
             **kwargs
         )
-        self.layout_context.update(
-            index_count=f"{self.index_counter:>{indent_index}}",
-            user=f"{self.user:>{indent_user}}",
-        )
-        layout = self.Layout(**self.layout_context)
-        for label, item in self.data.record(id):
-            layout(self.format_item(label, item))
-        print(layout.render())
+
+    def __call__(self, id, *args, **kwargs):
+        super().__call__(id, *args, **kwargs)
+        profiler = self.profiler
+        indent_index = self.n_char - self.n_lbl_id - len(str(id))
+        indent_user  = self.n_char - len(self.annotator.name)
+
+        with profiler.stage('display.template'):
+            self.layout_context.update(
+                tasks=self.Tasks(**self.task_context).render(),
+                annotation=AnnotationDisplayText(self.annotation).render()
+            )
+            self.layout_context.update(
+                index_count=f"{self.index_counter:>{indent_index}}",
+                user=f"{self.user:>{indent_user}}",
+            )
+            layout = self.Layout(**self.layout_context)
+        with profiler.stage('display.items'):
+            for item in self.interface.prefetcher(id):
+                layout(item)
+        with profiler.stage('display.template'):
+            output = layout.render()
+        with profiler.stage('display.sink'):
+            self.sink.show(output)
 
     def format_item(self, label, value):
         label  = normalize(label)
         value  = self.format_value(value)
-        value  = self.truncate(self.highlight(value), label)
+        with self.profiler.stage('item.highlight'):
+            value = self.highlight(value)
+        value  = self.truncate(value, label)
         kwargs = dict(label=label, value=value)
         return self.Item(**kwargs)
 
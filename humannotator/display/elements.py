@@ -57,6 +57,34 @@ def make_signature(names):
         Parameter(name, Parameter.POSITIONAL_OR_KEYWORD) for name in names)
 
 
+def compile_template(template, snippets):
+    """
+    Compile a template into a format string and a list of slots.
+    Snippets are inlined, every other variable becomes a positional field.
+    Each slot is a tuple of the (lowercase) variable name and its raw text.
+    The raw text is rendered if the element has no attribute by that name.
+    """
+
+    def escape(text):
+        return text.replace('{', '{{').replace('}', '}}')
+
+    parts, slots, position = [], [], 0
+    for match in re.finditer(ELEMENTS.regex, template):
+        parts.append(escape(template[position:match.start()]))
+        position = match.end()
+        key = match[1].lower()
+        if key in snippets:
+            parts.append(escape(snippets[key]))
+            continue
+        keys = [slot[0] for slot in slots]
+        if key not in keys:
+            slots.append((key, match[0]))
+            keys.append(key)
+        parts.append(f"{{{keys.index(key)}}}")
+    parts.append(escape(template[position:]))
+    return ''.join(parts), slots
+
+
 class ElementMeta(type):
     def __new__(cls, name, bases, clsdict):
         clsobj = super().__new__(cls, name, bases, clsdict)
@@ -104,6 +132,7 @@ def element_factory(
         if name not in properties
         and name not in snippets
     )
+    _format, _slots = compile_template(template, snippets)
 
     def __init__(self, *args, **kwargs):
         super(self.__class__, self).__init__(*args, **kwargs)
@@ -130,16 +159,11 @@ def element_factory(
         return self.render()
 
     def render(self):
-        replacements = vars(self).copy()
-        replacements.update(self._snippets)
-        for key in dir(self):
-            if not key.startswith('_') and key not in self._api:
-                replacements[key] = getattr(self, key)
-
-        txt = self._template
-        for key in replacements:
-            txt = re.sub(rf"\[{key}\]", str(replacements[key]), txt, flags=re.I)
-        return txt
+        values = [
+            raw if key in self._api else getattr(self, key, raw)
+            for key, raw in self._slots
+        ]
+        return self._format.format(*values)
 
     cls_attrs = {
         '__init__':    __init__,
@@ -149,6 +173,8 @@ def element_factory(
         '_fields':     _fields,
         '_api':        api,
         '_template':   template,
+        '_format':     _format,
+        '_slots':      _slots,
         '_snippets':   snippets,
         'render':      render,
     }
@@ -164,6 +190,9 @@ def element_factory(
         def _unpack_content(self):
             content = []
             for item in self._content:
+                if isinstance(item, str):
+                    content.append(textwrap.indent(item, TABS))
+                    continue
                 item.level = self.level + 1
                 if isinstance(item, Element):
                     try:
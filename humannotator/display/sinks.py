@@ -0,0 +1,254 @@
+"""
+This module contains the sinks of the display: the targets to which a rendered
+item is sent and which can be cleared before the next item is shown. The
+display renders; the sink decides where the output goes.
+
+An incremental sink receives the layout and the panes that change while an
+item is annotated (the tasks and the annotation) separately, through
+`update`, and only sends what has changed.
+
+In a terminal the text display is redrawn in place with ANSI escape sequences
+(see `AnsiSink`), instead of clearing the terminal through a shell.
+"""
+
+
+# standard library
+import os
+import shutil
+import sys
+
+# third party
+try:
+    from IPython.display import HTML, display, clear_output
+except ModuleNotFoundError:
+    pass
+
+# local
+from humannotator.display import JUPYTER
+from humannotator.utils import Base
+
+
+REGISTRY = {}
+def register(cls):
+    REGISTRY[cls.name] = cls
+    return cls
+
+
+class Sink(Base):
+    "Receives the rendered output of a display."
+    incremental = False
+
+    def show(self, output):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def close(self):
+        "Called at the end of the session."
+        pass
+
+
+@register
+class JupyterSink(Sink):
+    "Shows html in the output of the current notebook cell."
+    name = 'jupyter'
+
+    def show(self, output):
+        display(HTML(output))
+
+    def clear(self):
+        clear_output()
+
+
+@register
+class IncrementalJupyterSink(Sink):
+    """
+    Shows html in display handles in the output of the current notebook cell.
+    - One handle for the layout (with the item) and one for each pane.
+    - A handle is only updated if its output has changed:
+      the item is sent once, after that only the panes that changed.
+    - Clearing is skipped between the tasks of an item, the handles are
+      updated in place instead. When the item changes the cell is cleared
+      (removing the echoed inputs) and the handles are displayed again.
+      The output is cleared when the session ends.
+
+    Attributes
+    ----------
+    sent : int
+        Number of characters sent to the notebook.
+    """
+    name = 'incremental'
+    incremental = True
+    panes = ('tasks', 'annotation')
+
+    def __init__(self):
+        self.handles = {}
+        self.shown = {}
+        self.sent = 0
+
+    def show(self, output):
+        self.update(output)
+
+    def update(self, layout, **panes):
+        "Show the `layout` and the `panes`; send only what has changed."
+        outputs = {'layout': layout}
+        outputs.update({pane: panes.get(pane, '') for pane in self.panes})
+        if self.shown and self.shown['layout'] != layout:
+            # new item: clear the echoed inputs along with the handles
+            clear_output(wait=True)
+            self.handles = {}
+            self.shown = {}
+        for name, output in outputs.items():
+            if name in self.handles and self.shown[name] == output:
+                continue
+            if name in self.handles:
+                self.handles[name].update(HTML(output))
+            else:
+                self.handles[name] = display(HTML(output), display_id=True)
+            self.shown[name] = output
+            self.sent += len(output)
+
+    def clear(self):
+        pass
+
+    def close(self):
+        clear_output()
+        self.handles = {}
+        self.shown = {}
+
+
+@register
+class TextSink(Sink):
+    "Prints text; clears the terminal (or the notebook cell)."
+    name = 'text'
+
+    def show(self, output):
+        print(output)
+
+    def clear(self):
+        if JUPYTER:
+            clear_output()
+        else:
+            os.system('cls||echo -e \\\\033c')
+
+
+@register
+class AnsiSink(Sink):
+    """
+    Redraws the output in place in a terminal with ANSI escape sequences.
+    - Only the lines that changed since the previous output are rewritten;
+      the item block is not rewritten between the tasks of an item.
+    - Clearing is skipped, the next output overwrites the previous one.
+      The screen is cleared when the session ends.
+    - Output that does not fit the terminal (more lines than rows, or lines
+      that wrap) cannot be redrawn in place. The screen is cleared and the
+      output is written in full instead; the terminal scrolls.
+
+    Attributes
+    ----------
+    stream : file-like, default None
+        Where to write to. By default: `sys.stdout`.
+    sent : int
+        Number of characters written.
+    """
+    name = 'ansi'
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.lines = None
+        self.drawn = False
+        self.sent = 0
+
+    def show(self, output):
+        lines = output.split('\n')
+        self.drawn = True
+        if not fits_terminal(lines):
+            self._write(f"{ANSI_CLEAR}{output}\n")
+            self.lines = None
+            return None
+        if self.lines is None:
+            chunks, previous = [ANSI_CLEAR], []
+        else:
+            chunks, previous = [], self.lines
+        for i, line in enumerate(lines):
+            if i < len(previous) and previous[i] == line:
+                continue
+            chunks.append(f"{ansi_position(i)}{line}{ANSI_ERASE_LINE}")
+        # erase the rest of the previous output and input; prompt below
+        chunks.append(f"{ansi_position(len(lines))}{ANSI_ERASE_BELOW}")
+        self._write(''.join(chunks))
+        self.lines = lines
+
+    def clear(self):
+        pass
+
+    def close(self):
+        if self.drawn:
+            self._write(ANSI_CLEAR)
+        self.lines = None
+        self.drawn = False
+
+    def _write(self, text):
+        stream = self.stream or sys.stdout
+        stream.write(text)
+        stream.flush()
+        self.sent += len(text)
+
+
+ANSI_CLEAR = '\x1b[H\x1b[2J'
+ANSI_ERASE_LINE = '\x1b[K'
+ANSI_ERASE_BELOW = '\x1b[J'
+
+
+def fits_terminal(lines):
+    "True if every line fits on a row, leaving a row for the input below."
+    columns, rows = shutil.get_terminal_size()
+    return len(lines) < rows and all(len(line) < columns for line in lines)
+
+
+def ansi_position(line):
+    "Escape sequence moving the cursor to the start of `line` (from 0)."
+    return f"\x1b[{line + 1};1H"
+
+
+def supports_ansi():
+    "True if the output is a terminal that handles ANSI escape sequences."
+    return (
+        not JUPYTER
+        and os.name != 'nt'
+        and hasattr(sys.stdout, 'isatty')
+        and sys.stdout.isatty()
+        and os.environ.get('TERM') != 'dumb'
+    )
+
+
+@register
+class NullSink(Sink):
+    """
+    Discards the output, e.g. for headless sessions and benchmarks.
+    Keeps a count of the items shown and the number of clears.
+    """
+    name = 'null'
+
+    def __init__(self):
+        self.shown = 0
+        self.cleared = 0
+
+    def show(self, output):
+        self.shown += 1
+
+    def clear(self):
+        self.cleared += 1
+
+
+def sink_factory(sink):
+    "Return `sink` if it is a Sink, otherwise create the sink named `sink`."
+    if isinstance(sink, Sink):
+        return sink
+    try:
+        return REGISTRY[sink]()
+    except KeyError:
+        raise KeyError(
+            f"Unrecognized sink '{sink}'. Choose from: {list(REGISTRY)}."
+        )
@@ -0,0 +1,209 @@
+"""
+This module exports the annotator to a static website, for reviewers who do
+not run Jupyter. Every item is rendered through the html display (markdown,
+highlighting, truncation and the basic layout) together with its current
+annotation. The items are divided over numbered pages and an index page links
+to all of them.
+
+The pages are rendered by a pool of processes. Each process sets up a display
+once and writes its pages straight to disk, item by item, so the memory use
+does not grow with the number of items.
+"""
+
+
+# standard library
+import html
+import os
+from multiprocessing import Pool
+from pathlib import Path
+
+# third party
+import pandas as pd
+
+# local
+from humannotator.display.display import DisplayJupyter
+from humannotator.display.elements import element_factory
+from humannotator.display.sinks import Sink
+from humannotator.utils import Base, docstring_parameter
+
+
+PAGE_SIZE = 100
+ITEMS = '\x00items\x00'
+# settings of the annotator that only apply to an interactive session
+SESSION_KWARGS = ['text_display', 'sink', 'input_provider', 'prefetch']
+
+
+@docstring_parameter(page_size=PAGE_SIZE)
+def export_html(annotator, path, ids=None, workers=None, page_size=PAGE_SIZE):
+    """Export the items and their annotations to a static website.
+
+    Arguments
+    ---------
+    annotator : Annotator
+    path : str or Path
+        Directory to write the site to. Created if it does not exist.
+    ids : list of ids, default None
+        Ids to export. By default: all ids in the data.
+    workers : int, default None
+        Number of processes to render the pages with.
+        By default: the number of processors. Set to 1 to render in
+        the current process.
+    page_size : int, default {page_size}
+        Number of items per page.
+
+    Returns
+    -------
+    Path
+        Location of the index page.
+    """
+
+    if annotator._data is None:
+        raise ValueError("Load the data before exporting the annotator.")
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    ids = annotator._data.ids if ids is None else pd.Index(list(ids))
+    pages = [
+        (number, start, min(start + page_size, len(ids)))
+        for number, start in enumerate(range(0, len(ids), page_size), 1)
+    ]
+    args = (annotator, annotator._data, ids, path, len(pages))
+
+    if workers == 1:
+        summaries = map(PageRenderer(*args), pages)
+        return write_index(annotator, path, summaries, len(ids))
+    with Pool(workers, initializer=start_worker, initargs=args) as pool:
+        # the pool is terminated on exit: write the index inside the block
+        summaries = pool.imap(render_page, pages)
+        return write_index(annotator, path, summaries, len(ids))
+
+
+class PageRenderer(Base):
+    """
+    PageRenderer
+    ============
+    Renders pages of items through the html display.
+    - The display is set up once; every page reuses it.
+    - Items are written to the page file as soon as they are rendered.
+    - Pages are written to a temporary file first and then renamed.
+    """
+
+    Page = element_factory(template_filename='export_page.html')
+
+    def __init__(self, annotator, data, ids, path, n_pages):
+        annotator.data = data
+        self.annotator = annotator
+        self.ids = ids
+        self.path = Path(path)
+        self.n_pages = n_pages
+        kwargs = {
+            key: value for key, value in annotator.kwargs.items()
+            if key not in SESSION_KWARGS
+        }
+        self.sink = PageSink()
+        self.display = ExportDisplay(annotator, self, sink=self.sink, **kwargs)
+        self.prefetcher = self.display.render_record
+        # the display looks up the annotation of each item by its id
+        self.fresh = False
+
+    def __call__(self, page):
+        "Render `page` (number, start, stop); return its summary."
+        number, start, stop = page
+        title = f"{self.annotator.name} ({number}/{self.n_pages})"
+        head, tail = self.Page(
+            title=html.escape(title),
+            style=DisplayJupyter.Layout.css,
+            navigation=self.navigation(number),
+            items=ITEMS,
+        ).render().split(ITEMS)
+
+        file = self.path / page_filename(number)
+        tmp = file.with_suffix('.tmp')
+        with tmp.open('w', encoding='utf-8') as f:
+            f.write(head)
+            self.sink.file = f
+            for self.i in range(start, stop):
+                self.display(self.ids[self.i])
+            self.sink.file = None
+            f.write(tail)
+        os.replace(tmp, file)
+        return number, self.ids[start], self.ids[stop - 1], stop - start
+
+    def navigation(self, number):
+        "Links to the previous page, the index and the next page."
+        links = []
+        if number > 1:
+            links.append(link(page_filename(number - 1), 'previous'))
+        links.append(link('index.html', 'index'))
+        if number < self.n_pages:
+            links.append(link(page_filename(number + 1), 'next'))
+        return '\n'.join(links)
+
+    def get_instruction(self):
+        return ''
+
+
+class ExportDisplay(DisplayJupyter):
+    "Html display that shows an overview of the tasks instead of a task."
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.overview = '\n'.join(
+            f"- **{task.name}** ({task.kind})"
+            for task in self.annotator.tasks
+        )
+
+    def _context(self, id, task, error):
+        super()._context(id, task, error)
+        self.task_context.update(task_name='Tasks', instruction=self.overview)
+
+
+class PageSink(Sink):
+    "Writes the items to the page that is being rendered."
+
+    def __init__(self):
+        self.file = None
+
+    def show(self, output):
+        # the page includes the css and the script once for all items
+        start = output.index('<div class="humannotator">')
+        stop = output.rindex('</div>') + len('</div>')
+        self.file.write(output[start:stop] + '\n')
+
+    def clear(self):
+        pass
+
+
+def start_worker(*args):
+    "Set up the renderer of a worker process."
+    global renderer
+    renderer = PageRenderer(*args)
+
+
+def render_page(page):
+    return renderer(page)
+
+
+def write_index(annotator, path, summaries, n_items):
+    "Write the index page linking to every page."
+    Index = element_factory(template_filename='export_index.html')
+    Link = element_factory(template_filename='_export_link.html')
+    index = Index(
+        title=html.escape(annotator.name),
+        summary=f"{n_items} items",
+    )
+    for number, first, last, n in summaries:
+        index(Link(
+            href=page_filename(number),
+            label=html.escape(f"{first} - {last} ({n} items)"),
+        ))
+    file = path / 'index.html'
+    file.write_text(index.render(), encoding='utf-8')
+    return file
+
+
+def page_filename(number):
+    return f"page-{number:05d}.html"
+
+
+def link(href, label):
+    return f'<a href="{href}">{label}</a>'
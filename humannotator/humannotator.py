@@ -6,6 +6,8 @@ connects the data, annotations and tasks to the user interface and display.
 
 # standard library
 import pickle
+from contextlib import contextmanager
+from pathlib import Path
 
 # third party
 import pandas as pd
@@ -14,8 +16,14 @@ import pandas as pd
 from humannotator.config import COMPONENTS
 from humannotator.utils import Base, docstring_parameter
 from humannotator.interface import Interface
+from humannotator.export import export_html, PAGE_SIZE
+from humannotator.profiler import Profiler, NULL_PROFILER
+from humannotator.core import archive
 from humannotator.core.annotations import Annotations
 from humannotator.core.data import Data, load_data
+from humannotator.core.journal import Journal
+from humannotator.core.shards import shard_ids
+from humannotator.core.store import SQLiteStore, Claims
 
 
 class Annotator(Base):
@@ -51,8 +59,15 @@ class Annotator(Base):
         Indeces to the unannotated records.
     merged : DataFrame
         Table merging data and annotations.
+    throughput : ThroughputReport
+        Items per hour per user, dwell time per task and rolling rate.
+    profiler : Profiler
+        Times the stages of the interface and display.
+        Switched off (NullProfiler) unless inside `profile`.
     """
 
+    profiler = NULL_PROFILER
+
     @docstring_parameter(**COMPONENTS._asdict())
     def __init__(
         self,
@@ -61,6 +76,8 @@ class Annotator(Base):
         user=None,
         name='HUMANNOTATOR',
         save_data=False,
+        journal=None,
+        store=None,
         **kwargs
     ):
         """Create an annotator.
@@ -84,6 +101,16 @@ class Annotator(Base):
         save_data : boolean, default False
             Set flag to True if you want to store the data with the annotator.
             This will ensure that the pickled object, will contain the data.
+        journal : str or Path, default None
+            Path to a journal file.
+            If set, every completed item is appended to the journal.
+            After a crash, `load` replays the journal on top of the
+            last saved annotator.
+        store : str or Path, default None
+            Path to a SQLite database in which to store the annotations.
+            Annotators in separate processes can share the database;
+            each annotates only the ids that no other annotator has claimed.
+            By default: the annotations are stored in memory.
 
         other parameters
         ----------------
@@ -91,6 +118,26 @@ class Annotator(Base):
         text_display : boolean, default None
             If True will display the annotator in plain text instead of html.
 
+        INTERFACE
+        prefetch : int, default {prefetch}
+            Number of upcoming items to render in the background
+            while waiting for input. Set to 0 to disable.
+        cache_size : int, default {cache_size}
+            Number of formatted item fields to keep in the cache.
+        input_provider : callable, default None
+            Called for every input; returns the input as a string.
+            By default: read from stdin. With the text display in a terminal,
+            category and boolean tasks are answered with a single keystroke.
+            Use `humannotator.inputs.ScriptedInput` to run without a user.
+        sink : str or Sink, default None
+            Where the display is sent: 'jupyter', 'incremental', 'text', 'ansi'
+            or 'null'. 'incremental' sends the item once and after that only
+            updates the panes that changed (Jupyter only). 'ansi' redraws the
+            lines that changed in place (terminal only); items taller than the
+            terminal are redrawn in full.
+            By default: 'jupyter' for the html display; for the text display
+            'ansi' in a terminal and 'text' otherwise.
+
         HTML
         markdown : boolean, default {markdown}
             If True will pass values through markdown before rendering.
@@ -139,6 +186,9 @@ class Annotator(Base):
         self.annotations = tasks
         self.data = data
         self.save_data = save_data
+        self.journal = journal
+        if store is not None:
+            self.store = store
 
     def __call__(self, ids=None, user=None, redo=False, **kwargs):
         """Run the annotator.
@@ -158,8 +208,8 @@ class Annotator(Base):
 
         if user:
             self.user = user
-        if self.data is None:
-            return None
+        if self._data is None:
+            return self.data
         kwargs.update(self.kwargs)
         if isinstance(ids, (str, int)):
             ids = [ids]
@@ -168,16 +218,22 @@ class Annotator(Base):
 
         # skip annotated ids, unless redo is True
         if not redo:
-            ids = [
-                id for id in ids
-                if id not in self.annotations.data.index
-            ]
+            ids = self.annotations.unannotated(ids)
+
+        store = self.annotations.store
+        if isinstance(store, SQLiteStore):
+            ids = Claims(store, ids)
 
         interface = Interface(self, **kwargs)
-        interface(ids)
+        try:
+            interface(ids)
+        finally:
+            if isinstance(store, SQLiteStore):
+                store.release()
 
     def __getstate__(self):
         state = self.__dict__.copy()
+        state.pop('profiler', None)
         if not self.save_data:
             del state['_data']
         return state
@@ -187,6 +243,45 @@ class Annotator(Base):
             state['_data'] = None
         self.__dict__.update(state)
 
+    @contextmanager
+    def profile(self, callback=None):
+        """Time the stages of every item annotated inside the context.
+
+        The stages are:
+        - input: time spent waiting for the user (think-time).
+        - dependencies: resolving tasks through their dependencies.
+        - store: writing the annotations.
+        - display.context, display.markdown, display.template,
+          display.items, display.sink: the steps of rendering the display.
+        - display.clear: clearing the display.
+        - item.markdown, item.highlight: formatting the item fields
+          (on the prefetch thread if the item was prefetched).
+
+        Arguments
+        ---------
+        callback : callable, default None
+            Called with (id, stage, seconds) after every stage.
+
+        Returns
+        -------
+        Profiler
+            Use `percentiles()` for a summary per stage,
+            `per_item()` for the time per item and stage
+            or `frame` for the individual timings.
+
+        Example
+        -------
+        >>> with annotator.profile() as profiler:
+        ...     annotator()
+        >>> profiler.percentiles()
+        """
+
+        profiler = self.profiler = Profiler(callback)
+        try:
+            yield profiler
+        finally:
+            del self.profiler
+
     @property
     def data(self):
         "Data to be annotated."
@@ -223,6 +318,27 @@ class Annotator(Base):
         else:
             self._annotations = Annotations(tasks)
 
+    @property
+    def journal(self):
+        "Journal to which completed annotations are appended."
+        return self.annotations.journal
+
+    @journal.setter
+    def journal(self, journal):
+        if journal is None or isinstance(journal, Journal):
+            self.annotations.journal = journal
+        else:
+            self.annotations.journal = Journal(journal)
+
+    @property
+    def store(self):
+        "Storage of the annotations."
+        return self.annotations.store
+
+    @store.setter
+    def store(self, store):
+        self.annotations.store = store
+
     @property
     def tasks(self):
         "Task definitions."
@@ -234,16 +350,108 @@ class Annotator(Base):
 
     @property
     def annotated(self):
-        "Dataframe with the stored annotations."
+        """
+        Dataframe with the stored annotations. This is a copy; to change an
+        annotation, set `annotator.annotations[(id, task)] = value`.
+        """
         return self.annotations.data
 
     @property
     def unannotated(self):
         "The indeces to the records that have not been annotated."
-        return [
-            id for id in self.data.index
-            if id not in self.annotations.data.index
-        ]
+        return self.annotations.unannotated(self._data.ids).to_list()
+
+    def shard(self, n_shards, shard_index, overlap=0.0):
+        """Select the ids of one annotator when dividing the data.
+        The ids are partitioned by hash: every annotator that uses the same
+        `n_shards` gets the same, non-overlapping shard every time.
+        Pass the shard to the annotator: `annotator(annotator.shard(3, 0))`.
+        Combine the results with `merge_annotations`.
+
+        Arguments
+        ---------
+        n_shards : int
+            Number of shards (annotators).
+        shard_index : int
+            Shard to select (0 to n_shards - 1).
+        overlap : float, default 0.0
+            Fraction of the ids (0.0 to 1.0) that is put in every shard,
+            to measure the agreement between annotators.
+
+        Returns
+        -------
+        Index
+            The ids of the shard, in the order of the data.
+        """
+
+        return shard_ids(self._data.ids, n_shards, shard_index, overlap)
+
+    def apply_dependencies(self, ids=None):
+        """Fill in the tasks decided by dependencies, without the interface.
+
+        Conditions are evaluated on the whole annotations table at once,
+        task by task (in order). Only missing values are filled in.
+
+        Arguments
+        ---------
+        ids : list of ids, default None
+            Restrict to these ids. By default: all annotated ids.
+
+        Returns
+        -------
+        DependencyReport
+            resolved : DataFrame with the rows resolved per dependency.
+            pending : Index of ids that still need a human.
+        """
+
+        return self.annotations.apply_dependencies(ids=ids)
+
+    def throughput(self, freq='1H', window=8):
+        """Report on the speed of the annotation.
+        Based on the start and end time of every task answered by a user.
+
+        Arguments
+        ---------
+        freq : str, default '1H'
+            Width of the bins of the rate series (a pandas offset alias).
+        window : int, default 8
+            Number of bins in the rolling window of the rate series.
+
+        Returns
+        -------
+        ThroughputReport
+            users : DataFrame with the items per hour per user.
+            tasks : DataFrame with the dwell time (seconds) per task.
+            rate : Series with the rolling number of items per hour.
+        """
+
+        return self.annotations.timings.throughput(freq=freq, window=window)
+
+    @docstring_parameter(page_size=PAGE_SIZE)
+    def export_html(self, path, ids=None, workers=None, page_size=PAGE_SIZE):
+        """Export the items and their annotations to a static website.
+        The items are rendered as in Jupyter and divided over pages.
+        Open `index.html` in the directory to browse the pages.
+
+        Arguments
+        ---------
+        path : str or Path
+            Directory to write the site to.
+        ids : list of ids, default None
+            Ids to export. By default: all ids in the data.
+        workers : int, default None
+            Number of processes to render the pages with.
+            By default: the number of processors.
+        page_size : int, default {page_size}
+            Number of items per page.
+
+        Returns
+        -------
+        Path
+            Location of the index page.
+        """
+
+        return export_html(self, path, ids, workers, page_size)
 
     def merged(self):
         "Return dataframe combining data and annotations."
@@ -255,18 +463,56 @@ class Annotator(Base):
         a.columns = pd.MultiIndex.from_product([['ANNOTATIONS'], a.columns])
         return d.merge(a, how='left', left_index=True, right_index=True)
 
-    def save(self, filename):
-        "Save the annotator with the pickle protocol. "
-        "If save_data is True, then data will be stored with the annotator."
+    def save(self, filename, split=False):
+        """Save the annotator.
+        If save_data is True, then data will be stored with the annotator.
+
+        Arguments
+        ---------
+        filename : str or Path
+            Location of the pickle file or, if split, of the directory.
+        split : boolean, default False
+            If False, save the annotator with the pickle protocol.
+            If True, save it to a directory with a json manifest (tasks and
+            settings) and columnar files for the annotations and data.
+            Saving again to the same directory only writes the changes.
+        """
+
+        if split:
+            return archive.write(self, filename)
         with open(filename, 'wb') as f:
             pickle.dump(self, f)
 
     @staticmethod
-    def load(filename):
-        "Load an annotator from a pickle file. "
-        "If save_data is False, then data needs to be loaded in separately."
-        with open(filename, 'rb') as f:
-            return pickle.load(f)
+    def load(filename, journal=True, data=True):
+        """Load an annotator from a pickle file or a directory.
+        If save_data is False, then data needs to be loaded in separately.
+
+        Arguments
+        ---------
+        filename : str or Path
+            Location of the pickle file or the directory.
+        journal : boolean, str or Path, default True
+            If True, replay the journal of the annotator (if it has one).
+            If a path, attach that journal and replay it.
+            If False, do not replay.
+        data : boolean, default True
+            If False, do not load the data (only the tasks and annotations).
+            Loading a directory without data takes milliseconds.
+        """
+
+        if Path(filename).is_dir():
+            annotator = Annotator(**archive.read(filename, data=data))
+        else:
+            with open(filename, 'rb') as f:
+                annotator = pickle.load(f)
+            if not data:
+                annotator.data = None
+        if journal is not True and journal is not False:
+            annotator.journal = journal
+        if journal is not False and annotator.journal is not None:
+            annotator.annotations.replay(annotator.journal)
+        return annotator
 
 
 if __name__ == '__main__':
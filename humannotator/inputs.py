@@ -0,0 +1,183 @@
+"""
+This module contains the input providers of the interface. A provider is
+called whenever the interface needs input from the user and returns the input
+as a string. By default the input is read from stdin. A scripted provider
+replays a sequence of inputs, so that sessions can be run without a user
+(e.g. in tests and benchmarks).
+
+In a terminal, the text interface reads single keystrokes instead (see
+`KeystrokeInput`): choosing a category or navigating takes one key instead of
+a key plus enter.
+"""
+
+
+# standard library
+import sys
+from contextlib import contextmanager
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = None
+
+# local
+from humannotator.config import BOOLEAN_STATES, KEYS
+from humannotator.core.tasks import Null, Task_bool, Task_category
+from humannotator.utils import Base
+
+
+class StdinInput(Base):
+    "Reads a line from stdin."
+
+    def __call__(self, task=None):
+        return input()
+
+
+class ScriptedInput(Base):
+    """
+    ScriptedInput
+    =============
+    Replays the inputs from a sequence or generator, one per call.
+    Once the inputs are exhausted, the session is exited.
+
+    Attributes
+    ----------
+    consumed : int
+        Number of inputs replayed.
+    """
+
+    def __init__(self, inputs):
+        self._inputs = iter(inputs)
+        self.consumed = 0
+
+    def __repr__(self):
+        return f"ScriptedInput(consumed={self.consumed})"
+
+    def __call__(self, task=None):
+        try:
+            value = next(self._inputs)
+        except StopIteration:
+            return KEYS.exit
+        self.consumed += 1
+        return value
+
+
+class KeystrokeInput(Base):
+    """
+    KeystrokeInput
+    ==============
+    Reads keystrokes from the terminal without waiting for enter.
+    - The input is committed as soon as the typed keys match only one key:
+      a category, a boolean state, the null key or a navigation key.
+    - Enter commits the keys typed so far; backspace removes the last key.
+    - Tasks without a fixed set of keys (str, int, date, regex, ...)
+      are read as a line.
+    - Requires a terminal with termios (Unix).
+
+    Attributes
+    ----------
+    stdin : file-like, default None
+        Where to read from. By default: `sys.stdin`.
+    stdout : file-like, default None
+        Where to echo the keys to. By default: `sys.stdout`.
+    """
+
+    def __init__(self, stdin=None, stdout=None):
+        self.stdin = stdin
+        self.stdout = stdout
+
+    def __call__(self, task=None):
+        keys = task_keys(task)
+        if keys is None:
+            return input()
+        with self.cbreak():
+            return self.read(keys)
+
+    @staticmethod
+    def available():
+        "True if keystrokes can be read from stdin."
+        return (
+            termios is not None
+            and hasattr(sys.stdin, 'isatty')
+            and sys.stdin.isatty()
+        )
+
+    def read(self, keys):
+        "Read keystrokes until they match one of `keys` or enter is pressed."
+        stdin = self.stdin or sys.stdin
+        typed = ''
+        while True:
+            char = stdin.read(1)
+            if not char:
+                # end of input
+                return typed or KEYS.exit
+            if char in '\r\n':
+                break
+            if char in '\x7f\b':
+                if typed:
+                    typed = typed[:-1]
+                    self.echo('\b \b')
+                continue
+            typed += char
+            self.echo(char)
+            matches = [key for key in keys if key.startswith(typed)]
+            if len(matches) == 1:
+                self.echo(matches[0][len(typed):])
+                typed = matches[0]
+                break
+            if not matches:
+                break
+        self.echo('\n')
+        return typed
+
+    def echo(self, text):
+        stdout = self.stdout or sys.stdout
+        stdout.write(text)
+        stdout.flush()
+
+    @contextmanager
+    def cbreak(self):
+        "Read keystrokes one at a time (without echo) inside the context."
+        if self.stdin is not None or termios is None:
+            yield None
+            return None
+        fd = sys.stdin.fileno()
+        attributes = termios.tcgetattr(fd)
+        try:
+            tty.setcbreak(fd)
+            yield None
+        finally:
+            termios.tcsetattr(fd, termios.TCSADRAIN, attributes)
+
+
+def task_keys(task):
+    """Keys that answer `task` or navigate.
+
+    Arguments
+    ---------
+    task : Task or None
+        None when there are no tasks (only navigation).
+
+    Returns
+    -------
+    list of str or None
+        None if the task has no fixed set of keys.
+    """
+
+    keys = []
+    if isinstance(task, Task_category):
+        keys = [str(i) for i in task.categories]
+    elif isinstance(task, Task_bool):
+        keys = list(BOOLEAN_STATES)
+    elif task is not None:
+        return None
+    if task is not None and task.nullable:
+        keys.append(Null.character)
+    return keys + [KEYS.exit, KEYS.prev, KEYS.next]
+
+
+def default_input(display):
+    "Read keystrokes for the text display in a terminal, otherwise lines."
+    if not display.markup and KeystrokeInput.available():
+        return KeystrokeInput()
+    return StdinInput()
@@ -4,11 +4,15 @@ annototator, user input and the display.
 """
 
 
+# standard library
+from concurrent.futures import Future, ThreadPoolExecutor
+
 # local
 from humannotator.utils import Base, option
-from humannotator.config import KEYS
+from humannotator.config import COMPONENTS, KEYS
 from humannotator.display.display import Display
 from humannotator.core.tasks import Invalid
+from humannotator.inputs import default_input
 
 
 class Interface(Base):
@@ -20,18 +24,37 @@ class Interface(Base):
     - Stores the annotations internally.
     - Navigates through the annotations.
     - Exits; drops last row if unfinished.
+    - Prefetches the upcoming items while waiting for input.
+    - Reads the input from an input provider (default: stdin, or single
+      keystrokes for the text display in a terminal).
+      See `humannotator.inputs`.
+    - Times the stages of every item if profiling is on.
+      See `humannotator.profiler`.
     """
 
-    def __init__(self, annotator, **kwargs):
+    def __init__(self, annotator, input_provider=None, **kwargs):
         self.annotator = annotator
         self.annotations = annotator.annotations
         self.tasks = annotator.annotations.tasks
         self.user = annotator.user
+        self.input = input_provider
+        self.profiler = annotator.profiler
         self.kwargs = kwargs
 
     def __call__(self, ids):
-        self.ids = ids
-        n = len(self.ids) - 1
+        self.ids = ids if hasattr(ids, '__getitem__') else list(ids)
+        self.display = Display(self.annotator, self, **self.kwargs)
+        if self.input is None:
+            self.input = default_input(self.display)
+        self.prefetcher = Prefetcher(self.display.render_record, **self.kwargs)
+        try:
+            return self._run()
+        finally:
+            self.prefetcher.close()
+            self.display.close()
+            self.annotations.sync()
+
+    def _run(self):
         rotation = {}
 
         # add all ids to rotation immediately if no tasks
@@ -44,12 +67,18 @@ class Interface(Base):
             self.i = i
 
             while True:
+                # the number of claimed ids (see `Claims`) can shrink
+                n = len(self.ids) - 1
+
                 # check and set state
                 self.first = True if self.i == 0 else False
                 self.last  = True if self.i == n else False
                 self.fresh = True if self.i == i and self.tasks else False
 
                 # run interface
+                self.prefetcher.schedule(
+                    id, self.ids[self.i + 1:self.i + 1 + self.prefetcher.n]
+                )
                 navigation = self._interface(id)
 
                 # process navigation
@@ -59,6 +88,7 @@ class Interface(Base):
                     else:
                         navigation = Next()
                 if isinstance(navigation, Previous):
+                    self.prefetcher.invalidate()
                     if not self.i == 0:
                         self.i -= 1
                 if isinstance(navigation, Next):
@@ -73,59 +103,66 @@ class Interface(Base):
                 id = rotation[self.i]
 
     def _interface(self, id):
-        display = Display(self.annotator, self, **self.kwargs)
+        display = self.display
+        profiler = self.profiler
+        profiler.item(id)
         display.clear()
         if self.tasks:
             return self._perform_tasks(display, id)
         else:
             while True:
                 display(id)
-                user_input = input()
+                with profiler.stage('input'):
+                    user_input = self.input()
                 display.clear()
                 if user_input in NAVIGATION:
                     return NAVIGATION[user_input]
 
     def _perform_tasks(self, display, id):
+        profiler = self.profiler
         for task in self.tasks:
             if task.has_dependencies:
-                if self._process_dependencies(id, task):
+                with profiler.stage('dependencies'):
+                    resolved = self._process_dependencies(id, task)
+                if resolved:
                     continue
 
             # user input
             error = None
+            self.annotations.start(id, task.name, self.user)
             while True:
                 display(id, task, error=error)
-                user_input = input()
+                with profiler.stage('input'):
+                    user_input = self.input(task)
                 display.clear()
 
                 if user_input in NAVIGATION:
                     # only store fresh annotations if all tasks were completed
                     if self.fresh:
-                        self.annotations.data.drop(
-                            id,
-                            inplace=True,
-                            errors='ignore',
-                        )
+                        self.annotations.drop(id)
                     return NAVIGATION[user_input]
                 user_input = task(user_input)
                 if not isinstance(user_input, Invalid):
                     break
                 error = user_input.message
-            self.annotations[(id, task.name)] = user_input
+            with profiler.stage('store'):
+                self.annotations[(id, task.name)] = user_input
         else:
-            if self.user:
-                self.annotations[(id, 'user')] = self.user
+            with profiler.stage('store'):
+                if self.user:
+                    self.annotations[(id, 'user')] = self.user
+                self.annotations.commit(id)
         return Continue()
 
     def _process_dependencies(self, id, task):
+        try:
+            record = self.annotations.record(id)
+        except KeyError:
+            return False
         for i in task.dependencies:
-            try:
-                df = self.annotations.data.loc[[id]]
-                if not df.query(i.condition).empty:
-                    self.annotations[(id, task.name)] = task(i.value)
-                    return True
-            except KeyError:
-                return False
+            if i(record):
+                self.annotations[(id, task.name)] = task(i.value)
+                return True
         return False
 
     def get_instruction(self):
@@ -141,6 +178,56 @@ class Interface(Base):
             return ''.join([nav.instruction for nav in NAV_CLASSES])
 
 
+class Prefetcher(Base):
+    """
+    Prefetcher
+    ==========
+    Renders the items of upcoming ids on a worker thread.
+    - Only the item fields are prepared; they do not depend on the annotations.
+    - Keeps the current id and the next `n` ids; other ids are evicted.
+    - Falls back to rendering in the calling thread on a cache miss.
+    """
+
+    def __init__(self, render, prefetch=COMPONENTS.prefetch, **kwargs):
+        self.render = render
+        self.n = prefetch
+        self.cache = {}
+        self.executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+    def __call__(self, id):
+        future = self.cache.get(id)
+        if future is None or future.cancelled():
+            future = self.cache[id] = self._rendered(id)
+        return future.result()
+
+    def schedule(self, current, upcoming):
+        "Keep `current` and start rendering the `upcoming` ids."
+        keep = [current, *upcoming]
+        for id in list(self.cache):
+            if id not in keep:
+                self.cache.pop(id).cancel()
+        for id in upcoming:
+            if id not in self.cache:
+                if self.executor is None:
+                    break
+                self.cache[id] = self.executor.submit(self.render, id)
+
+    def invalidate(self):
+        for future in self.cache.values():
+            future.cancel()
+        self.cache = {}
+
+    def close(self):
+        self.invalidate()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+    def _rendered(self, id):
+        future = Future()
+        future.set_result(self.render(id))
+        return future
+
+
 class Exit(object):
     character = KEYS.exit
     instruction = option(character, 'exit')
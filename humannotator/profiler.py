@@ -0,0 +1,156 @@
+"""
+This module contains the profiler of the annotator. When profiling is
+switched on (see `Annotator.profile`), the interface and the display record
+the wall time of every stage of every item: the human think-time spent on
+input, the dependency checks, the writes to the annotations and the
+sub-steps of rendering and clearing the display.
+
+By default the annotator uses the NullProfiler, which records nothing. Its
+stages are a shared no-op context manager, so the instrumentation costs next
+to nothing when profiling is off.
+"""
+
+
+# standard library
+import threading
+import time
+
+# third party
+import pandas as pd
+
+# local
+from humannotator.utils import Base, docstring_parameter
+
+
+PERCENTILES = (50, 90, 99)
+
+
+class Profiler(Base):
+    """
+    Profiler
+    ========
+    Records the wall time per stage per item.
+    - `item(id)` sets the item to which the following stages (in the same
+      thread) are attributed.
+    - `stage(name)` returns a context manager timing the stage.
+    - If set, `callback(id, stage, seconds)` is called for every timing.
+
+    Attributes
+    ----------
+    records : list of tuples
+        (id, stage, seconds) in order of completion.
+    """
+
+    def __init__(self, callback=None):
+        self.records = []
+        self.callback = callback
+        self._local = threading.local()
+
+    def __repr__(self):
+        return f"Profiler(records={len(self.records)})"
+
+    def __getstate__(self):
+        return {'records': self.records, 'callback': None}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.records = state['records']
+
+    def item(self, id):
+        "Attribute the following stages in this thread to `id`."
+        self._local.id = id
+
+    def stage(self, name):
+        return Stage(self, name)
+
+    def add(self, name, seconds):
+        id = getattr(self._local, 'id', None)
+        self.records.append((id, name, seconds))
+        if self.callback is not None:
+            self.callback(id, name, seconds)
+
+    @property
+    def frame(self):
+        "Dataframe with a row for every timing."
+        return pd.DataFrame(self.records, columns=['id', 'stage', 'seconds'])
+
+    @docstring_parameter(percentiles=PERCENTILES)
+    def percentiles(self, percentiles=PERCENTILES):
+        """Summarize the timings per stage.
+
+        Arguments
+        ---------
+        percentiles : list of numbers, default {percentiles}
+            Percentiles (0-100) to compute.
+
+        Returns
+        -------
+        DataFrame
+            Per stage (in order of first occurrence): count, total, mean,
+            the percentiles and max (in seconds).
+        """
+
+        df = self.frame
+        grouped = df.groupby('stage', sort=False).seconds
+        summary = pd.DataFrame({
+            'count': grouped.count(),
+            'total': grouped.sum(),
+            'mean': grouped.mean(),
+        })
+        for p in percentiles:
+            summary[f"p{p}"] = grouped.quantile(p / 100)
+        summary['max'] = grouped.max()
+        return summary
+
+    def per_item(self):
+        "Dataframe with the total time per item (rows) and stage (columns)."
+        return self.frame.pivot_table(
+            index='id', columns='stage', values='seconds',
+            aggfunc='sum', sort=False,
+        )
+
+
+class Stage(object):
+    "Times a stage of the profiler."
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class NullStage(object):
+    "Stage of the NullProfiler; does nothing."
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullProfiler(Base):
+    "Records nothing; used when profiling is off."
+    records = ()
+    _stage = NullStage()
+
+    def __repr__(self):
+        return "NullProfiler()"
+
+    def item(self, id):
+        pass
+
+    def stage(self, name):
+        return self._stage
+
+
+NULL_PROFILER = NullProfiler()
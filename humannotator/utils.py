@@ -1,3 +1,8 @@
+# standard library
+import threading
+from collections import OrderedDict, namedtuple
+
+
 class Base(object):
     @staticmethod
     def _check_input(name, x, cls):
@@ -22,3 +27,67 @@ def docstring_parameter(*args, **kwargs):
         obj.__doc__ = obj.__doc__.format(*args, **kwargs)
         return obj
     return dec
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'size'])
+
+
+class LRUCache(object):
+    """
+    LRUCache
+    ========
+    Thread-safe cache of bounded size.
+    Evicts the least recently used item when full.
+    Keeps track of its hits and misses.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __call__(self, key, func, *args, **kwargs):
+        "Return the cached value for `key`; on a miss store func(*args)."
+        with self._lock:
+            if key in self._items:
+                self.hits += 1
+                self._items.move_to_end(key)
+                return self._items[key]
+            self.misses += 1
+        value = func(*args, **kwargs)
+        with self._lock:
+            self._items[key] = value
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return value
+
+    def __repr__(self):
+        return f"LRUCache({self.info()})"
+
+    def __getstate__(self):
+        return {'maxsize': self.maxsize}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def hit_rate(self):
+        "Fraction of lookups that were hits."
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
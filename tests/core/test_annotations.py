@@ -1,4 +1,5 @@
 # standard library
+import pickle
 import unittest
 
 # third party
@@ -40,6 +41,20 @@ class AnnotationsTestCase(unittest.TestCase):
     def test_ntasks(self):
         self.assertEqual(self.instance.ntasks, len(self.names))
 
+    def test_unannotated(self):
+        self.instance[('y', 'a')] = 'x'
+        self.instance[('w', 'a')] = 'x'
+        self.assertEqual(
+            self.instance.unannotated(['w', 'x', 'y', 'z']).to_list(),
+            ['x', 'z'],
+        )
+        self.instance.drop('y')
+        self.assertNotIn('y', self.instance)
+        self.assertEqual(len(self.instance), 1)
+        self.assertEqual(
+            self.instance.unannotated(['w', 'x', 'y']).to_list(), ['x', 'y']
+        )
+
     def test_from_df_constructor(self):
         df = pd.DataFrame(columns=self.names
         ).astype(dict(zip(self.names, self.dtypes)))
@@ -67,6 +82,67 @@ class AnnotationTasksTestcase(unittest.TestCase):
         annotations.tasks['e'] = 'str'
         self.assertTrue('e' in annotations.data.columns)
 
+    def test_data_cached_while_schema_unchanged(self):
+        annotations = Annotations.from_df(self.df)
+        annotations.data
+        frame = annotations._frame
+        annotations.data
+        self.assertIs(annotations._frame, frame)
+
+    def test_data_is_a_copy(self):
+        annotations = Annotations.from_df(self.df)
+        column = annotations.data.columns[0]
+        id = annotations.data.index[0]
+        before = annotations.data.loc[id, column]
+        annotations.data.loc[id, column] = None
+        self.assertEqual(annotations.data.loc[id, column], before)
+
+    def test_cached_data_is_not_pickled(self):
+        annotations = Annotations.from_df(self.df)
+        annotations.data
+        state = annotations.__getstate__()
+        self.assertNotIn('_frame', state)
+        loaded = pickle.loads(pickle.dumps(annotations))
+        self.assertTrue(loaded.data.equals(annotations.data))
+
+    def test_replace_task_changes_dtype(self):
+        annotations = Annotations.from_df(self.df)
+        annotations.data
+        annotations.tasks['A'] = 'str'
+        self.assertEqual(annotations.data['A'].dtype, 'object')
+
+
+class ApplyDependenciesTestCase(unittest.TestCase):
+    def setUp(self):
+        relevant = task_factory('bool', 'relevant')
+        topic = task_factory(
+            ['economy', 'politics'], 'topic',
+            dependencies=("relevant == False", '1'),
+        )
+        checked = task_factory(
+            'str', 'checked', nullable=True,
+            dependencies=("topic == 'economy'", None),
+        )
+        self.annotations = Annotations([relevant, topic, checked])
+        for id, value in zip('abc', [True, False, False]):
+            self.annotations[(id, 'relevant')] = value
+
+    def test_resolved_values(self):
+        self.annotations.apply_dependencies()
+        df = self.annotations.data
+        self.assertEqual(df.topic.to_list()[1:], ['economy', 'economy'])
+        self.assertTrue(pd.isna(df.loc['a', 'topic']))
+
+    def test_report(self):
+        resolved, pending = self.annotations.apply_dependencies()
+        self.assertEqual(resolved.resolved.to_list(), [2, 2])
+        self.assertEqual(pending.to_list(), ['a'])
+
+    def test_subset_of_ids(self):
+        _, pending = self.annotations.apply_dependencies(ids=['b', 'z'])
+        self.assertEqual(pending.to_list(), ['z'])
+        self.assertTrue(pd.isna(self.annotations.data.loc['c', 'topic']))
+
 
 class TasksTestCase(unittest.TestCase):
     def setUp(self):
@@ -116,6 +192,16 @@ class TasksTestCase(unittest.TestCase):
         ]
         self.assertNotEqual(self.tasks, output)
 
+    def test_version_bumped_on_setitem(self):
+        version = self.instance.version
+        self.instance['e'] = 'str'
+        self.assertEqual(self.instance.version, version + 1)
+
+    def test_version_bumped_on_order(self):
+        version = self.instance.version
+        self.instance.order = [3, 0, 1, 2]
+        self.assertGreater(self.instance.version, version)
+
     def test_contains(self):
         self.assertTrue(task_factory('str', 'a') in self.instance)
 
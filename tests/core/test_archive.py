@@ -0,0 +1,118 @@
+# standard library
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+# third party
+import pandas as pd
+
+# local
+from humannotator import Annotator, task_factory
+from humannotator.config import KEYS
+from humannotator.core import archive
+from humannotator.inputs import ScriptedInput
+
+
+class ArchiveTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'annotator'
+        data = pd.DataFrame(
+            {'text': list('abcd'), 'n': range(4)}, index=list('wxyz')
+        )
+        tasks = [
+            task_factory(['x', 'y'], 'topic', dependencies=("n == 1", '1')),
+            task_factory('int', 'n', nullable=True),
+        ]
+        self.annotator = Annotator(data, tasks, user='me', text_display=True)
+        self.annotator.annotations[('w', 'topic')] = 'x'
+        self.annotator.annotations[('x', 'n')] = 3
+
+    def manifest(self):
+        return json.loads((self.path / archive.MANIFEST).read_text())
+
+    def test_roundtrip(self):
+        self.annotator.save(self.path, split=True)
+        loaded = Annotator.load(self.path, data=False)
+        self.assertEqual(loaded.tasks, self.annotator.tasks)
+        self.assertEqual(loaded.user, 'me')
+        self.assertEqual(loaded.kwargs, {'text_display': True})
+        self.assertTrue(loaded.annotated.equals(self.annotator.annotated))
+        # the timestamps are not converted to objects while loading
+        timestamps = loaded.annotations.store._arrays['timestamp']
+        self.assertEqual(timestamps.dtype.kind, 'M')
+
+    def test_incremental_save(self):
+        self.annotator.save(self.path, split=True)
+        self.annotator.annotations[('y', 'topic')] = 'y'
+        self.annotator.annotations.drop('w')
+        self.annotator.save(self.path, split=True)
+        parts = self.manifest()['annotations']
+        self.assertEqual([part['rows'] for part in parts], [2, 1])
+        self.assertEqual(parts[1]['dropped'], ['w'])
+        loaded = Annotator.load(self.path)
+        self.assertEqual(loaded.annotated.index.to_list(), ['x', 'y'])
+
+    def test_incremental_save_with_null_date(self):
+        data = pd.DataFrame({'text': ['a', 'b']})
+        task = task_factory('date', 'day', nullable=True)
+        annotator = Annotator(data, task, text_display=True, sink='null')
+        annotator(input_provider=ScriptedInput(['2020-01-01', KEYS.exit]))
+        annotator.save(self.path, split=True)
+        annotator(input_provider=ScriptedInput([KEYS.none]))
+        annotator.save(self.path, split=True)
+        self.assertEqual(len(self.manifest()['annotations']), 2)
+        loaded = Annotator.load(self.path)
+        self.assertEqual(loaded.annotated.day[0], pd.Timestamp('2020-01-01'))
+        self.assertIs(loaded.annotated.day[1], pd.NaT)
+
+    def test_unchanged_save_writes_nothing(self):
+        self.annotator.save(self.path, split=True)
+        self.annotator.save(self.path, split=True)
+        self.assertEqual(len(self.manifest()['annotations']), 1)
+
+    def test_timings(self):
+        timings = self.annotator.annotations.timings
+        timings.append('w', 'topic', 'me', 0, 10**9)
+        self.annotator.save(self.path, split=True)
+        timings.append('x', 'topic', 'me', 0, 10**9)
+        timings.append('y', 'topic', 'me', 0, 10**9)
+        # dropping an id does not rewrite the saved timings
+        self.annotator.annotations.drop('y')
+        self.annotator.annotations.drop('w')
+        self.annotator.save(self.path, split=True)
+        self.assertEqual(
+            [part['rows'] for part in self.manifest()['timings']], [1, 1]
+        )
+        loaded = Annotator.load(self.path, data=False)
+        pd.testing.assert_frame_equal(
+            loaded.annotations.timings.frame, timings.frame
+        )
+
+    def test_compaction(self):
+        self.annotator.save(self.path, split=True)
+        for i in range(archive.MAX_PARTS):
+            self.annotator.annotations[(i, 'n')] = i
+            self.annotator.save(self.path, split=True)
+        self.assertEqual(len(self.manifest()['annotations']), 1)
+        files = [i.name for i in self.path.iterdir()]
+        self.assertEqual(len(files), 2)
+
+    def test_save_data(self):
+        self.annotator.save_data = True
+        self.annotator.save(self.path, split=True)
+        loaded = Annotator.load(self.path)
+        self.assertTrue(loaded.data.equals(self.annotator.data))
+        self.assertIsNone(Annotator.load(self.path, data=False)._data)
+
+    def test_without_data(self):
+        self.annotator.save(self.path, split=True)
+        self.assertIsNone(Annotator.load(self.path)._data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# standard library
+import unittest
+
+# third party
+import pandas as pd
+
+# local
+from humannotator.core.conditions import compile_condition
+from humannotator.core.tasks import task_factory, Dependency
+
+
+class CompileConditionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'relevant': [True, False, None, True],
+            'topic': ['economy', 'media', 'economy', None],
+            'score': [1, 5, 3, None],
+            'my col': ['a', 'b', 'c', 'd'],
+        })
+
+    def assertSameAsQuery(self, condition):
+        expected = self.df.query(condition).index.to_list()
+        evaluate = compile_condition(condition)
+        output = [
+            idx for idx, record in self.df.to_dict('index').items()
+            if evaluate(record)
+        ]
+        self.assertEqual(output, expected)
+        mask = compile_condition(condition, vectorized=True)(self.df)
+        self.assertEqual(self.df[mask].index.to_list(), expected)
+
+    def test_conditions_match_query(self):
+        tests = [
+            "relevant == True",
+            "relevant != True",
+            "topic == 'economy'",
+            "topic != 'economy'",
+            "score > 2",
+            "score <= 3",
+            "1 < score < 5",
+            "topic in ['media', 'other']",
+            "topic == ['media', 'other']",
+            "topic not in ['media']",
+            "topic == 'economy' and score > 2",
+            "topic == 'economy' & score > 2",
+            "topic == 'media' | score == 1",
+            "~(topic == 'media')",
+            "not topic == 'media'",
+            "`my col` == 'b'",
+        ]
+        for i in tests:
+            with self.subTest(i=i):
+                self.assertSameAsQuery(i)
+
+    def test_missing_column_is_null(self):
+        self.assertFalse(compile_condition("other == 1")({}))
+
+    def test_unsupported_syntax(self):
+        with self.assertRaises(ValueError):
+            compile_condition("topic.str.contains('eco')")
+
+    def test_invalid_statement(self):
+        with self.assertRaises(ValueError):
+            compile_condition("topic ==")
+
+
+class DependencyConditionTestCase(unittest.TestCase):
+    def test_dependency_call(self):
+        dependency = Dependency("relevant == False", None)
+        self.assertTrue(dependency({'relevant': False}))
+        self.assertFalse(dependency({'relevant': True}))
+
+    def test_task_with_unsupported_condition(self):
+        with self.assertRaises(ValueError):
+            task_factory(
+                'str', 'topic', nullable=True,
+                dependencies=("@relevant", None),
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,251 @@
+# standard library
+import pickle
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+
+# third party
+import numpy as np
+import pandas as pd
+try:
+    import pyarrow
+except ModuleNotFoundError:
+    pyarrow = None
+
+# local
+from humannotator import Annotator, task_factory
+from humannotator.inputs import ScriptedInput
+from humannotator.core.data import (
+    load_data, Data_File, Data_Mapped, Data_SQLite
+)
+
+
+class DataFileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'data.csv'
+        self.df = pd.DataFrame({
+            'key': [f"id{i}" for i in range(10)],
+            'text': [f"line\nbreak, {i}" if i % 3 else f"text {i}" for i in range(10)],
+            'n': range(10),
+        })
+        self.df.to_csv(self.path, index=False)
+
+    def test_load_from_path(self):
+        data = load_data(str(self.path), id_col='key', chunksize=3)
+        self.assertIsInstance(data, Data_File)
+        self.assertEqual(data.ids.to_list(), self.df.key.to_list())
+        self.assertEqual(data.chunks.info().size, 0)
+
+    def test_record_reads_single_chunk(self):
+        data = load_data(self.path, id_col='key', chunksize=3)
+        expected = self.df.set_index('key').loc['id7']
+        self.assertEqual(dict(data.record('id7')), expected.to_dict())
+        self.assertEqual(data.chunks.info().size, 1)
+
+    def test_default_ids(self):
+        data = load_data(self.path, item_cols='text', chunksize=4)
+        self.assertEqual(data.ids.to_list(), list(range(10)))
+        self.assertEqual(data[5].to_dict(), {'text': self.df.text[5]})
+
+    def test_data_materialises_file(self):
+        data = load_data(self.path, id_col='key', chunksize=4)
+        pd.testing.assert_frame_equal(
+            data.data, self.df.set_index('key')[['text', 'n']]
+        )
+
+    def test_unsupported_suffix(self):
+        with self.assertRaises(ValueError):
+            load_data(Path(self.tmp.name) / 'data.xlsx')
+
+    def test_annotator_from_file(self):
+        task = task_factory('str', 'topic')
+        annotator = Annotator(str(self.path), task, id_col='key', chunksize=3)
+        self.assertEqual(annotator.unannotated[:2], ['id0', 'id1'])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+@unittest.skipIf(pyarrow is None, "requires pyarrow")
+class DataParquetTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'data.parquet'
+        self.df = pd.DataFrame(
+            {'text': [f"text {i}" for i in range(10)], 'n': range(10)},
+            index=pd.Index([f"id{i}" for i in range(10)], name='key'),
+        )
+
+    def test_stored_index_is_used_for_ids(self):
+        self.df.to_parquet(self.path, row_group_size=3)
+        data = load_data(self.path)
+        self.assertEqual(data.item_cols, ['text', 'n'])
+        self.assertEqual(data.ids.to_list(), self.df.index.to_list())
+        self.assertEqual(data['id7'].to_dict(), {'text': 'text 7', 'n': 7})
+        pd.testing.assert_frame_equal(data.data, self.df)
+
+    def test_range_index(self):
+        self.df.index = pd.RangeIndex(10, 30, 2)
+        self.df.to_parquet(self.path, row_group_size=3)
+        data = load_data(self.path)
+        self.assertEqual(data.item_cols, ['text', 'n'])
+        self.assertEqual(data.ids.to_list(), list(range(10, 30, 2)))
+        self.assertEqual(data[24].to_dict(), {'text': 'text 7', 'n': 7})
+
+    def test_id_col(self):
+        self.df.reset_index().to_parquet(self.path, row_group_size=3)
+        data = load_data(self.path, id_col='key', item_cols='text')
+        self.assertEqual(data.ids.to_list(), self.df.index.to_list())
+        self.assertEqual(dict(data.record('id4')), {'text': 'text 4'})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+class DataSQLiteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'data.db'
+        with sqlite3.connect(self.path) as connection:
+            connection.execute(
+                "CREATE TABLE items (key TEXT PRIMARY KEY, text TEXT, n INT)"
+            )
+            connection.executemany(
+                "INSERT INTO items VALUES (?, ?, ?)",
+                [(f"id{i}", f"text {i}", i) for i in range(5)],
+            )
+        connection.close()
+        self.data = load_data(self.path, table='items', id_col='key')
+
+    def test_load_from_path(self):
+        self.assertIsInstance(self.data, Data_SQLite)
+        self.assertEqual(len(self.data), 5)
+        self.assertEqual(self.data.ids.to_list(), [f"id{i}" for i in range(5)])
+
+    def test_record(self):
+        self.assertEqual(dict(self.data.record('id3')), {'text': 'text 3', 'n': 3})
+        self.data.record('id3')
+        self.assertEqual(self.data.rows.info().hits, 1)
+
+    def test_item_cols_and_rowid(self):
+        data = load_data(self.path, table='items', item_cols='text')
+        self.assertEqual(data.ids.to_list(), [1, 2, 3, 4, 5])
+        self.assertEqual(data[2].to_dict(), {'text': 'text 1'})
+
+    def test_missing_id(self):
+        with self.assertRaises(KeyError):
+            self.data['other']
+
+    def test_missing_table(self):
+        with self.assertRaises(ValueError):
+            load_data(self.path)
+        with self.assertRaises(ValueError):
+            load_data(self.path, table='other')
+
+    def test_data(self):
+        self.assertEqual(self.data.data.n.to_list(), list(range(5)))
+
+    def test_connection_is_reopened(self):
+        connection = sqlite3.connect(self.path)
+        data = load_data(connection, table='items', id_col='key')
+        self.assertIsNot(data.connection, connection)
+        connection.close()
+        self.assertEqual(data['id1'].to_dict(), {'text': 'text 1', 'n': 1})
+        data.connection.close()
+
+    def test_path_is_opened_once(self):
+        with mock.patch(
+            'humannotator.core.data.sqlite3.connect', wraps=sqlite3.connect
+        ) as connect:
+            data = load_data(self.path, table='items')
+        connect.assert_called_once()
+        data.connection.close()
+
+    def test_missing_database(self):
+        path = Path(self.tmp.name) / 'other.db'
+        with self.assertRaises(FileNotFoundError):
+            load_data(path, table='items')
+        self.assertFalse(path.exists())
+
+    def test_in_memory_database(self):
+        connection = sqlite3.connect(':memory:')
+        connection.execute("CREATE TABLE items (text TEXT)")
+        with self.assertRaises(ValueError):
+            load_data(connection, table='items')
+        connection.close()
+
+    def test_session_with_prefetch(self):
+        connection = sqlite3.connect(self.path)
+        task = task_factory('str', 'note')
+        annotator = Annotator(
+            connection, task, table='items', id_col='key',
+            text_display=True, sink='null', prefetch=2,
+        )
+        keys = ScriptedInput(f"note {i}" for i in range(5))
+        annotator(input_provider=keys)
+        self.assertEqual(annotator.annotated.note['id4'], 'note 4')
+        annotator._data.connection.close()
+        connection.close()
+
+    def test_pickle_reconnects(self):
+        data = pickle.loads(pickle.dumps(self.data))
+        self.assertEqual(data['id1'].to_dict(), {'text': 'text 1', 'n': 1})
+
+    def tearDown(self):
+        self.data.connection.close()
+        self.tmp.cleanup()
+
+
+class DataMappedTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'shared'
+        self.df = pd.DataFrame({
+            'key': ['a', 'b', 'c'],
+            'text': ['één', None, 'three'],
+            'n': [1, 2, 3],
+            'date': pd.to_datetime(['2020-01-01', '2020-01-02', None]),
+            'other': [1, 'x', None],
+        })
+        self.data = load_data(self.df, mmap=self.path, id_col='key')
+
+    def test_record(self):
+        self.assertIsInstance(self.data, Data_Mapped)
+        self.assertEqual(self.data.ids.to_list(), ['a', 'b', 'c'])
+        self.assertEqual(
+            dict(self.data.record('a')),
+            {
+                'text': 'één', 'n': 1,
+                'date': pd.Timestamp('2020-01-01'), 'other': 1,
+            },
+        )
+        self.assertIsNone(self.data['b']['text'])
+
+    def test_columns_are_mapped(self):
+        self.assertIsInstance(self.data.columns['n'].values, np.memmap)
+        self.assertIsInstance(self.data.columns['text'].text, np.memmap)
+
+    def test_reuse(self):
+        data = load_data(pd.DataFrame({'x': [1]}), mmap=self.path)
+        self.assertEqual(data.ids.to_list(), ['a', 'b', 'c'])
+        data = load_data(str(self.path), item_cols='n')
+        self.assertEqual(data['c'].to_dict(), {'n': 3})
+
+    def test_data(self):
+        pd.testing.assert_frame_equal(
+            self.data.data, self.df.set_index('key'), check_dtype=False
+        )
+
+    def test_pickle(self):
+        data = pickle.loads(pickle.dumps(self.data))
+        self.assertEqual(data['c']['text'], 'three')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# standard library
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# third party
+import pandas as pd
+
+# local
+from humannotator import Annotator, task_factory
+from humannotator.core.journal import Journal, encode, decode
+
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'journal.jsonl'
+        self.journal = Journal(self.path, sync_every=2)
+
+    def test_roundtrip_values(self):
+        values = {
+            'a': 'x', 'b': 3, 'c': 1.5, 'd': True, 'e': None,
+            'f': pd.Timestamp('2020-01-02 03:04:05'),
+            'g': float('nan'),
+        }
+        expected = dict(values, g=None)
+        self.assertEqual(decode(encode(values)), expected)
+
+    def test_append_and_replay(self):
+        self.journal.append(1, {'a': 'x'})
+        self.journal.append('b', {'a': 'y'})
+        self.journal.close()
+        self.assertEqual(
+            list(self.journal.replay()), [(1, {'a': 'x'}), ('b', {'a': 'y'})]
+        )
+
+    def test_incomplete_entry_is_skipped(self):
+        self.journal.append(1, {'a': 'x'})
+        self.journal.close()
+        with self.path.open('a') as f:
+            f.write('{"id": 2, "val')
+        self.assertEqual(list(self.journal.replay()), [(1, {'a': 'x'})])
+
+    def tearDown(self):
+        self.journal.close()
+        self.tmp.cleanup()
+
+
+class AnnotatorJournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = Path(self.tmp.name)
+        self.snapshot = path / 'annotator.pkl'
+        data = pd.DataFrame({'text': ['a', 'b', 'c']})
+        task = task_factory(['x', 'y'], 'topic')
+        self.annotator = Annotator(
+            data, task, journal=path / 'journal.jsonl', text_display=True
+        )
+
+    def run_session(self, keys):
+        with mock.patch('builtins.input', side_effect=keys), \
+             mock.patch('builtins.print'), \
+             mock.patch('os.system'):
+            self.annotator()
+
+    def test_recover_after_crash(self):
+        self.run_session(['1', '.'])
+        self.annotator.save(self.snapshot)
+        self.run_session(['2', '1', '.'])
+        # the kernel crashes: everything since the snapshot is in the journal
+        recovered = Annotator.load(self.snapshot)
+        self.assertEqual(recovered.annotated.topic.to_list(), ['x', 'y', 'x'])
+        self.assertEqual(str(recovered.annotated.topic.dtype), 'category')
+
+    def test_load_without_replay(self):
+        self.run_session(['1', '.'])
+        self.annotator.save(self.snapshot)
+        self.run_session(['2', '.'])
+        recovered = Annotator.load(self.snapshot, journal=False)
+        self.assertEqual(len(recovered.annotated), 1)
+
+    def tearDown(self):
+        self.annotator.journal.close()
+        self.tmp.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
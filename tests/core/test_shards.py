@@ -0,0 +1,96 @@
+# standard library
+import unittest
+
+# third party
+import pandas as pd
+
+# local
+from humannotator import Annotator, merge_annotations, task_factory
+from humannotator.core.shards import shard_ids
+
+
+class ShardIdsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ids = pd.Index([f"id {i}" for i in range(1000)])
+
+    def shards(self, ids, n=3, overlap=0.0):
+        return [shard_ids(ids, n, i, overlap) for i in range(n)]
+
+    def test_partition(self):
+        shards = self.shards(self.ids)
+        combined = shards[0].append(shards[1:])
+        self.assertEqual(sorted(combined), sorted(self.ids))
+        for shard in shards:
+            self.assertGreater(len(shard), 250)
+
+    def test_stable(self):
+        # the shard of an id does not depend on the other ids
+        shard = shard_ids(self.ids, 3, 1)
+        subset = shard_ids(self.ids[::-1][:500], 3, 1)
+        self.assertTrue(subset.isin(shard).all())
+
+    def test_stable_for_mixed_ids(self):
+        # adding an id of another type does not move the existing ids
+        ids = pd.RangeIndex(1000)
+        mixed = pd.Index(list(ids) + ['new'], dtype=object)
+        for i in range(3):
+            shard = shard_ids(mixed, 3, i).drop('new', errors='ignore')
+            self.assertEqual(shard.to_list(), shard_ids(ids, 3, i).to_list())
+
+    def test_order(self):
+        shard = shard_ids(self.ids, 3, 0)
+        self.assertEqual(shard.to_list(), [i for i in self.ids if i in shard])
+
+    def test_overlap(self):
+        shards = self.shards(pd.RangeIndex(10000), overlap=0.1)
+        shared = shards[0].intersection(shards[1]).intersection(shards[2])
+        self.assertAlmostEqual(len(shared) / 10000, 0.1, delta=0.02)
+        everything = self.shards(self.ids, overlap=1.0)
+        self.assertTrue(all(len(i) == 1000 for i in everything))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            shard_ids(self.ids, 3, 3)
+        with self.assertRaises(ValueError):
+            shard_ids(self.ids, 3, 0, overlap=2)
+
+
+class MergeAnnotationsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.a = pd.DataFrame({
+            'topic': ['x', 'y', 'x'],
+            'timestamp': pd.to_datetime(['2020-01-01', '2020-01-03', None]),
+            'user': 'a',
+        }, index=[1, 2, 3])
+        self.b = pd.DataFrame({
+            'topic': ['y', 'y'],
+            'timestamp': pd.to_datetime(['2020-01-02', '2020-01-02']),
+            'user': 'b',
+        }, index=[4, 2])
+
+    def test_keep_last(self):
+        df = merge_annotations([self.a, self.b])
+        self.assertEqual(df.index.to_list(), [1, 2, 3, 4])
+        self.assertEqual(df.user.to_list(), ['a', 'a', 'a', 'b'])
+
+    def test_keep_first(self):
+        df = merge_annotations([self.a, self.b], keep='first')
+        self.assertEqual(df.loc[2, 'user'], 'b')
+
+    def test_keep_all(self):
+        df = merge_annotations([self.a, self.b], keep=False)
+        self.assertEqual(len(df), 5)
+
+    def test_annotators(self):
+        data = pd.DataFrame({'text': list('abcdef')})
+        task = task_factory('str', 'topic')
+        annotators = [Annotator(data, task, user=i) for i in 'ab']
+        for i, annotator in enumerate(annotators):
+            for id in annotator.shard(2, i):
+                annotator.annotations[(id, 'topic')] = 'x'
+        df = merge_annotations(annotators)
+        self.assertEqual(sorted(df.index), list(range(6)))
+
+
+if __name__ == '__main__':
+    unittest.main()
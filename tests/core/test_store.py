@@ -0,0 +1,214 @@
+# standard library
+import multiprocessing
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+# third party
+import pandas as pd
+
+# local
+from humannotator.core.store import Store, SQLiteStore, Claims
+from humannotator.core.tasks import task_factory
+from humannotator.core.annotations import Annotations
+
+
+class StoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.store = Store(['a', 'b'], capacity=2)
+
+    def test_set_and_get(self):
+        self.store['x', 'a'] = 1
+        self.assertEqual(self.store['x', 'a'], 1)
+        self.assertIsNone(self.store['x', 'b'])
+
+    def test_grow(self):
+        for i in range(10):
+            self.store[i, 'a'] = i
+        self.assertEqual(len(self.store), 10)
+        self.assertEqual(self.store[9, 'a'], 9)
+
+    def test_drop_and_readd_moves_to_end(self):
+        for i in range(3):
+            self.store[i, 'a'] = i
+        self.store.drop(0)
+        self.store[0, 'b'] = 'y'
+        self.assertEqual(list(self.store), [1, 2, 0])
+        self.assertIsNone(self.store[0, 'a'])
+
+    def test_drop_missing_id(self):
+        self.store.drop('missing')
+        self.assertEqual(len(self.store), 0)
+
+    def test_frame(self):
+        self.store['x', 'a'] = 1
+        self.store['y', 'b'] = 'z'
+        df = self.store.frame({'a': 'Int64'})
+        self.assertEqual(df.index.to_list(), ['x', 'y'])
+        self.assertEqual(str(df.a.dtype), 'Int64')
+
+    def test_from_frame(self):
+        df = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']}, index=[5, 6])
+        store = Store.from_frame(df)
+        self.assertEqual(store[6, 'b'], 'y')
+        self.assertTrue(store.frame({'a': 'int64'}).equals(df))
+
+    def test_from_frame_keeps_datetimes(self):
+        timestamps = pd.to_datetime(['2021-01-01', None])
+        df = pd.DataFrame({'timestamp': timestamps, 'b': ['x', 'y']})
+        store = Store.from_frame(df)
+        self.assertEqual(store._arrays['timestamp'].dtype.kind, 'M')
+        self.assertEqual(store[0, 'timestamp'], pd.Timestamp('2021-01-01'))
+        self.assertIs(store.record(1)['timestamp'], pd.NaT)
+        for id in range(2, 1100):
+            store[id, 'b'] = 'z'
+        store[1099, 'timestamp'] = pd.Timestamp('2022-01-01')
+        self.assertIs(store[1098, 'timestamp'], pd.NaT)
+        frame = store.frame()
+        self.assertEqual(str(frame.timestamp.dtype), 'datetime64[ns]')
+        self.assertEqual(frame.timestamp[1099], pd.Timestamp('2022-01-01'))
+
+    def test_write_to_datetime_column(self):
+        df = pd.DataFrame({'day': pd.to_datetime(['2021-01-01'])})
+        store = Store.from_frame(df)
+        store[1, 'day'] = None
+        store.update([2, 3], 'day', float('nan'))
+        self.assertIs(store[1, 'day'], pd.NaT)
+        self.assertIs(store[3, 'day'], pd.NaT)
+        # values that are not datetimes turn the column into objects
+        store[4, 'day'] = 'unknown'
+        self.assertEqual(store[4, 'day'], 'unknown')
+        self.assertEqual(store[0, 'day'], pd.Timestamp('2021-01-01'))
+
+
+class AnnotationsStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        tasks = [task_factory('int', 'a'), task_factory(['x', 'y'], 'b')]
+        self.annotations = Annotations(tasks)
+
+    def test_write_and_read(self):
+        self.annotations[(1, 'a')] = 5
+        self.annotations[(1, 'b')] = 'y'
+        df = self.annotations.data
+        self.assertEqual(df.loc[1, 'a'], 5)
+        self.assertEqual(df.loc[1, 'b'], 'y')
+        self.assertEqual(str(df.b.dtype), 'category')
+
+    def test_data_is_rebuilt_after_write(self):
+        self.annotations[(1, 'a')] = 5
+        self.assertEqual(len(self.annotations.data), 1)
+        self.annotations[(2, 'a')] = 6
+        self.assertEqual(len(self.annotations.data), 2)
+
+    def test_drop(self):
+        self.annotations[(1, 'a')] = 5
+        self.annotations.drop(1)
+        self.assertTrue(self.annotations.data.empty)
+
+
+class SQLiteStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'annotations.db'
+        self.store = SQLiteStore(self.path, ['a', 'b'], batch_size=2)
+
+    def test_set_and_get(self):
+        self.store['x', 'a'] = pd.Timestamp('2020-01-01')
+        self.assertEqual(self.store['x', 'a'], pd.Timestamp('2020-01-01'))
+        self.assertIsNone(self.store['x', 'b'])
+        with self.assertRaises(KeyError):
+            self.store.record('y')
+
+    def test_batched_writes(self):
+        other = SQLiteStore(self.path, ['a', 'b'])
+        self.store[1, 'a'] = 1
+        self.store.commit(1)
+        self.assertNotIn(1, other)
+        self.store[2, 'a'] = 2
+        self.store.commit(2)
+        self.assertEqual(other.frame().a.to_list(), [1, 2])
+
+    def test_drop(self):
+        for i in range(3):
+            self.store[i, 'a'] = i
+        self.store.flush()
+        self.store.drop(1)
+        self.assertEqual(list(self.store), [0, 2])
+
+    def test_claims(self):
+        other = SQLiteStore(self.path, ['a', 'b'])
+        self.store['x', 'a'] = 1
+        self.store.flush()
+        self.assertEqual(self.store.claim(['x', 'y', 'z'], n=1), ['y'])
+        self.assertEqual(other.claim(['x', 'y', 'z'], n=2), ['z'])
+        self.store.release()
+        self.assertEqual(other.claim(['x', 'y', 'z'], n=2), ['y', 'z'])
+
+    def test_expired_lease(self):
+        self.store.lease = -1
+        self.store.claim(['y'])
+        other = SQLiteStore(self.path)
+        self.assertEqual(other.claim(['y']), ['y'])
+
+    def test_claims_sequence(self):
+        other = SQLiteStore(self.path)
+        claims = Claims(self.store, ['x', 'y', 'z'])
+        iterator = iter(claims)
+        self.assertEqual(len(claims), 3)
+        self.assertEqual(next(iterator), 'x')
+        self.assertEqual(len(claims), 3)
+        other.claim(['y'])
+        self.assertEqual(list(iterator), ['z'])
+        # 'y' was claimed by the other annotator
+        self.assertEqual(len(claims), 2)
+        self.assertEqual(claims[:], ['x', 'z'])
+
+    def test_pickle(self):
+        self.store['x', 'a'] = 1
+        store = pickle.loads(pickle.dumps(self.store))
+        self.assertEqual(store['x', 'a'], 1)
+        self.assertNotEqual(store.owner, self.store.owner)
+
+    def test_annotations_with_store(self):
+        task = task_factory('int', 'a')
+        annotations = Annotations(task, store=self.store)
+        annotations[('x', 'a')] = 3
+        annotations.sync()
+        self.assertEqual(annotations.data.a.dtype, 'Int64')
+        other = Annotations(task, store=SQLiteStore(self.path))
+        self.assertEqual(other.data.a.to_list(), [3])
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+
+def annotate(path, ids):
+    "Annotate every id that can be claimed; return the annotated ids."
+    store = SQLiteStore(path, ['label'])
+    done = []
+    for id in Claims(store, ids):
+        store[id, 'label'] = store.owner
+        store.commit(id)
+        done.append(id)
+    store.close()
+    return done
+
+
+class SQLiteStoreStressTestCase(unittest.TestCase):
+    def test_concurrent_annotators(self):
+        ids = list(range(300))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'annotations.db'
+            SQLiteStore(path).close()
+            with multiprocessing.Pool(4) as pool:
+                results = pool.starmap(annotate, [(path, ids)] * 4)
+            done = [id for result in results for id in result]
+            self.assertEqual(sorted(done), ids)
+            frame = SQLiteStore(path, ['label']).frame()
+            self.assertEqual(sorted(frame.index), ids)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -24,6 +24,17 @@ class TaskFactoryTestCase(unittest.TestCase):
             with self.subTest(i=i):
                 self.assertEqual(getattr(task, i), tests[i])
 
+    def test_to_dict_recreates_task(self):
+        tasks = [
+            task_factory('str', 'a', instruction='eat my shorts'),
+            task_factory('regex', 'a', regex=r'\d+', nullable=True),
+            task_factory(['x', 'y'], 'a', dependencies=("b == 1", '2')),
+            task_factory('date', 'a', format='%d-%m-%Y'),
+        ]
+        for task in tasks:
+            with self.subTest(kind=task.kind):
+                self.assertEqual(task_factory(**task.to_dict()), task)
+
     def test_created_int_task_dtype(self):
         task = task_factory('int', 'a')
         self.assertEqual(task.dtype, 'Int64')
@@ -0,0 +1,99 @@
+# standard library
+import pickle
+import unittest
+
+# third party
+import pandas as pd
+
+# local
+from humannotator.core.annotations import Annotations
+from humannotator.core.tasks import task_factory
+from humannotator.core.timings import Timings
+
+
+SECOND = 10**9
+HOUR = 3600 * SECOND
+
+
+class TimingsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.timings = Timings(capacity=2)
+        # ann: two items with two tasks each, in one hour
+        self.timings.append(1, 'topic', 'ann', 0, 10 * SECOND)
+        self.timings.append(1, 'note', 'ann', 10 * SECOND, 30 * SECOND)
+        start = HOUR - 40 * SECOND
+        self.timings.append(2, 'topic', 'ann', start, start + 20 * SECOND)
+        self.timings.append(2, 'note', 'ann', start + 20 * SECOND, HOUR)
+        # bob: one item with one task
+        self.timings.append(1, 'topic', 'bob', 0, 40 * SECOND)
+
+    def test_frame(self):
+        df = self.timings.frame
+        self.assertEqual(len(df), 5)
+        self.assertEqual(df.user.to_list(), ['ann'] * 4 + ['bob'])
+        self.assertEqual(df.end[0], pd.Timestamp(10 * SECOND))
+
+    def test_users(self):
+        users = self.timings.throughput().users
+        self.assertEqual(users.loc['ann', 'items'], 2)
+        self.assertEqual(users.loc['ann', 'tasks'], 4)
+        self.assertAlmostEqual(users.loc['ann', 'hours'], 70 / 3600)
+        self.assertAlmostEqual(users.loc['bob', 'items_per_hour'], 90)
+
+    def test_tasks(self):
+        tasks = self.timings.throughput().tasks
+        self.assertEqual(tasks.loc['topic', 'count'], 3)
+        self.assertEqual(tasks.loc['topic', 'median'], 20)
+        self.assertEqual(tasks.loc['note', 'mean'], 20)
+
+    def test_rate(self):
+        rate = self.timings.throughput(freq='30min', window=2).rate
+        # 2 items in the first bin, 1 in the last (of 3)
+        self.assertEqual(rate.to_list(), [4.0, 2.0, 1.0])
+        self.assertEqual(rate.index[0], pd.Timestamp(0))
+
+    def test_empty(self):
+        report = Timings().throughput()
+        self.assertTrue(report.users.empty)
+        self.assertTrue(report.rate.empty)
+
+    def test_drop(self):
+        self.timings.drop(1)
+        self.assertEqual(self.timings.frame.id.to_list(), [2, 2])
+        self.timings.append(3, 'topic', 'ann', 0, SECOND)
+        self.timings.drop(2)
+        self.assertEqual(self.timings.frame.id.to_list(), [3])
+        self.timings.drop(3)
+        self.assertEqual(len(self.timings), 0)
+
+    def test_drop_keeps_saved_rows(self):
+        self.timings.saved = 3
+        self.timings.drop(1)
+        self.assertEqual(self.timings.frame.id.to_list(), [1, 1, 2, 2])
+        self.assertEqual(self.timings.saved, 3)
+
+    def test_extend(self):
+        timings = Timings()
+        timings.extend(self.timings.frame)
+        pd.testing.assert_frame_equal(timings.frame, self.timings.frame)
+
+    def test_pickle(self):
+        timings = pickle.loads(pickle.dumps(self.timings))
+        pd.testing.assert_frame_equal(timings.frame, self.timings.frame)
+        timings.append(3, 'topic', 'bob', 0, SECOND)
+        self.assertEqual(len(timings), 6)
+
+
+class AnnotationsTimingsTestCase(unittest.TestCase):
+    def test_started_tasks_are_timed(self):
+        annotations = Annotations(task_factory('str', 'topic'))
+        annotations.start(1, 'topic', 'ann')
+        annotations[(1, 'topic')] = 'a'
+        annotations[(2, 'topic')] = 'b'
+        df = annotations.timings.frame
+        self.assertEqual(df.id.to_list(), [1])
+        self.assertTrue((df.end >= df.start).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,29 +1,113 @@
 # standard library
 import re
 import unittest
+from unittest import mock
+
+# third party
+import pandas as pd
 
 # local
+from humannotator import Annotator, task_factory
 from humannotator.config import PATHS
-from humannotator.display.display import Highlighter
+from humannotator.display.display import Display, Highlighter
 from humannotator.display.elements import element_factory
 
 
 class HighlighterTestCase(unittest.TestCase):
     def setUp(self):
-        template = element_factory(
+        self.template = element_factory(
             template_string='**[text]**',
             cls_name='Test'
         )
-        self.highlighter = Highlighter(template, 'kirby', flags=re.I)
+        self.highlighter = Highlighter(self.template, 'kirby', flags=re.I)
 
     def test_highlighter(self):
         test = 'Hey, Kirby'
         output = 'Hey, **Kirby**'
         self.assertEqual(self.highlighter(test), output)
 
+    def test_no_match_inside_inserted_markup(self):
+        template = element_factory(
+            template_string='<mark style="[style]">[text]</mark>',
+            cls_name='Test'
+        )
+        phrases = {'kirby': 'color: pink', 'mark': 'color: red'}
+        highlighter = Highlighter(template, phrases, skip_tags=True)
+        output = (
+            '<p><mark style="color: pink">kirby</mark> '
+            '<mark style="color: red">mark</mark></p>'
+        )
+        self.assertEqual(highlighter('<p>kirby mark</p>'), output)
+
+    def test_longest_literal_wins(self):
+        highlighter = Highlighter(self.template, ['dream', 'dream land'])
+        self.assertEqual(highlighter('dream land'), '**dream land**')
+
+    def test_regexes_with_groups(self):
+        highlighter = Highlighter(self.template, [r'(k)(i)rby', r'dee+'])
+        self.assertEqual(highlighter('kirby deee'), '**kirby** **deee**')
+
+    def test_regexes_with_backreferences(self):
+        highlighter = Highlighter(self.template, [r'(\w)\1'], skip_tags=True)
+        self.assertEqual(highlighter('<p>poppy</p>'), '<p>po**pp**y</p>')
+
+    def test_regexes_with_inline_flags(self):
+        highlighter = Highlighter(self.template, [r'(?i)kir+by'])
+        self.assertEqual(highlighter('KIRBY'), '**KIRBY**')
+
+    def test_regexes_do_not_overlap_earlier_phrases(self):
+        highlighter = Highlighter(self.template, ['kirby', r'by\w*'])
+        self.assertEqual(
+            highlighter('kirby bye'), '**kirby** **bye**'
+        )
+
+    def test_case_insensitive_characters_without_lowercase(self):
+        highlighter = Highlighter(self.template, ['kiss'], flags=re.I)
+        self.assertEqual(highlighter('ki\u017fs'), '**ki\u017fs**')
+
     def tearDown(self):
         del self.highlighter
 
 
+class DisplayCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        data = pd.DataFrame({'text': ['a', 'b', 'a']})
+        self.display = Display(Annotator(data), None, text_display=True)
+
+    def test_cache_hits(self):
+        self.display.render_record(0)
+        self.display.render_record(1)
+        self.display.render_record(0)
+        self.display.render_record(2)
+        self.assertEqual(self.display.cache.info()[:2], (2, 2))
+
+
+class DisplayAnnotationTestCase(unittest.TestCase):
+    def setUp(self):
+        data = pd.DataFrame({'text': ['a', 'b']})
+        task = task_factory('str', 'note')
+        self.annotator = Annotator(data, task, text_display=True)
+        self.annotator.annotations[(0, 'note')] = 'kirby'
+        self.interface = mock.Mock(fresh=False, i=0, ids=[0, 1])
+        self.interface.get_instruction.return_value = ''
+        self.display = Display(
+            self.annotator, self.interface, text_display=True, sink='null'
+        )
+
+    def test_annotation_is_looked_up_by_record(self):
+        with mock.patch.object(
+            type(self.annotator.annotations), 'data',
+            new_callable=mock.PropertyMock,
+        ) as data:
+            self.display._context(1, None, None)
+            self.display._context(0, None, None)
+        data.assert_not_called()
+        self.assertEqual(self.display.annotation['note'], 'kirby')
+
+    def test_no_annotation(self):
+        self.display._context(1, None, None)
+        self.assertTrue(self.display.annotation.empty)
+
+
 if __name__ == '__main__':
     unittest.main()
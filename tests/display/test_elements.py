@@ -56,9 +56,27 @@ class ElementFactoryTestCase(unittest.TestCase):
         self.layout(self.layout)
         self.assertMultiLineEqual(self.layout.render(), output)
 
+    def test_render_single_pass(self):
+        layout = self.LayOut(x='[y]', y='{b}', z='\\1')
+        self.assertIn("fields:[y]{b}\\1,", layout.render())
+
     def tearDown(self):
         del self.layout
 
 
+class CompiledTemplateTestCase(unittest.TestCase):
+    def test_case_insensitive_variables(self):
+        Test = element_factory(template_string='[X]-[x]', cls_name='Test')
+        self.assertEqual(Test(x='a').render(), 'a-a')
+
+    def test_braces_in_template(self):
+        Test = element_factory(template_string='{[x]}', cls_name='Test')
+        self.assertEqual(Test(x='a').render(), '{a}')
+
+    def test_snippets_inlined(self):
+        Test = element_factory(template_string='[_tab_][x]', cls_name='Test')
+        self.assertEqual(Test._slots, [('x', '[x]')])
+
+
 if __name__ == '__main__':
     unittest.main()
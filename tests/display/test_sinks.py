@@ -0,0 +1,209 @@
+# standard library
+import io
+import os
+import unittest
+from unittest import mock
+
+# third party
+import pandas as pd
+
+# local
+from humannotator import Annotator, task_factory
+from humannotator.display import sinks
+from humannotator.display.sinks import (
+    sink_factory, AnsiSink, IncrementalJupyterSink, NullSink, TextSink
+)
+from humannotator.inputs import ScriptedInput
+
+
+class SinkFactoryTestCase(unittest.TestCase):
+    def test_by_name(self):
+        self.assertIsInstance(sink_factory('null'), NullSink)
+        self.assertIsInstance(sink_factory('text'), TextSink)
+
+    def test_instance_is_returned(self):
+        sink = NullSink()
+        self.assertIs(sink_factory(sink), sink)
+
+    def test_unknown(self):
+        with self.assertRaises(KeyError):
+            sink_factory('other')
+
+
+class SinkTestCase(unittest.TestCase):
+    def test_null_sink_counts(self):
+        sink = NullSink()
+        sink.show('output')
+        sink.clear()
+        self.assertEqual((sink.shown, sink.cleared), (1, 1))
+
+    def test_text_sink_prints(self):
+        with mock.patch('builtins.print') as output:
+            TextSink().show('output')
+        output.assert_called_once_with('output')
+
+
+@mock.patch.object(sinks, 'clear_output', create=True)
+@mock.patch.object(sinks, 'HTML', create=True, side_effect=lambda x: x)
+@mock.patch.object(sinks, 'display', create=True)
+class IncrementalJupyterSinkTestCase(unittest.TestCase):
+    def test_only_changes_are_sent(self, display, *mocks):
+        display.side_effect = lambda *args, **kwargs: mock.Mock()
+        sink = IncrementalJupyterSink()
+        sink.update('layout', tasks='task 1')
+        self.assertEqual(display.call_count, 3)
+        handles = sink.handles
+        sink.update('layout', tasks='task 2')
+        handles['tasks'].update.assert_called_once_with('task 2')
+        handles['layout'].update.assert_not_called()
+        handles['annotation'].update.assert_not_called()
+        self.assertEqual(sink.sent, len('layout') + 2 * len('task 1'))
+
+    def test_close_clears(self, display, html, clear_output):
+        sink = IncrementalJupyterSink()
+        sink.update('layout')
+        sink.clear()
+        clear_output.assert_not_called()
+        sink.close()
+        clear_output.assert_called_once()
+        self.assertEqual(sink.handles, {})
+
+    def test_new_item_clears(self, display, html, clear_output):
+        display.side_effect = lambda *args, **kwargs: mock.Mock()
+        sink = IncrementalJupyterSink()
+        sink.update('item 1', tasks='task 1')
+        sink.update('item 1', tasks='task 2')
+        clear_output.assert_not_called()
+        sink.update('item 2', tasks='task 1')
+        clear_output.assert_called_once_with(wait=True)
+        self.assertEqual(display.call_count, 6)
+        self.assertEqual(sink.shown['layout'], 'item 2')
+
+    @mock.patch('humannotator.display.display.JUPYTER', True)
+    def test_cell_does_not_grow(self, display, html, clear_output):
+        "The echoed inputs are cleared with every item."
+        cell = []
+        def show(output, **kwargs):
+            cell.append(output)
+            return mock.Mock()
+        display.side_effect = show
+        clear_output.side_effect = lambda wait=False: cell.clear()
+
+        data = pd.DataFrame({'text': [f"item {i}" for i in range(20)]})
+        task = task_factory('int', 'n')
+        sink = IncrementalJupyterSink()
+        annotator = Annotator(data, task, sink=sink, markdown=False)
+        inputs = ScriptedInput(['not a number', '1'] * len(data))
+        sizes = []
+        def echo(task=None):
+            value = inputs(task)
+            cell.append(value)
+            sizes.append(len(cell))
+            return value
+        annotator(input_provider=echo)
+
+        self.assertEqual(len(annotator.annotated), len(data))
+        self.assertLessEqual(max(sizes), 5)
+
+    @mock.patch('humannotator.display.display.JUPYTER', True)
+    def test_session(self, display, *mocks):
+        data = pd.DataFrame({'text': ['a' * 1000, 'b' * 1000]})
+        tasks = [task_factory(['x', 'y'], 'topic'), task_factory('int', 'n')]
+        sink = IncrementalJupyterSink()
+        annotator = Annotator(data, tasks, sink=sink, markdown=False)
+        sent = []
+        inputs = ScriptedInput(['1', 'not a number', '1', '2', '2'])
+        def record(task=None):
+            sent.append(sink.sent)
+            return inputs(task)
+        annotator(input_provider=record)
+
+        self.assertEqual(len(annotator.annotated), 2)
+        layouts = [i for i in display.call_args_list if 'a' * 1000 in i[0][0]]
+        self.assertEqual(len(layouts), 1)
+        # the error only changes the tasks pane
+        self.assertLess(sent[2] - sent[1], 1000)
+        self.assertEqual(sink.handles, {})
+
+
+class AnsiSinkTestCase(unittest.TestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.sink = AnsiSink(self.stream)
+        self.resize(80, 24)
+
+    def resize(self, columns, rows):
+        "Set the size of the terminal."
+        patcher = mock.patch.object(
+            sinks.shutil, 'get_terminal_size',
+            return_value=os.terminal_size((columns, rows)),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def written(self):
+        output = self.stream.getvalue()
+        self.stream.seek(0)
+        self.stream.truncate()
+        return output
+
+    def test_first_output_clears_screen(self):
+        self.sink.show('a\nb')
+        self.assertEqual(
+            self.written(),
+            '\x1b[H\x1b[2J'
+            '\x1b[1;1Ha\x1b[K'
+            '\x1b[2;1Hb\x1b[K'
+            '\x1b[3;1H\x1b[J'
+        )
+
+    def test_only_changed_lines_are_written(self):
+        self.sink.show('item\ntask 1\nerror')
+        self.written()
+        self.sink.clear()
+        self.sink.show('item\ntask 2')
+        self.assertEqual(
+            self.written(), '\x1b[2;1Htask 2\x1b[K' '\x1b[3;1H\x1b[J'
+        )
+
+    def test_output_taller_than_terminal_is_redrawn(self):
+        output = '\n'.join(f"line {i}" for i in range(90))
+        self.sink.show(output)
+        self.assertEqual(self.written(), f"\x1b[H\x1b[2J{output}\n")
+        self.sink.show(output)
+        self.assertEqual(self.written(), f"\x1b[H\x1b[2J{output}\n")
+        # output that fits again is drawn on a cleared screen
+        self.sink.show('a')
+        self.assertTrue(self.written().startswith('\x1b[H\x1b[2J\x1b[1;1Ha'))
+        self.sink.show(output)
+        self.written()
+        self.sink.close()
+        self.assertEqual(self.written(), '\x1b[H\x1b[2J')
+
+    def test_wrapping_lines_are_redrawn(self):
+        self.resize(10, 24)
+        self.sink.show('a\n' + 'b' * 10)
+        self.assertEqual(self.written(), '\x1b[H\x1b[2Ja\n' + 'b' * 10 + '\n')
+
+    def test_close_clears_screen(self):
+        self.sink.close()
+        self.assertEqual(self.written(), '')
+        self.sink.show('a')
+        self.sink.close()
+        self.assertTrue(self.written().endswith('\x1b[H\x1b[2J'))
+
+    def test_session(self):
+        data = pd.DataFrame({'text': ['first item', 'second item']})
+        task = task_factory(['x', 'y'], 'topic')
+        annotator = Annotator(data, task, text_display=True, sink=self.sink)
+        with mock.patch('os.system') as system:
+            annotator(input_provider=ScriptedInput(['3', '1', '2']))
+        system.assert_not_called()
+        output = self.written()
+        # the item is written once, although it is shown again after the error
+        self.assertEqual(output.count('first item'), 1)
+        self.assertEqual(output.count('second item'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
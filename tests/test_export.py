@@ -0,0 +1,73 @@
+# standard library
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+
+# third party
+import pandas as pd
+
+# local
+from humannotator import Annotator, task_factory
+
+
+class ExportHTMLTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'site'
+        data = pd.DataFrame(
+            {'text': [f"item *{i}* about apples" for i in range(25)]}
+        )
+        task = task_factory(['fruit', 'other'], 'topic')
+        self.annotator = Annotator(data, task, phrases=['apples'])
+        self.annotator.annotations[(3, 'topic')] = 'fruit'
+
+    def read(self, name):
+        return (self.path / name).read_text(encoding='utf-8')
+
+    def test_pages(self):
+        index = self.annotator.export_html(self.path, workers=1, page_size=10)
+        self.assertEqual(index, self.path / 'index.html')
+        pages = sorted(i.name for i in self.path.glob('page-*.html'))
+        self.assertEqual(
+            pages, ['page-00001.html', 'page-00002.html', 'page-00003.html']
+        )
+        self.assertIn('href="page-00003.html"', self.read('index.html'))
+
+        page = self.read('page-00001.html')
+        self.assertEqual(page.count('<div class="humannotator">'), 10)
+        self.assertEqual(page.count('<style>'), 1)
+        self.assertEqual(page.count('<script>'), 1)
+        self.assertIn('<em>0</em>', page)
+        self.assertIn('<mark', page)
+        self.assertIn('href="page-00002.html"', page)
+        self.assertEqual(page.count('humannotator__annotation"'), 1)
+
+    def test_ids(self):
+        self.annotator.export_html(self.path, ids=[3, 4], workers=1)
+        page = self.read('page-00001.html')
+        self.assertEqual(page.count('<div class="humannotator">'), 2)
+
+    def test_annotations_are_looked_up_by_id(self):
+        "The pages do not build (and filter) the frame of all annotations."
+        with mock.patch.object(
+            Annotator, 'annotated', new_callable=mock.PropertyMock
+        ) as annotated:
+            self.annotator.export_html(self.path, workers=1, page_size=10)
+        annotated.assert_not_called()
+        page = self.read('page-00001.html')
+        self.assertEqual(page.count('humannotator__annotation"'), 1)
+
+    def test_process_pool(self):
+        self.annotator.export_html(self.path, workers=2, page_size=10)
+        self.assertEqual(
+            self.read('page-00003.html').count('<div class="humannotator">'),
+            5,
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
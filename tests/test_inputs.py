@@ -0,0 +1,97 @@
+# standard library
+import io
+import unittest
+from unittest import mock
+
+# third party
+import pandas as pd
+
+# local
+from humannotator import Annotator, task_factory
+from humannotator.config import KEYS
+from humannotator.inputs import (
+    KeystrokeInput, StdinInput, ScriptedInput, task_keys
+)
+
+
+class StdinInputTestCase(unittest.TestCase):
+    def test_reads_stdin(self):
+        with mock.patch('builtins.input', return_value='1'):
+            self.assertEqual(StdinInput()(), '1')
+
+
+class ScriptedInputTestCase(unittest.TestCase):
+    def test_replays_inputs(self):
+        provider = ScriptedInput(['1', '2'])
+        self.assertEqual([provider(), provider()], ['1', '2'])
+        self.assertEqual(provider.consumed, 2)
+
+    def test_generator(self):
+        provider = ScriptedInput(str(i) for i in range(3))
+        self.assertEqual([provider() for _ in range(3)], ['0', '1', '2'])
+
+    def test_exhausted_exits(self):
+        provider = ScriptedInput([])
+        self.assertEqual(provider(), KEYS.exit)
+
+
+class KeystrokeInputTestCase(unittest.TestCase):
+    def setUp(self):
+        self.category = task_factory(
+            {'1': 'a', '10': 'b', 'x': 'c'}, 'topic', nullable=True
+        )
+
+    def read(self, keys, task):
+        self.stdout = io.StringIO()
+        provider = KeystrokeInput(io.StringIO(keys), self.stdout)
+        return provider(task)
+
+    def test_task_keys(self):
+        self.assertEqual(
+            task_keys(self.category),
+            ['1', '10', 'x', KEYS.none, KEYS.exit, KEYS.prev, KEYS.next],
+        )
+        self.assertIsNone(task_keys(task_factory('int', 'n')))
+        self.assertEqual(task_keys(None), [KEYS.exit, KEYS.prev, KEYS.next])
+
+    def test_unique_key_commits(self):
+        self.assertEqual(self.read('x', self.category), 'x')
+        self.assertEqual(self.read('10', self.category), '10')
+        self.assertEqual(self.read(KEYS.prev, self.category), KEYS.prev)
+
+    def test_ambiguous_key_waits_for_enter(self):
+        self.assertEqual(self.read('1\n', self.category), '1')
+
+    def test_prefix_is_completed(self):
+        task = task_factory('bool', 'relevant')
+        self.assertEqual(self.read('y', task), 'yes')
+        self.assertEqual(self.stdout.getvalue(), 'yes\n')
+
+    def test_backspace(self):
+        self.assertEqual(self.read('1\x7fx', self.category), 'x')
+
+    def test_invalid_key_commits(self):
+        self.assertEqual(self.read('z', self.category), 'z')
+
+    def test_end_of_input_exits(self):
+        self.assertEqual(self.read('', self.category), KEYS.exit)
+
+    def test_line_mode(self):
+        with mock.patch('builtins.input', return_value='12'):
+            self.assertEqual(self.read('', task_factory('int', 'n')), '12')
+
+    def test_session(self):
+        data = pd.DataFrame({'text': ['a', 'b']})
+        tasks = [
+            task_factory(['x', 'y'], 'topic'),
+            task_factory('str', 'note'),
+        ]
+        annotator = Annotator(data, tasks, text_display=True, sink='null')
+        provider = KeystrokeInput(io.StringIO('1'), io.StringIO())
+        with mock.patch('builtins.input', side_effect=['first', '.']):
+            annotator(input_provider=provider)
+        self.assertEqual(annotator.annotated.note.to_list(), ['first'])
+
+
+if __name__ == '__main__':
+    unittest.main()
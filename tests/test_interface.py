@@ -0,0 +1,145 @@
+# standard library
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# third party
+import pandas as pd
+
+# local
+from humannotator import Annotator, task_factory
+from humannotator.config import KEYS
+from humannotator.inputs import ScriptedInput
+from humannotator.interface import Prefetcher
+from humannotator.display.sinks import NullSink
+from humannotator.display.display import ProtoDisplay
+
+
+class PrefetcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rendered = []
+        def render(id):
+            self.rendered.append(id)
+            return [f"item {id}"]
+        self.prefetcher = Prefetcher(render, prefetch=2)
+
+    def test_prefetched_items_are_reused(self):
+        self.prefetcher.schedule(0, [1, 2])
+        self.assertEqual(self.prefetcher(1), ['item 1'])
+        self.assertEqual(self.prefetcher(1), ['item 1'])
+        self.assertEqual(self.rendered.count(1), 1)
+
+    def test_miss_renders_in_caller(self):
+        self.assertEqual(self.prefetcher(5), ['item 5'])
+
+    def test_evict_outside_window(self):
+        self.prefetcher.schedule(0, [1, 2])
+        self.prefetcher(2)
+        self.prefetcher.schedule(3, [4])
+        self.assertNotIn(2, self.prefetcher.cache)
+
+    def test_invalidate(self):
+        self.prefetcher.schedule(0, [1, 2])
+        self.prefetcher.invalidate()
+        self.assertEqual(self.prefetcher.cache, {})
+
+    def tearDown(self):
+        self.prefetcher.close()
+
+
+class InterfaceSessionTestCase(unittest.TestCase):
+    def setUp(self):
+        data = pd.DataFrame({'text': ['a', 'b', 'c']})
+        task = task_factory(['x', 'y'], 'topic')
+        self.annotator = Annotator(data, task, text_display=True)
+
+    def run_session(self, keys, **kwargs):
+        with mock.patch('builtins.input', side_effect=keys), \
+             mock.patch('builtins.print'), \
+             mock.patch('os.system'):
+            self.annotator(**kwargs)
+
+    def test_annotate_all(self):
+        self.run_session(['1', '2', '1'])
+        self.assertEqual(
+            self.annotator.annotated.topic.to_list(), ['x', 'y', 'x']
+        )
+
+    def test_one_display_per_session(self):
+        ProtoDisplay.stats.clear()
+        self.run_session(['1', '2', '1'])
+        self.assertEqual(ProtoDisplay.stats['setup'], 1)
+        self.assertEqual(ProtoDisplay.stats['render'], 3)
+
+    def test_timings(self):
+        self.annotator.user = 'me'
+        self.run_session(['3', '1', '2', '1'])
+        report = self.annotator.throughput()
+        self.assertEqual(report.users.loc['me', 'items'], 3)
+        self.assertEqual(report.tasks.loc['topic', 'count'], 3)
+
+    def test_previous_and_exit(self):
+        self.run_session(['1', KEYS.prev, '2', KEYS.exit])
+        self.assertEqual(self.annotator.annotated.topic.to_list(), ['y'])
+
+    def test_shared_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'annotations.db'
+            self.annotator.store = path
+            other = Annotator(self.annotator.data, self.annotator.tasks, store=path)
+            other.store.claim([1])
+            self.run_session(['1', '2'])
+            self.assertEqual(self.annotator.annotated.index.to_list(), [0, 2])
+            self.assertEqual(other.annotated.topic.to_list(), ['x', 'y'])
+            other.store.close()
+            self.annotator.store.close()
+
+    def test_shared_store_prefetches_claimed_ids(self):
+        rendered = []
+        render = ProtoDisplay.render_record
+        def render_record(display, id):
+            rendered.append(id)
+            return render(display, id)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'annotations.db'
+            self.annotator.store = path
+            other = Annotator(self.annotator.data, self.annotator.tasks, store=path)
+            other.store.claim([1])
+            with mock.patch.object(ProtoDisplay, 'render_record', render_record), \
+                 mock.patch('builtins.input', side_effect=['1', '2']), \
+                 mock.patch('builtins.print') as print, \
+                 mock.patch('os.system'):
+                self.annotator(prefetch=2)
+            output = ''.join(str(i) for i in print.call_args_list)
+            other.store.close()
+            self.annotator.store.close()
+        self.assertEqual(sorted(set(rendered)), [0, 2])
+        # the total shrinks to the ids that could still be claimed
+        self.assertIn('1 / 3', output)
+        self.assertIn('2 / 2', output)
+
+
+class HeadlessSessionTestCase(unittest.TestCase):
+    def test_scripted_session(self):
+        n = 2000
+        data = pd.DataFrame({'text': [f"item {i}" for i in range(n)]})
+        tasks = [
+            task_factory(['x', 'y'], 'topic'),
+            task_factory('int', 'score', dependencies=("topic == 'y'", 0)),
+        ]
+        sink = NullSink()
+        keys = ScriptedInput(
+            key for i in range(n)
+            for key in (['2'] if i % 2 else ['1', 'x', str(i)])
+        )
+        annotator = Annotator(data, tasks, text_display=True, sink=sink)
+        annotator(input_provider=keys)
+        annotated = annotator.annotated
+        self.assertEqual(len(annotated), n)
+        self.assertEqual(annotated.score[:4].to_list(), [0, 0, 2, 0])
+        self.assertEqual(sink.shown, keys.consumed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+# standard library
+import pickle
+import unittest
+
+# third party
+import pandas as pd
+
+# local
+from humannotator import Annotator, task_factory
+from humannotator.inputs import ScriptedInput
+from humannotator.profiler import Profiler, NULL_PROFILER
+
+
+class ProfilerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.profiler = Profiler()
+        for id, seconds in enumerate([1.0, 2.0, 3.0, 4.0]):
+            self.profiler.item(id)
+            self.profiler.add('input', seconds)
+        self.profiler.add('store', 0.5)
+
+    def test_stage_records_item(self):
+        profiler = Profiler()
+        profiler.item('a')
+        with profiler.stage('input'):
+            pass
+        (id, stage, seconds), = profiler.records
+        self.assertEqual((id, stage), ('a', 'input'))
+        self.assertGreaterEqual(seconds, 0)
+
+    def test_percentiles(self):
+        summary = self.profiler.percentiles([50])
+        self.assertEqual(summary.index.to_list(), ['input', 'store'])
+        self.assertEqual(
+            summary.columns.to_list(),
+            ['count', 'total', 'mean', 'p50', 'max'],
+        )
+        self.assertEqual(summary.loc['input', 'count'], 4)
+        self.assertEqual(summary.loc['input', 'p50'], 2.5)
+        self.assertEqual(summary.loc['store', 'total'], 0.5)
+
+    def test_per_item(self):
+        df = self.profiler.per_item()
+        self.assertEqual(df.loc[3, 'store'], 4.5 - 4.0)
+        self.assertTrue(pd.isna(df.loc[0, 'store']))
+
+    def test_callback(self):
+        calls = []
+        profiler = Profiler(lambda *args: calls.append(args))
+        profiler.item(1)
+        profiler.add('input', 1.0)
+        self.assertEqual(calls, [(1, 'input', 1.0)])
+
+    def test_null_profiler_records_nothing(self):
+        NULL_PROFILER.item(1)
+        with NULL_PROFILER.stage('input'):
+            pass
+        self.assertEqual(len(NULL_PROFILER.records), 0)
+
+
+class ProfileSessionTestCase(unittest.TestCase):
+    def setUp(self):
+        data = pd.DataFrame({'text': ['a', 'b', 'c']})
+        tasks = [
+            task_factory(['x', 'y'], 'topic'),
+            task_factory(
+                'str', 'reason', nullable=True,
+                dependencies=("topic == 'x'", None),
+            ),
+        ]
+        self.annotator = Annotator(
+            data, tasks, text_display=True, sink='null'
+        )
+
+    def test_profile_session(self):
+        inputs = ScriptedInput(['1', '2', 'because', '1'])
+        with self.annotator.profile() as profiler:
+            self.annotator(input_provider=inputs)
+        self.assertIs(self.annotator.profiler, NULL_PROFILER)
+
+        summary = profiler.percentiles()
+        for stage in [
+            'input', 'dependencies', 'store', 'display.context',
+            'display.template', 'display.items', 'display.sink',
+            'display.clear', 'item.highlight',
+        ]:
+            self.assertIn(stage, summary.index)
+        self.assertEqual(summary.loc['input', 'count'], 4)
+        self.assertEqual(summary.loc['dependencies', 'count'], 3)
+        ids = profiler.frame.query("stage == 'input'").id.to_list()
+        self.assertEqual(ids, [0, 1, 1, 2])
+
+    def test_pickle_without_profiler(self):
+        with self.annotator.profile():
+            annotator = pickle.loads(pickle.dumps(self.annotator))
+        self.assertIs(annotator.profiler, NULL_PROFILER)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+# standard library
+import unittest
+
+# local
+from humannotator.utils import LRUCache
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache = LRUCache(maxsize=2)
+
+    def test_hit_and_miss(self):
+        self.cache('a', str.upper, 'a')
+        self.assertEqual(self.cache('a', str.upper, 'x'), 'A')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(self.cache.hit_rate, 0.5)
+
+    def test_evict_least_recently_used(self):
+        self.cache('a', str.upper, 'a')
+        self.cache('b', str.upper, 'b')
+        self.cache('a', str.upper, 'a')
+        self.cache('c', str.upper, 'c')
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertEqual(len(self.cache), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()